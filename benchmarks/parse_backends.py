@@ -0,0 +1,113 @@
+"""
+Benchmark the JSON parser backends used to parse CSB documents.
+
+Each backend parses the document in a separate process, so that the peak resident set size (RSS) reported for a
+backend is not affected by the others. 'stdlib-copy' is the previous approach of reading the whole memory-mapped file
+into a bytes object, then decoding it with json.load().
+
+Usage:
+    python benchmarks/parse_backends.py [--features N] [--repeat R] [document ...]
+
+If no documents are given, a B12 3.1.0 document with N features (default: 1000000) is generated from
+docs/IHO/b12_v3_1_0_example.json.
+"""
+import os
+import sys
+import json
+import mmap
+import time
+import resource
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+from csbschema import parsers
+
+EXAMPLE_PATH = Path(Path(__file__).parent.parent, 'docs', 'IHO', 'b12_v3_1_0_example.json')
+STDLIB_COPY = 'stdlib-copy'
+
+
+def _peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux, but in bytes on macOS
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / (1 << 10)
+
+
+def generate_document(path: Path, n_features: int, template: Path = EXAMPLE_PATH) -> None:
+    """
+    Write a GeoJSON document with n_features features, made by repeating the features of template.
+    """
+    with open(template, 'rb') as f:
+        example = json.load(f)
+    templates = example.pop('features')
+    with open(path, 'w', encoding='utf8') as f:
+        f.write(json.dumps(example)[:-1] + ', "features": [')
+        for i in range(n_features):
+            feature = templates[i % len(templates)]
+            feature['geometry']['coordinates'] = [-70.0 + i * 1e-6, 43.0 + i * 1e-6]
+            feature['properties']['depth'] = 10.0 + (i % 1000) / 100
+            if i > 0:
+                f.write(', ')
+            f.write(json.dumps(feature))
+        f.write(']}')
+
+
+def _child(backend: str, path: str, repeat: int) -> None:
+    baseline = _peak_rss_mib()
+    times = []
+    for _ in range(repeat):
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), length=0, access=mmap.ACCESS_READ) as mm:
+                start = time.perf_counter()
+                if backend == STDLIB_COPY:
+                    document = json.load(mm)
+                else:
+                    parsers.set_parser(backend)
+                    with memoryview(mm) as buffer:
+                        document = parsers.parse(buffer)
+                times.append(time.perf_counter() - start)
+        n_features = len(document['features'])
+        del document
+    print(json.dumps({'time': min(times), 'features': n_features, 'baseline_rss': baseline,
+                      'peak_rss': _peak_rss_mib()}))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark JSON parser backends on CSB documents.')
+    parser.add_argument('documents', nargs='*', help='CSB documents to parse')
+    parser.add_argument('--features', type=int, default=1000000,
+                        help='Number of features in the generated document (if no documents are given)')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of times to parse each document')
+    parser.add_argument('--child', nargs=2, metavar=('BACKEND', 'DOCUMENT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        _child(args.child[0], args.child[1], args.repeat)
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        documents = args.documents
+        if len(documents) == 0:
+            path = Path(tmp_dir, f"b12_{args.features}.json")
+            generate_document(path, args.features)
+            documents = [str(path)]
+
+        backends = [STDLIB_COPY] + list(reversed(parsers.available_backends()))
+        print(f"{'document':<32} {'backend':<12} {'MiB':>8} {'features':>10} {'parse (s)':>10} {'MiB/s':>8} "
+              f"{'peak RSS (MiB)':>15} {'RSS growth (MiB)':>17}")
+        for document in documents:
+            size = os.path.getsize(document) / (1 << 20)
+            for backend in backends:
+                out = subprocess.run([sys.executable, __file__, '--repeat', str(args.repeat),
+                                      '--child', backend, document],
+                                     check=True, capture_output=True, text=True).stdout
+                r = json.loads(out)
+                print(f"{Path(document).name[-32:]:<32} {backend:<12} {size:>8.1f} {r['features']:>10} "
+                      f"{r['time']:>10.3f} {size / r['time']:>8.1f} {r['peak_rss']:>15.1f} "
+                      f"{r['peak_rss'] - r['baseline_rss']:>17.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+Benchmark validation of every schema version in csbschema.VALIDATORS, on synthetic documents of increasing size.
+
+For each GeoJSON schema version, documents with each of the given numbers of features are generated using
+csbschema.synth. XYZ schema versions are for metadata only, so one XYZ metadata document is generated for each. Each
+document is validated in a separate process, so that the peak resident set size
+(RSS) reported for it is not affected by the others. The time taken by each phase of validation is reported:
+    - parse: parsing the JSON document
+    - structural: validating the document against the JSON schema
+    - semantic: checks that can't be expressed in JSON schema (e.g. that uncertainty metadata is present if features
+      have uncertainty). Semantic checks on individual features are done during the structural pass over the
+      features, and so are counted as structural.
+Structural and semantic times are those reported by validate_data(..., timings=True) (see csbschema.timing).
+Times are the minimum over --repeat runs.
+
+Results can be saved with --save, and compared against saved results with --compare. The command then exits with an
+error status if any time or peak memory use has grown by more than --threshold (ignoring changes of less than a
+millisecond or a MiB, which are noise).
+
+Usage:
+    python benchmarks/validation_suite.py [--sizes N ...] [--full] [--versions V ...] [--save FILE]
+        [--compare FILE] [--threshold T] [--data-dir DIR]
+
+By default documents with 10, 1000, and 100000 features are generated; --full also generates documents with 1
+million and 10 million features (about 2 GiB each), which takes several minutes. Use --data-dir to keep generated
+documents between runs.
+"""
+import os
+import sys
+import json
+import mmap
+import time
+import platform
+import argparse
+import importlib.metadata
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict, List
+
+import csbschema
+from csbschema import parsers, synth, timing
+from parse_backends import _peak_rss_mib
+
+# Fraction of features in generated documents with observation uncertainty
+UNCERTAINTY = 0.5
+DEFAULT_SIZES = (10, 1000, 100000)
+FULL_SIZES = DEFAULT_SIZES + (1000000, 10000000)
+DEFAULT_THRESHOLD = 0.1
+# Metrics compared against a baseline, and the smallest change in each that is not considered noise
+METRICS = {'parse': 1e-3, 'structural': 1e-3, 'semantic': 1e-3, 'total': 1e-3, 'rss_growth': 1.0}
+
+
+def _is_xyz(version: str) -> bool:
+    return version.startswith('XYZ-')
+
+
+def _child(version: str, path: str, repeat: int, compiled: bool, fast_path: bool) -> None:
+    validate = csbschema.VALIDATORS[version]
+    kwargs = {'compiled': compiled, 'return_document': False, 'timings': True}
+    if not _is_xyz(version):
+        kwargs['fast_path'] = fast_path
+    # Validate a small document first, so that one-off costs (e.g. compiling the schema) are not measured
+    validate(synth.generate_document(version=version, n_features=10, uncertainty=UNCERTAINTY), **kwargs)
+    baseline = _peak_rss_mib()
+
+    times: Dict[str, List[float]] = {'parse': [], 'structural': [], 'semantic': []}
+    for _ in range(repeat):
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), length=0, access=mmap.ACCESS_READ) as mm:
+                start = time.perf_counter()
+                with memoryview(mm) as buffer:
+                    document = parsers.parse(buffer)
+                times['parse'].append(time.perf_counter() - start)
+
+        (valid, result) = validate(document, **kwargs)
+        times['structural'].append(result['timings'][timing.STRUCTURAL])
+        times['semantic'].append(result['timings'][timing.SEMANTIC])
+        del document
+
+    r = {k: min(v) for k, v in times.items()}
+    r['total'] = r['parse'] + r['structural'] + r['semantic']
+    r['features'] = result.get('feature_count', 0)
+    r['valid'] = valid
+    r['rss_growth'] = _peak_rss_mib() - baseline
+    print(json.dumps(r))
+
+
+def _document_path(data_dir: Path, version: str, n_features: int) -> Path:
+    path = Path(data_dir, f"{version}_{n_features}.json")
+    if not path.exists():
+        partial = path.with_suffix('.partial')
+        synth.write_document(partial, version=version, n_features=n_features, uncertainty=UNCERTAINTY, seed=0)
+        os.replace(partial, path)
+    return path
+
+
+def _environment() -> dict:
+    return {'python': platform.python_version(),
+            'csbschema': csbschema.__version__,
+            'jsonschema': importlib.metadata.version('jsonschema'),
+            'parser': parsers.get_parser(),
+            'machine': platform.machine()}
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """
+    :param results: Benchmark results, keyed by 'VERSION/FEATURES'
+    :param baseline: Saved benchmark results to compare against
+    :param threshold: Relative growth in a metric above which it is considered a regression
+    :return: Descriptions of regressions
+    """
+    regressions = []
+    for key, r in results.items():
+        if key not in baseline:
+            continue
+        for metric, noise in METRICS.items():
+            (new, old) = (r[metric], baseline[key][metric])
+            if new - old > max(old * threshold, noise):
+                regressions.append(f"{key} {metric}: {old:.4g} -> {new:.4g} (+{(new - old) / max(old, 1e-9):.0%})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark validation of every CSB schema version.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help=f"Numbers of features in generated documents. Default: {DEFAULT_SIZES}")
+    parser.add_argument('--full', action='store_true',
+                        help=f"Generate documents with {FULL_SIZES} features")
+    parser.add_argument('--versions', nargs='+', choices=list(csbschema.VALIDATORS.keys()),
+                        default=list(csbschema.VALIDATORS.keys()),
+                        help='Schema versions to benchmark. Default: all')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of times to validate each document')
+    parser.add_argument('--compiled', action='store_true', help='Validate using code generated from the schema')
+    parser.add_argument('--no-fast-path', action='store_true', help='Validate features without the NumPy fast path')
+    parser.add_argument('--data-dir', help='Directory to keep generated documents in (default: a temporary directory)')
+    parser.add_argument('--save', help='Save results to this JSON file')
+    parser.add_argument('--compare', help='Compare results against those saved in this JSON file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Relative growth considered a regression when comparing. Default: {DEFAULT_THRESHOLD}")
+    parser.add_argument('--child', nargs=2, metavar=('VERSION', 'DOCUMENT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        _child(args.child[0], args.child[1], args.repeat, args.compiled, not args.no_fast_path)
+        return 0
+
+    sizes = FULL_SIZES if args.full else sorted(set(args.sizes))
+    child_args = ['--repeat', str(args.repeat)]
+    if args.compiled:
+        child_args.append('--compiled')
+    if args.no_fast_path:
+        child_args.append('--no-fast-path')
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = Path(args.data_dir if args.data_dir is not None else tmp_dir)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        print(f"{'version':<18} {'features':>10} {'MiB':>8} {'parse (s)':>10} {'struct (s)':>10} {'sem (s)':>9} "
+              f"{'total (s)':>10} {'features/s':>11} {'RSS growth (MiB)':>17}")
+        for version in args.versions:
+            for n_features in [0] if _is_xyz(version) else sizes:
+                path = _document_path(data_dir, version, n_features)
+                out = subprocess.run([sys.executable, __file__, *child_args, '--child', version, str(path)],
+                                     check=True, capture_output=True, text=True).stdout
+                r = json.loads(out)
+                if not r['valid']:
+                    print(f"Warning: {path} is not valid against schema {version}", file=sys.stderr)
+                r['size_mib'] = os.path.getsize(path) / (1 << 20)
+                results[f"{version}/{r['features']}"] = r
+                rate = f"{r['features'] / r['total']:>11.0f}" if r['features'] > 0 else f"{'-':>11}"
+                print(f"{version:<18} {r['features']:>10} {r['size_mib']:>8.1f} {r['parse']:>10.4f} "
+                      f"{r['structural']:>10.4f} {r['semantic']:>9.4f} {r['total']:>10.4f} {rate} "
+                      f"{r['rss_growth']:>17.1f}", flush=True)
+
+    if args.save is not None:
+        with open(args.save, 'w', encoding='utf8') as f:
+            json.dump({'environment': _environment(), 'results': results}, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare, 'rb') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline['results'], args.threshold)
+        print(f"Compared against {args.compare} (environment: {baseline.get('environment')})")
+        if len(regressions) > 0:
+            print(f"{len(regressions)} regression(s) of more than {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"No regressions of more than {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
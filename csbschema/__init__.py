@@ -1,7 +1,8 @@
-from pathlib import Path
-from typing import Tuple, Union
+import time
+import contextlib
+from typing import Iterable, Optional, Tuple
 
-from csbschema import validators
+from csbschema import validators, metrics, shapes, compression
 
 
 __version__ = '1.2.0.dev1'
@@ -33,18 +34,158 @@ VALIDATORS = {
     B12_VERSION_3_1_0_2023_08: validators.validate_b12_3_1_0_2023_08,
 }
 
+# Internal schema resource used by each validator version
+SCHEMA_RESOURCES = {version: validator.schema_rsrc_name for (version, validator) in VALIDATORS.items()}
 
-def validate_data(document_path: Union[Path, str], *,
-                  version=DEFAULT_VALIDATOR_VERSION) -> Tuple[bool, dict]:
+
+def warmup(versions: Optional[Iterable[str]] = None, *,
+           compiled: bool = False) -> None:
+    """
+    Compile and cache schema validators ahead of time so that the first validation done by a process is not
+    slower than subsequent validations.
+    :param versions: Versions of schema validators to compile. If None, validators for all versions in
+        VALIDATORS are compiled.
+    :param compiled: If True, also generate and compile the code-generated validators used when validating with
+        compiled=True.
+    """
+    if versions is None:
+        versions = VALIDATORS.keys()
+    for version in versions:
+        if version not in SCHEMA_RESOURCES:
+            raise ValueError(f"Unknown validator version: {version}")
+        validators._get_validator(SCHEMA_RESOURCES[version])
+        if compiled:
+            validators._get_compiled_validator(SCHEMA_RESOURCES[version])
+
+
+def shape_cache_info(version: str = DEFAULT_VALIDATOR_VERSION) -> Optional[shapes.ShapeCacheInfo]:
     """
-    Dispatch to a version-specific validator for CSB data.
-    :param document_path: Path to document to be validated
     :param version: Version of schema validator
+    :return: Statistics (hits, misses, size, maxsize, and hit_rate) of the memoization of feature validation by
+        shape for this version in this process (see csbschema.shapes), or None if memoization is not available for
+        the version (e.g. XYZ metadata, which have no features). The statistics are reset by
+        csbschema.validators.clear_validator_cache().
+    """
+    if version not in SCHEMA_RESOURCES:
+        raise ValueError(f"Unknown validator version: {version}")
+    return validators.shape_cache_info(SCHEMA_RESOURCES[version])
+
+
+def validate_data(document_path: validators.DocumentSource, *,
+                  version=DEFAULT_VALIDATOR_VERSION,
+                  **kwargs) -> Tuple[bool, dict]:
+    """
+    Dispatch to a version-specific validator for CSB data.
+    :param document_path: Document to be validated: a path, an already parsed document (dict), bytes or a memoryview
+        containing JSON, or a binary file-like object
+    :param version: Version of schema validator, or 'auto' to detect the version from the document (see
+        csbschema.detect), in which case the result also contains 'detection', the dict {'version': ...,
+        'reason': ...} giving the version the document was validated against and how it was detected.
+    :param kwargs: Additional keyword arguments passed to the version-specific validator, e.g. stream=True to
+        validate the features of large GeoJSON documents one at a time (not supported for XYZ metadata),
+        sequence=True to validate a GeoJSON text sequence or NDJSON document (a header record followed by one
+        record per feature, see csbschema.textseq) a record at a time, with line numbers in error messages,
+        compiled=True to validate using code generated from the schema, max_errors=N (or fail_fast=True) to
+        report at most N errors (or only the first error) and stop validation once a further error is found,
+        check_time_order=True (and max_time_gap=SECONDS) to check that features are in time order (not supported
+        for XYZ metadata),
+        return_document=False to return a slim result without the validated document, or timings=True to return
+        the time taken by each phase of validation in 'timings' (see csbschema.timing) and the number of features
+        in 'feature_count'. XYZ metadata also take xyz_data, the XYZ data they describe (see validate_xyz_pair).
+        Documents (and XYZ data) compressed with gzip, bzip2, xz, or Zstandard are decompressed as they are read
+        (see csbschema.compression). With timings=True, the result then also contains 'compression' (and
+        'xyz_data_compression'): the dict {'format': ..., 'compressed_bytes': ..., 'uncompressed_bytes': ...}.
     :return: Tuple[bool, dict]. If bool is True (which signals that validation succeeded), then dict represents the
         document that was validated. If bool is False (which signals that validation failed), then dict will contain
-        a mapping of JSON path element to error encountered at that element.
+        a mapping of JSON path element to error encountered at that element, and 'truncated' will be True if
+        validation was stopped early because more errors than max_errors (or with fail_fast, than one) were found.
     """
-    if version not in VALIDATORS:
+    if version != AUTO and version not in VALIDATORS:
         raise ValueError(f"Unknown validator version: {version}")
 
-    return VALIDATORS[version](document_path)
+    registry = metrics.get_registry()
+    if registry is None:
+        return _validate(document_path, version, kwargs)
+
+    start = time.perf_counter()
+    try:
+        (valid, result) = _validate(document_path, version, kwargs)
+    except (OSError, ValueError):
+        registry.observe(version, valid=None, duration=time.perf_counter() - start,
+                         n_bytes=metrics.document_size(document_path))
+        raise
+    registry.observe(result['detection']['version'] if version == AUTO else version, valid=valid,
+                     duration=time.perf_counter() - start, n_bytes=metrics.document_size(document_path),
+                     n_features=metrics.feature_count(result), errors=result.get('errors', ()))
+    return valid, result
+
+
+def validate_xyz_pair(metadata: validators.DocumentSource, data: validators.XYZDataSource, *,
+                      version=XYZ_B12_VERSION_3_1_0_2024_04,
+                      **kwargs) -> Tuple[bool, dict]:
+    """
+    Validate XYZ metadata together with the XYZ data they describe. The metadata are validated as by validate_data,
+    and the data are streamed, a block at a time, checking that each line has a valid longitude, latitude, depth,
+    time, and optionally uncertainty (see csbschema.xyz), and that the metadata are consistent with the data (e.g.
+    that data with observation uncertainty have Uncertainty processing metadata).
+    :param metadata: XYZ metadata document to be validated (see validate_data)
+    :param data: XYZ data: a path, bytes or a memoryview containing the data, or a binary file-like object
+    :param version: Version of XYZ schema validator, or 'auto' to detect the version from the metadata
+    :param kwargs: Additional keyword arguments passed to validate_data, e.g. max_errors=N or timings=True (in which
+        case 'feature_count' is the number of lines of data)
+    :return: Tuple[bool, dict], as returned by validate_data. Issues with the data are reported at
+        /data/{i}/{column}, where i is the index of the line of data.
+    """
+    if version != AUTO and not version.startswith('XYZ'):
+        raise ValueError(f"Not an XYZ validator version: {version}")
+    return validate_data(metadata, version=version, xyz_data=data, **kwargs)
+
+
+# validate_data options that only apply to GeoJSON documents
+_GEOJSON_OPTIONS = ('stream', 'feature_jobs', 'sequence', 'fast_path', 'check_time_order', 'max_time_gap')
+
+
+def _validate(document_path: validators.DocumentSource, version: str, kwargs: dict) -> Tuple[bool, dict]:
+    # Compressed documents (and XYZ data) are validated from a stream that decompresses them as they are read
+    with contextlib.ExitStack() as stack:
+        document = stack.enter_context(compression.open_document(document_path))
+        xyz_data = kwargs.get('xyz_data')
+        if xyz_data is not None:
+            xyz_data = stack.enter_context(compression.open_document(xyz_data))
+            kwargs = dict(kwargs, xyz_data=xyz_data)
+        (valid, result) = _validate_decompressed(document, version, kwargs)
+        if kwargs.get('timings', False):
+            if isinstance(document, compression.DecompressingReader):
+                result['compression'] = document.info._asdict()
+            if isinstance(xyz_data, compression.DecompressingReader):
+                result['xyz_data_compression'] = xyz_data.info._asdict()
+    return valid, result
+
+
+def _validate_decompressed(document_path: validators.DocumentSource, version: str,
+                           kwargs: dict) -> Tuple[bool, dict]:
+    if version != AUTO:
+        if kwargs.get('xyz_data') is not None and not version.startswith('XYZ'):
+            raise ValueError(f"XYZ data can only be validated with XYZ metadata, not {version}")
+        return VALIDATORS[version](document_path, **kwargs)
+
+    # Parse the document (or when streaming, read its top-level members) once, both to detect the version and to
+    # validate it
+    (detection, document) = detect.detect(document_path, stream=kwargs.get('stream', False),
+                                          sequence=kwargs.get('sequence', False))
+    if detection.version.startswith('XYZ'):
+        # XYZ metadata are small, so are never streamed, and have no features to check the time order of
+        kwargs = {k: v for k, v in kwargs.items() if k not in _GEOJSON_OPTIONS}
+    elif kwargs.get('xyz_data') is not None:
+        raise ValueError(f"XYZ data can only be validated with XYZ metadata, but detected {detection.version}")
+    (valid, result) = VALIDATORS[detection.version](document, **kwargs)
+    result['detection'] = detection._asdict()
+    return valid, result
+
+
+# Imported last, as version detection needs the version names, and the asyncio and multi-version APIs dispatch to
+# validate_data
+from csbschema import detect  # noqa: E402
+from csbschema.detect import AUTO, Detection, detect_version  # noqa: E402
+from csbschema.aio import AsyncValidator, validate_data_async, validate_many_async  # noqa: E402
+from csbschema.multi import validate_multi  # noqa: E402
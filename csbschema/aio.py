@@ -0,0 +1,178 @@
+"""
+asyncio API for validating CSB documents without blocking the event loop.
+
+Validation is CPU-bound, so it is handed off to a thread or process pool. Validators are compiled once per process
+and cached (see csbschema.warmup), so they are reused across calls; process pool workers compile them when they
+start. The number of documents being validated (or queued for validation) at once is limited, so that submitting a
+large batch does not, e.g., pickle every document for a process pool up front.
+
+Cancelling a call that is waiting for a worker removes its document from the queue. A document that a worker has
+already started validating is validated to completion, but its result is discarded.
+"""
+from __future__ import annotations
+
+import os
+import weakref
+import asyncio
+import functools
+import contextlib
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Iterable, List, Optional, Tuple, Union
+
+import csbschema
+from csbschema.validators import DocumentSource
+
+
+class AsyncValidator:
+    """
+    Validates documents in a thread or process pool on behalf of asyncio code. Can be used as an asynchronous
+    context manager, which shuts down the pool (if it was created by the AsyncValidator) on exit.
+    """
+    def __init__(self, *,
+                 executor: Optional[Executor] = None,
+                 processes: bool = False,
+                 max_workers: Optional[int] = None,
+                 max_concurrency: Optional[int] = None,
+                 versions: Optional[Iterable[str]] = None,
+                 compiled: bool = False):
+        """
+        :param executor: Executor to validate documents in. If None, a thread pool (or a process pool, if processes is
+            True) is created, and shut down by close().
+        :param processes: If True (and executor is None), validate documents in a process pool, so that documents
+            are validated in parallel. Otherwise, documents are validated in a thread pool, which keeps the event
+            loop responsive, but (because of the GIL) does not validate documents in parallel.
+        :param max_workers: Number of workers in the pool created if executor is None. Defaults to the number of CPUs.
+        :param max_concurrency: Maximum number of documents being validated, or waiting for a worker, at once (by
+            each event loop using the AsyncValidator). Defaults to max_workers (or the number of CPUs).
+        :param versions: Versions of schema validators to compile when each worker process starts. If None,
+            validators for all versions are compiled.
+        :param compiled: If True, also compile code-generated validators when each worker process starts.
+        """
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        self._owns_executor = executor is None
+        if executor is None:
+            if processes:
+                versions = list(versions) if versions is not None else None
+                executor = ProcessPoolExecutor(max_workers=max_workers,
+                                               initializer=functools.partial(csbschema.warmup, compiled=compiled),
+                                               initargs=(versions,))
+            else:
+                executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='csbschema')
+        self._executor = executor
+        self.max_concurrency = max_concurrency if max_concurrency is not None else max_workers
+        if self.max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, not {self.max_concurrency}")
+        # asyncio semaphores can only be used by one event loop, so there is one for each loop
+        self._semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = \
+            weakref.WeakKeyDictionary()
+
+    @contextlib.asynccontextmanager
+    async def _slot(self) -> AsyncIterator[None]:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        async with semaphore:
+            yield
+
+    async def validate(self, document_path: DocumentSource, *,
+                       version: str = csbschema.DEFAULT_VALIDATOR_VERSION,
+                       **kwargs) -> Tuple[bool, dict]:
+        """
+        Validate a document, as csbschema.validate_data does, in the pool.
+        :param document_path: Document to be validated (see csbschema.validate_data). Documents that are not paths
+            are pickled when validated in a process pool.
+        :param version: Version of schema validator, or 'auto' to detect the version from the document
+        :param kwargs: Additional keyword arguments passed to csbschema.validate_data
+        :return: Tuple[bool, dict], as returned by csbschema.validate_data
+        """
+        if version != csbschema.AUTO and version not in csbschema.VALIDATORS:
+            raise ValueError(f"Unknown validator version: {version}")
+        async with self._slot():
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, functools.partial(csbschema.validate_data, document_path, version=version, **kwargs))
+
+    async def validate_many(self, documents: Iterable[DocumentSource], *,
+                            version: str = csbschema.DEFAULT_VALIDATOR_VERSION,
+                            return_exceptions: bool = False,
+                            **kwargs) -> List[Union[Tuple[bool, dict], BaseException]]:
+        """
+        Validate several documents concurrently (subject to max_concurrency).
+        :param documents: Documents to be validated
+        :param version: Version of schema validator
+        :param return_exceptions: If True, exceptions raised validating a document (e.g. OSError if it can't be read)
+            are returned in place of its result. Otherwise, the first exception is raised, and validation of the other
+            documents is cancelled.
+        :param kwargs: Additional keyword arguments passed to csbschema.validate_data
+        :return: Results, in the same order as documents
+        """
+        tasks = [asyncio.ensure_future(self.validate(d, version=version, **kwargs)) for d in documents]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    def close(self) -> None:
+        """
+        Shut down the pool if it was created by this AsyncValidator, cancelling documents waiting for a worker.
+        """
+        if self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self) -> AsyncValidator:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+
+_default_validator: Optional[AsyncValidator] = None
+
+
+def _get_default_validator() -> AsyncValidator:
+    global _default_validator
+    if _default_validator is None:
+        _default_validator = AsyncValidator()
+    return _default_validator
+
+
+async def validate_data_async(document_path: DocumentSource, *,
+                              version: str = csbschema.DEFAULT_VALIDATOR_VERSION,
+                              validator: Optional[AsyncValidator] = None,
+                              **kwargs) -> Tuple[bool, dict]:
+    """
+    Validate a document without blocking the event loop.
+    :param document_path: Document to be validated (see csbschema.validate_data)
+    :param version: Version of schema validator
+    :param validator: AsyncValidator to validate the document with. If None, a shared AsyncValidator using a thread
+        pool is used.
+    :param kwargs: Additional keyword arguments passed to csbschema.validate_data
+    :return: Tuple[bool, dict], as returned by csbschema.validate_data
+    """
+    if validator is None:
+        validator = _get_default_validator()
+    return await validator.validate(document_path, version=version, **kwargs)
+
+
+async def validate_many_async(documents: Iterable[DocumentSource], *,
+                              version: str = csbschema.DEFAULT_VALIDATOR_VERSION,
+                              validator: Optional[AsyncValidator] = None,
+                              return_exceptions: bool = False,
+                              **kwargs) -> List[Union[Tuple[bool, dict], BaseException]]:
+    """
+    Validate several documents concurrently without blocking the event loop.
+    :param documents: Documents to be validated
+    :param version: Version of schema validator
+    :param validator: AsyncValidator to validate the documents with. If None, a shared AsyncValidator using a thread
+        pool is used.
+    :param return_exceptions: If True, exceptions raised validating a document are returned in place of its result.
+        Otherwise, the first exception is raised, and validation of the other documents is cancelled.
+    :param kwargs: Additional keyword arguments passed to csbschema.validate_data
+    :return: Results, in the same order as documents
+    """
+    if validator is None:
+        validator = _get_default_validator()
+    return await validator.validate_many(documents, version=version, return_exceptions=return_exceptions, **kwargs)
@@ -5,6 +5,8 @@ from typing import Union
 from csbschema import __version__ as version
 from csbschema.command import EXIT_USAGE
 from csbschema.command.validate import validate
+from csbschema.command.serve import serve
+from csbschema.command.synth import synth
 
 
 class CSBSchema:
@@ -15,6 +17,8 @@ class CSBSchema:
 
     Commands include:
         validate    Validate CSB observation data and metadata using an IHO B12 schema.
+        serve       Serve validation requests from worker processes with precompiled validators.
+        synth       Generate a synthetic CSB document for benchmarking or load testing.
                 '''
         )
         parser.add_argument('--version', help='print version and exit',
@@ -33,6 +37,14 @@ class CSBSchema:
     def validate() -> Union[int, str]:
         return validate()
 
+    @staticmethod
+    def serve() -> Union[int, str]:
+        return serve()
+
+    @staticmethod
+    def synth() -> Union[int, str]:
+        return synth()
+
     def run_subcommand(self) -> Union[int, str]:
         return getattr(self, self.sub_command)()
 
@@ -0,0 +1,56 @@
+import sys
+import signal
+import argparse
+import logging
+from typing import Union
+
+from csbschema.command import EXIT_OK
+from csbschema import parsers
+from csbschema.server import DEFAULT_HOST, DEFAULT_PORT, DEFAULT_MAX_BODY_SIZE, ValidationServer, format_address
+
+logger = logging.getLogger(__name__)
+
+
+def serve() -> Union[int, str]:
+    parser = argparse.ArgumentParser(
+        description='Serve CSB validation requests from a pool of worker processes with precompiled validators.'
+    )
+    parser.add_argument('--host', default=DEFAULT_HOST,
+                        help=f"Host name or address to listen on. Default: {DEFAULT_HOST}")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f"TCP port to listen on. Default: {DEFAULT_PORT}")
+    parser.add_argument('--socket',
+                        help='Path of a Unix domain socket to listen on (instead of a TCP port)')
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help='Number of worker processes. Use 0 for one worker per CPU. Default: 0')
+    parser.add_argument('--compiled', action='store_true',
+                        help='Validate using code generated from the schema, unless a request '
+                             'says otherwise')
+    parser.add_argument('--parser', choices=(parsers.AUTO,) + parsers.BACKENDS, default=parsers.DEFAULT_PARSER,
+                        help=f"JSON parser used to read documents. Default: {parsers.DEFAULT_PARSER}")
+    parser.add_argument('--document-root',
+                        help='Directory under which documents may be given by path (e.g. by "csbschema validate '
+                             '--server"). By default, documents can only be sent in requests')
+    parser.add_argument('--max-body-size', type=int, default=DEFAULT_MAX_BODY_SIZE,
+                        help=f"Maximum size, in bytes, of documents sent in requests. Default: {DEFAULT_MAX_BODY_SIZE}")
+    parser.add_argument('--metrics', action='store_true',
+                        help='Serve metrics of the documents validated in Prometheus text format at /metrics')
+    args = parser.parse_args(sys.argv[2:])
+
+    if args.jobs < 0:
+        parser.error('--jobs must be 0 or greater')
+    if args.max_body_size < 0:
+        parser.error('--max-body-size must be 0 or greater')
+    address = args.socket if args.socket is not None else (args.host, args.port)
+
+    with ValidationServer(address, jobs=args.jobs if args.jobs > 0 else None, compiled=args.compiled,
+                          parser=args.parser, metrics=args.metrics, document_root=args.document_root,
+                          max_body_size=args.max_body_size) as server:
+        # Shut down cleanly (removing the Unix domain socket) when terminated
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(EXIT_OK))
+        print(f"Serving CSB validation requests on {format_address(server.address)}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return EXIT_OK
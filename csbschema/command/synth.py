@@ -0,0 +1,53 @@
+import sys
+import argparse
+import logging
+from typing import Union
+
+from csbschema.command import EXIT_OK
+from csbschema import VALIDATORS, DEFAULT_VALIDATOR_VERSION
+from csbschema import synth as synthesize
+
+logger = logging.getLogger(__name__)
+
+STDOUT_PATH = '-'
+
+
+def synth() -> Union[int, str]:
+    parser = argparse.ArgumentParser(
+        description='Generate a synthetic CSB document, e.g. for benchmarking or load testing validators.'
+    )
+    parser.add_argument('-o', '--output', default=STDOUT_PATH,
+                        help='Path of the document to write. Use - to write to standard output. Default: -')
+    parser.add_argument('--version', choices=VALIDATORS.keys(), default=DEFAULT_VALIDATOR_VERSION,
+                        help=f"Schema version to generate a document for. Default: {DEFAULT_VALIDATOR_VERSION}")
+    parser.add_argument('-n', '--features', type=int, default=synthesize.DEFAULT_N_FEATURES,
+                        help=f"Number of features (ignored for XYZ metadata). Default: {synthesize.DEFAULT_N_FEATURES}")
+    parser.add_argument('--uncertainty', type=float, default=0.0,
+                        help='Fraction (from 0 to 1) of features with observation uncertainty. Default: 0')
+    parser.add_argument('--no-uncertainty-metadata', action='store_true',
+                        help='Leave out Uncertainty metadata, even if features have observation uncertainty')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fraction (from 0 to 1) of features that are made invalid. Default: 0')
+    parser.add_argument('--invalid-metadata', action='store_true',
+                        help='Make the metadata invalid')
+    parser.add_argument('--seed', type=int,
+                        help='Seed for the random number generator, to generate the same document each time')
+    args = parser.parse_args(sys.argv[2:])
+
+    output = sys.stdout.buffer if args.output == STDOUT_PATH else args.output
+    try:
+        summary = synthesize.write_document(output,
+                                            version=args.version,
+                                            n_features=args.features,
+                                            uncertainty=args.uncertainty,
+                                            uncertainty_metadata=False if args.no_uncertainty_metadata else None,
+                                            error_rate=args.error_rate,
+                                            invalid_metadata=args.invalid_metadata,
+                                            seed=args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    # Write the summary to standard error, so as not to mix it with a document written to standard output
+    print(f"Generated a {summary.version} document with {summary.features} features "
+          f"({summary.uncertainty_features} with uncertainty, {summary.invalid_features} invalid); "
+          f"expected validation errors: {summary.expected_errors}.", file=sys.stderr)
+    return EXIT_OK
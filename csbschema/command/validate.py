@@ -1,30 +1,323 @@
+import os
 import sys
-from typing import Union
+import glob
+import time
+import threading
+import contextlib
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
 import argparse
 import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 from csbschema.command import EXIT_DATAERR, EXIT_OK
-from csbschema import DEFAULT_VALIDATOR_VERSION, VALIDATORS, validate_data
+from csbschema import DEFAULT_VALIDATOR_VERSION, VALIDATORS, AUTO, validate_data, warmup, parsers, metrics, compression
+from csbschema.server import ValidationClient
 
 logger = logging.getLogger(__name__)
 
+# File name extensions of CSB documents found when searching directories
+DOCUMENT_SUFFIXES = ('.json', '.geojson')
+# File name extensions of CSB documents found when searching directories with --sequence
+SEQUENCE_SUFFIXES = ('.geojsons', '.geojsonl', '.ndjson', '.jsonl')
+# Path used to read a document from standard input
+STDIN_PATH = '-'
+
+# Validation server clients, one per thread
+_clients = threading.local()
+
+
+def _get_client(server: str) -> ValidationClient:
+    client = getattr(_clients, 'client', None)
+    if client is None:
+        client = _clients.client = ValidationClient(server)
+    return client
+
+
+def _document_suffix(path: Path) -> str:
+    """
+    :return: File name extension of a document, ignoring that of the compression format (e.g. '.json' for
+        'trackline.json.gz')
+    """
+    suffix = path.suffix.lower()
+    if suffix in compression.SUFFIXES:
+        suffix = Path(path.stem).suffix.lower()
+    return suffix
+
+
+def _expand_paths(paths: List[str], suffixes: Tuple[str, ...] = DOCUMENT_SUFFIXES) -> List[str]:
+    """
+    Expand directories (recursively) and glob patterns into a list of CSB document paths.
+    :param suffixes: File name extensions of the documents found when searching directories (which are also found
+        compressed, e.g. with the extension '.json.gz')
+    """
+    expanded = []
+    for p in paths:
+        if os.path.isdir(p):
+            expanded.extend(sorted([str(f) for f in Path(p).rglob('*')
+                                    if f.is_file() and _document_suffix(f) in suffixes]))
+        elif glob.has_magic(p):
+            expanded.extend(sorted([f for f in glob.glob(p, recursive=True) if os.path.isfile(f)]))
+        else:
+            expanded.append(p)
+    return expanded
+
+
+def _init_worker(version: str, compiled: bool, parser: str) -> None:
+    """
+    Set up a worker process: select the JSON parser, then compile the validator once so that it is warm for all
+    the files the worker validates.
+    """
+    parsers.set_parser(parser)
+    warmup(None if version == AUTO else [version], compiled=compiled)
+
+
+def _validate_file(path: str, version: str, stream: bool, compiled: bool,
+                   max_errors: Optional[int] = None,
+                   timings: bool = False,
+                   max_time_gap: Optional[float] = None,
+                   check_time_order: bool = False,
+                   feature_jobs: int = 1,
+                   server: Optional[str] = None,
+                   document: Optional[bytes] = None,
+                   xyz_data: Optional[str] = None,
+                   sequence: bool = False) -> dict:
+    """
+    Validate a single file, returning a summary of the result that is small enough to be cheaply sent back from a
+    worker process (i.e., the validated document is not included, and is freed as soon as it has been validated).
+    If server is not None, the file is validated by the validation server at that address. If document is not None,
+    it is validated rather than the file (and path is used only in the summary). If xyz_data is not None, it is the
+    path of the XYZ data described by the file, which are validated with it. If sequence is True, the file is a
+    GeoJSON text sequence.
+    """
+    start = time.perf_counter()
+    n_bytes = metrics.document_size(document if document is not None else path)
+    if xyz_data is not None and n_bytes is not None:
+        data_bytes = metrics.document_size(xyz_data)
+        n_bytes = n_bytes + data_bytes if data_bytes is not None else None
+    options = {}
+    if stream:
+        options['stream'] = True
+    if compiled:
+        options['compiled'] = True
+    if max_errors is not None:
+        options['max_errors'] = max_errors
+    if timings:
+        options['timings'] = True
+    if check_time_order:
+        options['check_time_order'] = True
+    if max_time_gap is not None:
+        options['max_time_gap'] = max_time_gap
+    if feature_jobs > 1:
+        options['feature_jobs'] = feature_jobs
+    if xyz_data is not None:
+        options['xyz_data'] = xyz_data
+    if sequence:
+        options['sequence'] = True
+    try:
+        if server is not None:
+            (valid, result) = _get_client(server).validate(document if document is not None else path,
+                                                           version=version, **options)
+        else:
+            (valid, result) = validate_data(document if document is not None else path, version=version,
+                                            return_document=False, **options)
+    except (OSError, ValueError, RuntimeError) as e:
+        return {'path': path, 'version': version, 'detection': None, 'valid': False, 'errors': [],
+                'truncated': False, 'exception': str(e), 'features': 0, 'bytes': n_bytes, 'timings': None,
+                'compression': None, 'elapsed': time.perf_counter() - start}
+    detection = result.get('detection')
+    return {'path': path, 'version': detection['version'] if detection is not None else version,
+            'detection': detection, 'valid': valid, 'errors': result.get('errors', []),
+            'truncated': result.get('truncated', False), 'exception': None,
+            'features': result.get('feature_count', 0), 'bytes': n_bytes, 'timings': result.get('timings'),
+            'compression': result.get('compression', result.get('xyz_data_compression')),
+            'elapsed': time.perf_counter() - start}
+
+
+def _report_file(summary: dict) -> None:
+    path = summary['path']
+    version = summary['version']
+    if summary['detection'] is not None:
+        print(f"Detected schema version {version} for {path}: {summary['detection']['reason']}")
+    if summary['exception'] is not None:
+        print(f"Unable to validate {path} against schema {version}: {summary['exception']}")
+    elif not summary['valid']:
+        print(f"Validation of {path} against schema {version} failed due to the following errors: ")
+        for e in summary['errors']:
+            print(f"Path: {e['path']}, error: {e['message']}")
+        if summary['truncated']:
+            print(f"Validation of {path} stopped after {len(summary['errors'])} error(s); "
+                  "there are further errors.")
+    else:
+        print(f"CSB data file '{path}' successfully validated against schema '{version}'.")
+    if summary['timings'] is not None:
+        phases = ', '.join(f"{name}: {duration:.6f} s" for (name, duration) in summary['timings'].items())
+        print(f"Timings for {path} ({summary['features']} features): {phases}")
+        if summary['compression'] is not None:
+            info = summary['compression']
+            total = max(summary['timings']['total'], 1e-9)
+            print(f"Decompressed {path} ({info['format']}): read {info['compressed_bytes']} bytes "
+                  f"({info['compressed_bytes'] / total / 1e6:.1f} MB/s compressed), "
+                  f"{info['uncompressed_bytes']} bytes ({info['uncompressed_bytes'] / total / 1e6:.1f} MB/s "
+                  'uncompressed)')
+
 
 def validate() -> Union[int, str]:
     parser = argparse.ArgumentParser(
         description='Validate CSB observation data and metadata using an IHO B12 schema.'
     )
-    parser.add_argument('-f', '--file', help='CSB JSON data file to validate', required=True)
+    parser.add_argument('paths', nargs='*',
+                        help='CSB JSON data files, directories (searched recursively for *.json and *.geojson '
+                             f"files), or glob patterns to validate. Use {STDIN_PATH} to read a document from "
+                             'standard input. Files compressed with gzip, bzip2, xz, or Zstandard (e.g. *.json.gz) '
+                             'are decompressed as they are read')
+    parser.add_argument('-f', '--file', action='append', default=[],
+                        help='CSB JSON data file to validate (may be given more than once)')
     parser.add_argument('--version',
-                        choices=VALIDATORS.keys(), default=DEFAULT_VALIDATOR_VERSION,
-                        help=f"CSB schema version to validate against. Default: {DEFAULT_VALIDATOR_VERSION}")
+                        choices=list(VALIDATORS.keys()) + [AUTO], default=DEFAULT_VALIDATOR_VERSION,
+                        help=f"CSB schema version to validate against. Use {AUTO} to detect the version of each "
+                             f"file from its contents. Default: {DEFAULT_VALIDATOR_VERSION}")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Number of worker processes used to validate files in parallel. '
+                             'Use 0 for one worker per CPU. Default: 1')
+    parser.add_argument('--feature-jobs', type=int, default=1, metavar='N',
+                        help='Number of worker processes used to validate the features of each file in parallel, '
+                             'for large files. Use 0 for one worker per CPU. Can\'t be used with --jobs other than 1 '
+                             '(not supported for XYZ metadata). Default: 1')
+    parser.add_argument('--stream', action='store_true',
+                        help='Validate features one at a time rather than loading whole documents into memory '
+                             '(not supported for XYZ metadata)')
+    parser.add_argument('--sequence', action='store_true',
+                        help='Files are GeoJSON text sequences (RFC 8142) or newline-delimited GeoJSON: a header '
+                             'record with the members of the FeatureCollection other than features, then one record '
+                             'per feature. Records are validated a batch at a time, and errors give line numbers. '
+                             f"Directories are searched for {', '.join('*' + s for s in SEQUENCE_SUFFIXES)} files "
+                             '(not supported for XYZ metadata)')
+    parser.add_argument('--compiled', action='store_true',
+                        help='Validate using code generated from the schema, which is faster than '
+                             'the generic JSON schema validator')
+    parser.add_argument('--parser', choices=(parsers.AUTO,) + parsers.BACKENDS, default=parsers.DEFAULT_PARSER,
+                        help='JSON parser used to read documents. If the parser is not installed, the standard '
+                             f"library parser is used. Default: {parsers.DEFAULT_PARSER}")
+    parser.add_argument('--server',
+                        help='Send documents to the validation server (see "csbschema serve") at this address '
+                             '(unix:PATH or HOST:PORT), rather than validating them in this process. Files are sent '
+                             "by path if they are under the server's --document-root, and otherwise sent whole")
+    parser.add_argument('--xyz-data', metavar='PATH',
+                        help='XYZ data file (delimited text with longitude, latitude, depth, time, and optionally '
+                             'uncertainty columns) described by the XYZ metadata file being validated, which is '
+                             'validated with it. Only one metadata file can be given')
+    parser.add_argument('--max-errors', type=int, default=None,
+                        help='Report at most this many errors in a file, and stop validating it once a further error '
+                             'is found')
+    parser.add_argument('--fail-fast', action='store_true',
+                        help='Report only the first error in a file, and stop validating it at the second '
+                             '(equivalent to --max-errors 1)')
+    parser.add_argument('--timings', action='store_true',
+                        help='Print the time taken by each phase of validation (loading the validator, parsing, '
+                             'structural and semantic validation), and the number of features, for each file')
+    parser.add_argument('--check-time-order', action='store_true',
+                        help='Check that features are in time order, i.e. that feature times neither go backwards '
+                             'nor are duplicated (not supported for XYZ metadata)')
+    parser.add_argument('--max-time-gap', type=float, default=None, metavar='SECONDS',
+                        help='Also check that there are no gaps of more than this many seconds between the times of '
+                             'consecutive features (implies --check-time-order)')
+    parser.add_argument('--metrics-file',
+                        help='Write metrics (files, bytes, and features validated, validation time, and errors by '
+                             'path and message) in Prometheus text format to this file, e.g. for the node_exporter '
+                             'textfile collector')
     args = parser.parse_args(sys.argv[2:])
 
-    (valid, result) = validate_data(args.file, version=args.version)
-    if not valid:
-        print(f"Validation of {args.file} against schema {args.version} failed due to the following errors: ")
-        for e in result['errors']:
-            print(f"Path: {e['path']}, error: {e['message']}")
+    paths = _expand_paths(args.file + args.paths, SEQUENCE_SUFFIXES if args.sequence else DOCUMENT_SUFFIXES)
+    if len(paths) == 0:
+        parser.error('at least one file, directory, or glob pattern to validate must be specified')
+    if args.stream and args.version.startswith('XYZ'):
+        parser.error('--stream is not supported for XYZ metadata')
+    if args.sequence:
+        if args.version.startswith('XYZ'):
+            parser.error('--sequence is not supported for XYZ metadata')
+        if args.stream:
+            parser.error('--sequence can\'t be used with --stream (sequences are always read a batch at a time)')
+    if (args.check_time_order or args.max_time_gap is not None) and args.version.startswith('XYZ'):
+        parser.error('--check-time-order and --max-time-gap are not supported for XYZ metadata')
+    if args.max_time_gap is not None and not args.max_time_gap > 0:
+        parser.error('--max-time-gap must be greater than 0')
+    if args.jobs < 0:
+        parser.error('--jobs must be 0 or greater')
+    if args.feature_jobs < 0:
+        parser.error('--feature-jobs must be 0 or greater')
+    feature_jobs = args.feature_jobs if args.feature_jobs > 0 else os.cpu_count()
+    if feature_jobs > 1:
+        if args.jobs != 1:
+            parser.error('--feature-jobs can\'t be used with --jobs other than 1')
+        if args.server is not None:
+            parser.error('--feature-jobs is not supported with --server')
+        if args.version.startswith('XYZ'):
+            parser.error('--feature-jobs is not supported for XYZ metadata')
+        if args.sequence:
+            parser.error('--feature-jobs is not supported with --sequence')
+    if args.xyz_data is not None:
+        if len(paths) != 1:
+            parser.error('--xyz-data requires exactly one XYZ metadata file')
+        if args.version != AUTO and not args.version.startswith('XYZ'):
+            parser.error('--xyz-data requires an XYZ schema version (or auto)')
+        if args.server is not None:
+            parser.error('--xyz-data is not supported with --server')
+        if args.stream or args.sequence or args.check_time_order or args.max_time_gap is not None or \
+                feature_jobs > 1:
+            parser.error('--xyz-data can\'t be used with --stream, --sequence, --check-time-order, --max-time-gap, '
+                         'or --feature-jobs')
+    if args.max_errors is not None and args.max_errors < 1:
+        parser.error('--max-errors must be 1 or greater')
+    max_errors = 1 if args.fail_fast else args.max_errors
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+    jobs = min(jobs, len(paths))
+    stdin_document = sys.stdin.buffer.read() if STDIN_PATH in paths else None
+    documents = [stdin_document if p == STDIN_PATH else None for p in paths]
+    labels = ['<stdin>' if p == STDIN_PATH else p for p in paths]
+
+    parsers.set_parser(args.parser)
+
+    registry = metrics.Registry() if args.metrics_file is not None else None
+    start = time.perf_counter()
+    n_failed = 0
+    n_features = 0
+    n = len(paths)
+    task_args = (labels, [args.version] * n, [args.stream] * n, [args.compiled] * n, [max_errors] * n,
+                 [args.timings] * n, [args.max_time_gap] * n, [args.check_time_order] * n, [feature_jobs] * n,
+                 [args.server] * n, documents, [args.xyz_data] * n, [args.sequence] * n)
+    with contextlib.ExitStack() as stack:
+        if jobs > 1:
+            if args.server is not None:
+                # The server does the work, so only threads are needed to have several requests in flight
+                executor = ThreadPoolExecutor(max_workers=jobs)
+            else:
+                # Each worker process compiles the validator once, then keeps it warm for all the files it validates
+                executor = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                               initargs=(args.version, args.compiled, args.parser))
+            summaries = stack.enter_context(executor).map(_validate_file, *task_args)
+        else:
+            summaries = map(_validate_file, *task_args)
+        for summary in summaries:
+            _report_file(summary)
+            n_failed += 0 if summary['valid'] else 1
+            n_features += summary['features']
+            if registry is not None:
+                # Metrics are recorded here rather than by validate_data, which may run in worker processes
+                registry.observe(summary['version'],
+                                 valid=None if summary['exception'] is not None else summary['valid'],
+                                 duration=summary['elapsed'], n_bytes=summary['bytes'],
+                                 n_features=summary['features'], errors=summary['errors'])
+    elapsed = time.perf_counter() - start
+
+    if len(paths) > 1:
+        rate_elapsed = max(elapsed, 1e-9)
+        print(f"Validated {len(paths)} files ({n_features} features) in {elapsed:.3f} s "
+              f"({len(paths) / rate_elapsed:.1f} files/s, {n_features / rate_elapsed:.1f} features/s) "
+              f"using {jobs} job(s): {len(paths) - n_failed} passed, {n_failed} failed.")
+    if registry is not None:
+        registry.write_textfile(args.metrics_file)
+
+    if n_failed > 0:
         return EXIT_DATAERR
-    else:
-        print(f"CSB data file '{args.file}' successfully validated against schema '{args.version}'.")
-        return EXIT_OK
+    return EXIT_OK
@@ -0,0 +1,311 @@
+"""
+Ahead-of-time compilation of CSB JSON schemas into specialized Python validation code.
+
+Each schema is translated into a Python module with a validation function for the whole document, and one for each
+schema definition. References to definitions are resolved at compile time and the referenced definition inlined
+(except for recursive references, which call the definition's function), and regular expressions are precompiled. The
+generated code reports the same errors, with the same paths and messages and in the same order, as
+jsonschema.Draft202012Validator does for the subset of JSON schema used by the CSB schemas. Schemas using keywords
+outside that subset cannot be compiled.
+
+Generated code is executed in memory, and never written to or read back from disk, so that only code generated by
+this process from the schema is ever run. Generating the code for a schema takes a few milliseconds and compiling it
+a few tens of milliseconds, which is done once per process (see csbschema.validators._get_compiled_validator).
+"""
+from __future__ import annotations
+
+import json
+import hashlib
+from types import ModuleType
+from typing import Any, Iterator, List, NamedTuple, Optional, Tuple
+
+# Increment when the generated code changes (recorded in the header of the generated code)
+COMPILER_VERSION = 1
+
+# Keywords that are annotations only, and so have no effect on validation
+_ANNOTATIONS = frozenset(('$schema', '$id', '$comment', 'title', 'description', 'definitions', '$defs',
+                          'examples', 'default', 'deprecated', 'readOnly', 'writeOnly', 'format'))
+
+_TYPE_CHECKS = {
+    'object': 'isinstance({x}, dict)',
+    'array': 'isinstance({x}, list)',
+    'string': 'isinstance({x}, str)',
+    'boolean': 'isinstance({x}, bool)',
+    'null': '{x} is None',
+    'number': '(type({x}) in _NUMBER_TYPES or (isinstance({x}, Number) and not isinstance({x}, bool)))',
+    'integer': '((isinstance({x}, int) and not isinstance({x}, bool)) '
+               'or (isinstance({x}, float) and {x}.is_integer()))'
+}
+
+_HEADER = '''# Generated by csbschema.compiler (version {version}) from {schema_id}. Do not edit.
+import re
+from numbers import Number
+
+_NUMBER_TYPES = (int, float)
+'''
+
+
+class UnsupportedSchemaError(Exception):
+    """
+    Raised when a schema uses JSON schema features that the compiler does not support.
+    """
+    pass
+
+
+class CompiledError(NamedTuple):
+    """
+    A validation error reported by a compiled validator, with the same path and message attributes as
+    jsonschema.ValidationError.
+    """
+    absolute_path: Tuple
+    message: str
+
+
+class _Path:
+    """
+    Expression for the path to an instance, built up at compile time so that path tuples are only created at
+    run time when an error is reported.
+    """
+    def __init__(self, base: str = 'path', elements: Tuple[str, ...] = ()):
+        self.base = base
+        self.elements = elements
+
+    def child(self, element_expr: str) -> _Path:
+        return _Path(self.base, self.elements + (element_expr,))
+
+    def expr(self) -> str:
+        if not self.elements:
+            return self.base
+        return f"{self.base} + ({', '.join(self.elements)},)"
+
+
+class _CodeGenerator:
+    def __init__(self, schema: dict, function_names: dict):
+        self.schema = schema
+        self.function_names = function_names
+        self.lines: List[str] = []
+        self.constants: List[str] = []
+        self._regexes = {}
+        self._counter = 0
+
+    def _name(self, prefix: str) -> str:
+        self._counter += 1
+        return f"{prefix}{self._counter}"
+
+    def _emit(self, indent: int, line: str) -> None:
+        self.lines.append('    ' * indent + line)
+
+    def _regex(self, pattern: str) -> str:
+        if pattern not in self._regexes:
+            name = f"_RE_{len(self._regexes)}"
+            self._regexes[pattern] = name
+            self.constants.append(f"{name} = re.compile({pattern!r})")
+        return self._regexes[pattern]
+
+    def _constant(self, value: Any) -> str:
+        name = self._name('_C_')
+        self.constants.append(f"{name} = {value!r}")
+        return name
+
+    def _resolve(self, ref: str) -> Tuple[str, Any]:
+        parts = ref.split('/')
+        if len(parts) != 3 or parts[0] != '#' or parts[1] not in ('definitions', '$defs'):
+            raise UnsupportedSchemaError(f"Unsupported reference: {ref}")
+        name = parts[2].replace('~1', '/').replace('~0', '~')
+        try:
+            return name, self.schema[parts[1]][name]
+        except KeyError:
+            raise UnsupportedSchemaError(f"Unresolvable reference: {ref}") from None
+
+    def _error(self, indent: int, path: _Path, errors: str, message_expr: str) -> None:
+        self._emit(indent, f"{errors}.append(({path.expr()}, {message_expr}))")
+
+    def generate(self, schema: Any, x: str, path: _Path, errors: str, indent: int,
+                 ref_stack: Tuple[str, ...]) -> None:
+        """
+        Emit code validating the instance in variable x against schema, appending errors to list errors.
+        """
+        if schema is True:
+            return
+        if schema is False or not isinstance(schema, dict):
+            raise UnsupportedSchemaError(f"Unsupported schema: {schema!r}")
+        if not any(k not in _ANNOTATIONS for k in schema):
+            return
+
+        for keyword, value in schema.items():
+            if keyword in _ANNOTATIONS:
+                continue
+            method = getattr(self, f"_keyword_{keyword.lstrip('$')}", None)
+            if method is None:
+                raise UnsupportedSchemaError(f"Unsupported keyword: {keyword}")
+            method(value, schema, x, path, errors, indent, ref_stack)
+
+    def _keyword_type(self, value, schema, x, path, errors, indent, ref_stack):
+        types = value if isinstance(value, list) else [value]
+        try:
+            checks = [_TYPE_CHECKS[t].format(x=x) for t in types]
+        except (KeyError, TypeError):
+            raise UnsupportedSchemaError(f"Unsupported type: {value!r}") from None
+        reprs = ', '.join([repr(t) for t in types])
+        self._emit(indent, f"if not ({' or '.join(checks)}):")
+        self._error(indent + 1, path, errors, f"repr({x}) + {f' is not of type {reprs}'!r}")
+
+    def _keyword_enum(self, value, schema, x, path, errors, indent, ref_stack):
+        if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+            raise UnsupportedSchemaError(f"Unsupported enum: {value!r}")
+        enum = self._name('_ENUM_')
+        self.constants.append(f"{enum} = frozenset({value!r})")
+        self._emit(indent, f"if not (isinstance({x}, str) and {x} in {enum}):")
+        self._error(indent + 1, path, errors, f"repr({x}) + {f' is not one of {value!r}'!r}")
+
+    def _keyword_required(self, value, schema, x, path, errors, indent, ref_stack):
+        self._emit(indent, f"if isinstance({x}, dict):")
+        for prop in value:
+            self._emit(indent + 1, f"if {prop!r} not in {x}:")
+            self._error(indent + 2, path, errors, repr(f"{prop!r} is a required property"))
+
+    def _keyword_properties(self, value, schema, x, path, errors, indent, ref_stack):
+        self._emit(indent, f"if isinstance({x}, dict):")
+        self._emit(indent + 1, 'pass')
+        for prop, subschema in value.items():
+            y = self._name('x')
+            self._emit(indent + 1, f"if {prop!r} in {x}:")
+            self._emit(indent + 2, f"{y} = {x}[{prop!r}]")
+            self.generate(subschema, y, path.child(repr(prop)), errors, indent + 2, ref_stack)
+
+    def _keyword_items(self, value, schema, x, path, errors, indent, ref_stack):
+        if 'prefixItems' in schema or not isinstance(value, (dict, bool)):
+            raise UnsupportedSchemaError('Unsupported items')
+        i = self._name('i')
+        y = self._name('x')
+        self._emit(indent, f"if isinstance({x}, list):")
+        self._emit(indent + 1, f"for {i}, {y} in enumerate({x}):")
+        self._emit(indent + 2, 'pass')
+        self.generate(value, y, path.child(i), errors, indent + 2, ref_stack)
+
+    def _keyword_minItems(self, value, schema, x, path, errors, indent, ref_stack):
+        message = ' should be non-empty' if value == 1 else ' is too short'
+        self._emit(indent, f"if isinstance({x}, list) and len({x}) < {value!r}:")
+        self._error(indent + 1, path, errors, f"repr({x}) + {message!r}")
+
+    def _keyword_maxItems(self, value, schema, x, path, errors, indent, ref_stack):
+        message = ' is expected to be empty' if value == 0 else ' is too long'
+        self._emit(indent, f"if isinstance({x}, list) and len({x}) > {value!r}:")
+        self._error(indent + 1, path, errors, f"repr({x}) + {message!r}")
+
+    def _keyword_pattern(self, value, schema, x, path, errors, indent, ref_stack):
+        regex = self._regex(value)
+        self._emit(indent, f"if isinstance({x}, str) and not {regex}.search({x}):")
+        self._error(indent + 1, path, errors, f"repr({x}) + {f' does not match {value!r}'!r}")
+
+    def _keyword_minimum(self, value, schema, x, path, errors, indent, ref_stack):
+        self._emit(indent, f"if {_TYPE_CHECKS['number'].format(x=x)} and {x} < {value!r}:")
+        self._error(indent + 1, path, errors, f"repr({x}) + {f' is less than the minimum of {value!r}'!r}")
+
+    def _keyword_maximum(self, value, schema, x, path, errors, indent, ref_stack):
+        self._emit(indent, f"if {_TYPE_CHECKS['number'].format(x=x)} and {x} > {value!r}:")
+        self._error(indent + 1, path, errors, f"repr({x}) + {f' is greater than the maximum of {value!r}'!r}")
+
+    def _keyword_oneOf(self, value, schema, x, path, errors, indent, ref_stack):
+        # Every branch is evaluated, which gives the same result as jsonschema, which fully validates branches
+        # until the first valid one, then checks the validity of the rest.
+        valid = self._name('valid')
+        reprs = self._constant([repr(subschema) for subschema in value])
+        self._emit(indent, f"{valid} = []")
+        for index, subschema in enumerate(value):
+            branch_errors = self._name('e')
+            self._emit(indent, f"{branch_errors} = []")
+            self.generate(subschema, x, path, branch_errors, indent, ref_stack)
+            self._emit(indent, f"if not {branch_errors}:")
+            self._emit(indent + 1, f"{valid}.append({index})")
+        self._emit(indent, f"if not {valid}:")
+        self._error(indent + 1, path, errors, f"repr({x}) + ' is not valid under any of the given schemas'")
+        self._emit(indent, f"elif len({valid}) > 1:")
+        self._error(indent + 1, path, errors,
+                    f"repr({x}) + ' is valid under each of ' + "
+                    f"', '.join([{reprs}[k] for k in {valid}[1:] + {valid}[:1]])")
+
+    def _keyword_ref(self, value, schema, x, path, errors, indent, ref_stack):
+        name, definition = self._resolve(value)
+        if name in ref_stack:
+            self._emit(indent, f"{self.function_names[name]}({x}, {path.expr()}, {errors})")
+        else:
+            self.generate(definition, x, path, errors, indent, ref_stack + (name,))
+
+
+def generate_source(schema: dict) -> str:
+    """
+    Generate the source of a Python module that validates documents against a schema. The module has a function
+    validate(instance, path, errors) that validates against the whole schema, and a dict DEFINITIONS mapping each
+    schema definition name to a function with the same signature. Errors are appended to errors as (path, message)
+    tuples, where path is the path to the instance with errors relative to the path passed in.
+    :param schema: Schema document
+    :raises UnsupportedSchemaError: If the schema uses JSON schema features not supported by the compiler
+    """
+    definitions = schema.get('definitions', {})
+    names = {name: f"_definition_{i}" for i, name in enumerate(definitions)}
+    generator = _CodeGenerator(schema, names)
+    function_lines = []
+    for name, definition in definitions.items():
+        generator.lines = []
+        generator.generate(definition, 'x', _Path(), 'errors', 1, (name,))
+        function_lines.append(f"def {names[name]}(x, path, errors):  # {name}")
+        function_lines.extend(generator.lines or ['    pass'])
+        function_lines.append('')
+        function_lines.append('')
+
+    generator.lines = []
+    generator.generate(schema, 'x', _Path(), 'errors', 1, ())
+    function_lines.append('def validate(x, path, errors):')
+    function_lines.extend(generator.lines or ['    pass'])
+    function_lines.append('')
+    function_lines.append('')
+    function_lines.append('DEFINITIONS = {')
+    function_lines.extend([f"    {name!r}: {function}," for name, function in names.items()])
+    function_lines.append('}')
+
+    source = _HEADER.format(version=COMPILER_VERSION, schema_id=schema.get('$id', 'schema'))
+    source += '\n'.join(generator.constants) + '\n\n\n'
+    source += '\n'.join(function_lines) + '\n'
+    return source
+
+
+class CompiledValidator:
+    """
+    Validator using code generated from a schema, with the same interface as jsonschema.Draft202012Validator
+    for the purposes of iterating over errors.
+    """
+    def __init__(self, schema: dict, module: ModuleType, *, definition: Optional[str] = None):
+        self.schema = schema
+        self._module = module
+        self._validate = module.validate if definition is None else module.DEFINITIONS[definition]
+
+    def definition(self, name: str) -> CompiledValidator:
+        """
+        :return: Validator for one of the schema's definitions
+        """
+        return CompiledValidator(self.schema, self._module, definition=name)
+
+    def iter_errors(self, instance: Any) -> Iterator[CompiledError]:
+        errors = []
+        self._validate(instance, (), errors)
+        for path, message in errors:
+            yield CompiledError(path, message)
+
+    def is_valid(self, instance: Any) -> bool:
+        errors = []
+        self._validate(instance, (), errors)
+        return len(errors) == 0
+
+
+def compile_schema(schema: dict) -> CompiledValidator:
+    """
+    Compile a schema into a validator.
+    :param schema: Schema document
+    :raises UnsupportedSchemaError: If the schema uses JSON schema features not supported by the compiler
+    """
+    digest = hashlib.sha256(json.dumps([COMPILER_VERSION, schema], sort_keys=True).encode('utf8')).hexdigest()
+    name = f"csbschema_compiled_{digest[:16]}"
+    module = ModuleType(name)
+    exec(compile(generate_source(schema), f"<{name}>", 'exec'), module.__dict__)
+    return CompiledValidator(schema, module)
@@ -0,0 +1,203 @@
+"""
+Transparent decompression of compressed CSB documents.
+
+Documents compressed with gzip, bzip2, xz, or Zstandard (e.g. trackline.json.gz) are recognized by the magic bytes at
+their start, whatever their file name, and are validated from a stream that decompresses them as they are read, so
+that they are never written out decompressed. When validating with stream=True (or sequence=True), memory use then
+stays bounded however large the decompressed document is; otherwise the decompressed document is read into memory
+(as a file-like object would be) to be parsed.
+
+Decompressing readers count the bytes read from the compressed document and the bytes decompressed, so that the
+throughput of both can be reported. Zstandard support needs the optional zstandard package.
+"""
+from __future__ import annotations
+
+import io
+import os
+import bz2
+import gzip
+import lzma
+import contextlib
+from typing import Any, BinaryIO, Iterator, NamedTuple, Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+ZSTD_AVAILABLE = zstandard is not None
+
+GZIP = 'gzip'
+BZIP2 = 'bzip2'
+XZ = 'xz'
+ZSTD = 'zstd'
+FORMATS = (GZIP, BZIP2, XZ, ZSTD)
+
+_MAGIC = (
+    (b'\x1f\x8b', GZIP),
+    (b'BZh', BZIP2),
+    (b'\xfd7zXZ\x00', XZ),
+    (b'\x28\xb5\x2f\xfd', ZSTD),
+)
+# Number of bytes needed to recognize any of the formats
+MAGIC_SIZE = max(len(magic) for (magic, _) in _MAGIC)
+# File name extensions of compressed documents
+SUFFIXES = ('.gz', '.bz2', '.xz', '.zst')
+
+
+class CompressionInfo(NamedTuple):
+    """
+    Compression format of a document, and the number of bytes read from it before and after decompression.
+    """
+    format: str
+    compressed_bytes: int
+    uncompressed_bytes: int
+
+
+def detect_compression(head: bytes) -> Optional[str]:
+    """
+    :param head: The first (at least MAGIC_SIZE) bytes of a document
+    :return: Compression format of the document (one of FORMATS), or None if it is not compressed
+    """
+    for (magic, fmt) in _MAGIC:
+        if head.startswith(magic):
+            return fmt
+    return None
+
+
+class _CountingReader(io.RawIOBase):
+    """
+    Binary file-like object that counts the bytes read from another.
+    """
+    def __init__(self, fp: BinaryIO):
+        super().__init__()
+        self._fp = fp
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._fp.read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def readall(self) -> bytes:
+        return self.read()
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seekable(self) -> bool:
+        return self._fp.seekable()
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._fp.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._fp.tell()
+
+
+class DecompressingReader(_CountingReader):
+    """
+    Binary file-like object from which a compressed document is read decompressed. It is seekable if the compressed
+    document is (and it is not Zstandard compressed), though seeking backwards means decompressing from the start.
+    """
+    def __init__(self, fp: BinaryIO, fmt: str):
+        """
+        :param fp: Binary file-like object from which the compressed document is read, from its current position.
+            It is not closed when the reader is closed.
+        :param fmt: Compression format of the document (one of FORMATS)
+        :raises ValueError: If the format is Zstandard, and the zstandard package is not installed
+        """
+        self.format = fmt
+        self._compressed = _CountingReader(fp)
+        if fmt == GZIP:
+            decompressed = gzip.GzipFile(fileobj=self._compressed, mode='rb')
+        elif fmt == BZIP2:
+            decompressed = bz2.BZ2File(self._compressed, mode='rb')
+        elif fmt == XZ:
+            decompressed = lzma.LZMAFile(self._compressed, mode='rb')
+        elif fmt == ZSTD:
+            if not ZSTD_AVAILABLE:
+                raise ValueError('Document is Zstandard compressed, but the zstandard package is not installed')
+            decompressed = zstandard.ZstdDecompressor().stream_reader(self._compressed, read_across_frames=True,
+                                                                     closefd=False)
+        else:
+            raise ValueError(f"Unknown compression format: {fmt}")
+        super().__init__(decompressed)
+
+    def seekable(self) -> bool:
+        return self.format != ZSTD and self._compressed.seekable()
+
+    def close(self) -> None:
+        if not self.closed:
+            self._fp.close()
+        super().close()
+
+    @property
+    def info(self) -> CompressionInfo:
+        return CompressionInfo(self.format, self._compressed.bytes_read, self.bytes_read)
+
+
+def _is_path(document: Any) -> bool:
+    return isinstance(document, (str, os.PathLike))
+
+
+def _peek(f: BinaryIO) -> Optional[bytes]:
+    """
+    :return: The first MAGIC_SIZE bytes of a file-like object (from its current position), without consuming them,
+        or None if that is not possible (i.e. it has no peek method and is not seekable)
+    """
+    if hasattr(f, 'peek'):
+        return f.peek(MAGIC_SIZE)[:MAGIC_SIZE]
+    if f.seekable():
+        position = f.tell()
+        head = f.read(MAGIC_SIZE)
+        f.seek(position)
+        return head
+    return None
+
+
+@contextlib.contextmanager
+def open_document(document: Any) -> Iterator[Union[Any, DecompressingReader]]:
+    """
+    :param document: A document as given to validate_data: a path, a buffer, a binary file-like object, or an
+        already parsed document. A file-like object is only checked for compression if it can be peeked at or
+        seeked.
+    :return: Context manager giving a DecompressingReader for the document, if it is compressed, otherwise the
+        document itself (so that uncompressed files are still memory-mapped, and buffers are parsed in place)
+    :raises ValueError: If the document is Zstandard compressed, and the zstandard package is not installed
+    """
+    if isinstance(document, (bytes, bytearray, memoryview)):
+        fmt = detect_compression(bytes(document[:MAGIC_SIZE]))
+        if fmt is None:
+            yield document
+        else:
+            with DecompressingReader(io.BytesIO(document), fmt) as reader:
+                yield reader
+    elif _is_path(document):
+        f = open(document, 'rb')
+        try:
+            fmt = detect_compression(f.read(MAGIC_SIZE))
+            if fmt is None:
+                f.close()
+                yield document
+            else:
+                f.seek(0)
+                with DecompressingReader(f, fmt) as reader:
+                    yield reader
+        finally:
+            f.close()
+    elif hasattr(document, 'read'):
+        head = _peek(document)
+        fmt = detect_compression(head) if head is not None else None
+        if fmt is None:
+            yield document
+        else:
+            with DecompressingReader(document, fmt) as reader:
+                yield reader
+    else:
+        yield document
@@ -0,0 +1,218 @@
+"""
+Detection of the schema version of a CSB document, for validate_data(..., version='auto').
+
+The version is chosen from cheap markers in the top-level members of the document, without validating it:
+    - GeoJSON documents (with 'type' 'FeatureCollection' or a 'features' member) are B12 3.1.0 if their
+      'properties' have a 'trustedNode' member, and B12 3.0.0 if they have a 'convention' or 'providerContactPoint'
+      member. Anything else is XYZ metadata, which is 3.1.0 if it has a 'trustedNode' member, and 3.0.0 if it has a
+      'convention' or 'providerContactPoint' member.
+    - Revisions of the schema for a version do not all accept the same documents: later revisions add processing
+      step types (e.g. Uncertainty, in 2023-08) and rename others (the TimeStampInterpolation step's type is
+      'soundSpeed' before 2024-04). The latest revision that accepts every processing step type used by the document
+      (in 'processing', or for B12 3.0.0, 'lineage') is used, or if none does, the latest revision. The document is
+      then validated once, against that revision only.
+The convention named by the document (e.g. 'GeoJSON CSB 3.1') is not used to decide, as the layout of the document
+is a more reliable marker: a document with a trustedNode but the convention 'GeoJSON CSB 3.0' is validated against
+the B12 3.1.0 schema, which reports the wrong convention. Nor does the convention name the revision. If there are no
+markers, the default version for the layout is used, so that validation reports what is missing.
+"""
+from __future__ import annotations
+
+import io
+import json
+import functools
+from typing import FrozenSet, NamedTuple, Optional, Tuple
+
+from csbschema import (B12_VERSION_3_1_0_2024_04, B12_VERSION_3_1_0_2023_08, B12_VERSION_3_1_0_2023_03,
+                       B12_VERSION_3_0_0_2023_08, B12_VERSION_3_0_0_2023_03, XYZ_B12_VERSION_3_1_0_2024_04,
+                       XYZ_B12_VERSION_3_1_0_2023_08, XYZ_B12_VERSION_3_0_0_2023_08, XYZ_B12_VERSION_3_0_0_2023_03,
+                       SCHEMA_RESOURCES, stream, textseq, validators)
+
+AUTO = 'auto'
+
+_FEATURES = 'features'
+_B12_3_0_0_MEMBERS = ('convention', 'providerContactPoint')
+
+# Revisions of the schema for each version, latest first
+_REVISIONS = {
+    B12_VERSION_3_1_0_2024_04: (B12_VERSION_3_1_0_2024_04, B12_VERSION_3_1_0_2023_08, B12_VERSION_3_1_0_2023_03),
+    B12_VERSION_3_0_0_2023_08: (B12_VERSION_3_0_0_2023_08, B12_VERSION_3_0_0_2023_03),
+    XYZ_B12_VERSION_3_1_0_2024_04: (XYZ_B12_VERSION_3_1_0_2024_04, XYZ_B12_VERSION_3_1_0_2023_08),
+    XYZ_B12_VERSION_3_0_0_2023_08: (XYZ_B12_VERSION_3_0_0_2023_08, XYZ_B12_VERSION_3_0_0_2023_03),
+}
+
+
+class Detection(NamedTuple):
+    """
+    Schema version detected for a document, and how it was detected.
+    """
+    version: str
+    reason: str
+
+
+def _describe_convention(metadata: dict) -> str:
+    convention = metadata.get('convention')
+    return f" (convention {convention!r})" if convention is not None else ''
+
+
+@functools.lru_cache(maxsize=None)
+def _step_types(version: str) -> FrozenSet[str]:
+    """
+    :return: Types of the processing steps accepted by the schema for a version
+    """
+    definitions = validators._get_validator(SCHEMA_RESOURCES[version]).schema['definitions']
+    types = set()
+    for step in definitions['Processing']['items']['oneOf']:
+        types.update(definitions[step['$ref'].rsplit('/', 1)[-1]]['properties']['type'].get('enum', ()))
+    return frozenset(types)
+
+
+def _document_step_types(document: dict, metadata: dict) -> FrozenSet[str]:
+    """
+    :param metadata: Metadata of the document: its 'properties' if it is a GeoJSON document, otherwise the document
+    :return: Types of the processing steps in the document's metadata
+    """
+    for steps in (metadata.get('processing'), document.get('lineage')):
+        if isinstance(steps, list):
+            return frozenset(step['type'] for step in steps
+                             if isinstance(step, dict) and isinstance(step.get('type'), str))
+    return frozenset()
+
+
+def _revision(detection: Detection, document: dict, metadata: dict) -> Detection:
+    """
+    :return: The latest revision of the detected version that accepts the types of all the document's processing
+        steps, or if there is none, the detected version
+    """
+    types = _document_step_types(document, metadata)
+    for version in _REVISIONS[detection.version]:
+        if types <= _step_types(version):
+            break
+    else:
+        return detection
+    if version == detection.version:
+        return detection
+    earlier = ', '.join([repr(t) for t in sorted(types - _step_types(detection.version))])
+    return Detection(version, f"{detection.reason}, and processing step types of an earlier revision ({earlier})")
+
+
+def detect_version(document) -> Detection:
+    """
+    :param document: Parsed document, or (when streaming) the top-level members of the document other than 'features',
+        with 'features' present (with any value) if the document has that member
+    :return: The schema version to validate the document against, and how it was detected
+    """
+    if not isinstance(document, dict):
+        return _detect_layout(document)
+    if document.get('type') == 'FeatureCollection' or _FEATURES in document:
+        metadata = document.get('properties')
+        metadata = metadata if isinstance(metadata, dict) else {}
+    else:
+        metadata = document
+    return _revision(_detect_layout(document), document, metadata)
+
+
+def _detect_layout(document) -> Detection:
+    """
+    :return: The latest revision of the schema version for the document's layout
+    """
+    if not isinstance(document, dict):
+        return Detection(B12_VERSION_3_1_0_2024_04, 'document is not a JSON object; using the default version')
+
+    if document.get('type') == 'FeatureCollection' or _FEATURES in document:
+        properties = document.get('properties')
+        properties = properties if isinstance(properties, dict) else {}
+        trusted_node = properties.get('trustedNode')
+        if isinstance(trusted_node, dict):
+            return Detection(B12_VERSION_3_1_0_2024_04,
+                             f"GeoJSON document with properties.trustedNode{_describe_convention(trusted_node)}")
+        for member in _B12_3_0_0_MEMBERS:
+            if member in properties:
+                return Detection(B12_VERSION_3_0_0_2023_08,
+                                 f"GeoJSON document with properties.{member}{_describe_convention(properties)}")
+        return Detection(B12_VERSION_3_1_0_2024_04,
+                         'GeoJSON document without trustedNode, convention, or providerContactPoint properties; '
+                         'using the default version')
+
+    trusted_node = document.get('trustedNode')
+    if isinstance(trusted_node, dict):
+        return Detection(XYZ_B12_VERSION_3_1_0_2024_04,
+                         f"XYZ metadata with trustedNode{_describe_convention(trusted_node)}")
+    for member in _B12_3_0_0_MEMBERS:
+        if member in document:
+            return Detection(XYZ_B12_VERSION_3_0_0_2023_08,
+                             f"XYZ metadata with {member}{_describe_convention(document)}")
+    return Detection(XYZ_B12_VERSION_3_1_0_2024_04,
+                     'XYZ metadata without trustedNode, convention, or providerContactPoint members; '
+                     'using the default XYZ version')
+
+
+def read_header(document: validators.DocumentSource) -> dict:
+    """
+    Read the top-level members of a document other than 'features' (which is given the value []), without loading
+    the features into memory. Reading stops at the features if 'properties' has already been read.
+    :param document: Path of a JSON document, a buffer containing a JSON document, or a binary file-like object. A
+        file-like object is read from its current position, which should be restored (if it is seekable) before
+        the document is read again.
+    :return: Top-level members of the document, or the whole document if it is not a JSON object
+    """
+    header = {}
+    with validators._open_binary(document) as f:
+        try:
+            for key, value in stream.iter_object(f, stream_arrays=(_FEATURES,)):
+                if isinstance(value, stream.ArrayElements):
+                    header[key] = []
+                    if 'properties' in header:
+                        break
+                else:
+                    header[key] = value
+        except stream.NotAnObjectError as e:
+            return e.value
+    return header
+
+
+def read_sequence_header(document: validators.DocumentSource) -> dict:
+    """
+    Read the header record of a GeoJSON text sequence (see csbschema.textseq), as read_header does for a document.
+    As the features of a sequence follow its header, the header is always taken to be that of a GeoJSON document.
+    """
+    with validators._open_binary(document) as f:
+        header = textseq.read_header(f)
+    if isinstance(header, dict):
+        header.setdefault(_FEATURES, [])
+    return header
+
+
+def detect(document: validators.DocumentSource, *,
+           stream: bool = False,
+           sequence: bool = False) -> Tuple[Detection, validators.DocumentSource]:
+    """
+    Detect the schema version of a document, reading it only once.
+    :param document: Document to validate (see validate_data)
+    :param stream: If True, only read the top-level members of the document other than its features, so that the
+        document can then be validated in streaming mode. Otherwise, parse the whole document.
+    :param sequence: If True, the document is a GeoJSON text sequence, of which only the header record is read.
+    :return: Tuple of the detected version, and the document to validate: the parsed document, or if stream or
+        sequence is True, the document (or if it is a file-like object that can't be read twice, its contents)
+    """
+    if validators._is_parsed(document):
+        return detect_version(document), document
+    if not stream and not sequence:
+        parsed = validators._open_document(document)
+        if validators._is_parsed(parsed):
+            return detect_version(parsed), parsed
+        # A JSON value that is not an object or array (e.g. a string) can't be told apart from a path once parsed,
+        # so is given to the validator as JSON
+        return detect_version(parsed), json.dumps(parsed).encode('utf8')
+
+    position: Optional[int] = None
+    if hasattr(document, 'read'):
+        if document.seekable():
+            position = document.tell()
+        else:
+            document = io.BytesIO(document.read())
+            position = 0
+    detection = detect_version(read_sequence_header(document) if sequence else read_header(document))
+    if position is not None:
+        document.seek(position)
+    return detection, document
@@ -0,0 +1,182 @@
+"""
+Bulk structural screening of B12 GeoJSON features using NumPy.
+
+Almost all features in a CSB trackline have exactly the same, simple, structure. Rather than walk the
+GeoJSONFeature schema with jsonschema for every feature, the fields of all features are pulled into arrays and
+checked in bulk. Only features that fail these checks, or which have keys other than the ones checked (e.g. 'id' or
+'bbox'), need to be validated against the schema to find out what is wrong with them. The checks are exactly those
+implied by the schema, so a feature passing them is guaranteed to be valid according to the schema.
+
+NumPy is an optional dependency; if it is not installed, the fast path is not available.
+"""
+from __future__ import annotations
+
+from itertools import chain
+from typing import Any, List, Optional, Tuple
+
+from csbschema import timestamps
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+AVAILABLE = np is not None
+
+_FEATURE_KEYS = frozenset(('type', 'properties', 'geometry'))
+_GEOMETRY_KEYS = frozenset(('type', 'coordinates'))
+_DATUM_KEYS = frozenset(('depth', 'time'))
+_DATUM_UNCERT_KEYS = frozenset(('depth', 'time', 'uncertainty'))
+
+_NUMBER_ARRAY = {'type': 'array', 'items': {'type': 'number'}}
+# Definitions, less 'title' and 'description' annotations, for which the bulk checks are equivalent
+_GEOJSON_FEATURE = {
+    'type': 'object',
+    'required': ['type', 'properties', 'geometry'],
+    'properties': {
+        'type': {'type': 'string', 'enum': ['Feature']},
+        'id': {'oneOf': [{'type': 'number'}, {'type': 'string'}]},
+        'properties': {'$ref': '#/definitions/CSBDatum'},
+        'geometry': {'oneOf': [
+            {'type': 'null'},
+            {'type': 'object',
+             'required': ['type', 'coordinates'],
+             'properties': {
+                 'type': {'type': 'string', 'enum': ['Point']},
+                 'coordinates': {'minItems': 2, **_NUMBER_ARRAY},
+                 'bbox': {'minItems': 4, **_NUMBER_ARRAY}
+             }}
+        ]}
+    }
+}
+_CSB_DATUM = {
+    'type': 'object',
+    'required': ['depth', 'time'],
+    'properties': {
+        'depth': {'type': 'number'},
+        'time': {'$ref': '#/definitions/RFC3339_time'}
+    }
+}
+_CSB_DATUM_UNCERT = {
+    'type': 'object',
+    'required': ['depth', 'time'],
+    'properties': {
+        'depth': {'type': 'number'},
+        'time': {'$ref': '#/definitions/RFC3339_time'},
+        'uncertainty': {'minItems': 3, 'maxItems': 3, **_NUMBER_ARRAY}
+    }
+}
+
+
+def _strip_annotations(schema: Any) -> Any:
+    if isinstance(schema, dict):
+        return {k: _strip_annotations(v) for k, v in schema.items() if k not in ('title', 'description')}
+    if isinstance(schema, list):
+        return [_strip_annotations(v) for v in schema]
+    return schema
+
+
+class FeatureSpec:
+    """
+    The parts of a schema's GeoJSONFeature definition that vary between schema versions.
+    """
+    __slots__ = ('time_format', 'uncertainty')
+
+    def __init__(self, time_pattern: str, uncertainty: bool):
+        self.time_format = timestamps.TimeFormat(time_pattern)
+        self.uncertainty = uncertainty
+
+    @classmethod
+    def from_schema(cls, schema: dict) -> Optional[FeatureSpec]:
+        """
+        :param schema: B12 GeoJSON schema document
+        :return: FeatureSpec, or None if NumPy is not available or the schema's feature definitions are not ones
+            for which the bulk checks are known to be equivalent to schema validation.
+        """
+        if not AVAILABLE:
+            return None
+        definitions = match_feature_definitions(schema)
+        if definitions is None:
+            return None
+        return cls(*definitions)
+
+
+def match_feature_definitions(schema: dict) -> Optional[Tuple[str, bool]]:
+    """
+    :param schema: B12 GeoJSON schema document
+    :return: Tuple of the RFC3339_time pattern, and whether CSBDatum has the optional 'uncertainty' member, if the
+        schema's feature definitions are ones known to this module, otherwise None
+    """
+    definitions = _strip_annotations(schema.get('definitions', {}))
+    if definitions.get('GeoJSONFeature') != _GEOJSON_FEATURE:
+        return None
+    datum = definitions.get('CSBDatum')
+    if datum not in (_CSB_DATUM, _CSB_DATUM_UNCERT):
+        return None
+    time = definitions.get('RFC3339_time', {})
+    if set(time.keys()) != {'type', 'pattern'} or time['type'] != 'string':
+        return None
+    return time['pattern'], datum == _CSB_DATUM_UNCERT
+
+
+def _is_number(types: np.ndarray) -> np.ndarray:
+    # Equivalent to the JSON schema 'number' type for values decoded from JSON (note that bool is not a number)
+    return (types == float) | (types == int)
+
+
+def _all_numbers(arrays: List[list]) -> np.ndarray:
+    """
+    :return: Mask of which of the lists in arrays contain only numbers
+    """
+    lengths = np.fromiter(map(len, arrays), dtype=np.intp, count=len(arrays))
+    types = np.fromiter(map(type, chain.from_iterable(arrays)), dtype=object, count=int(lengths.sum()))
+    owners = np.repeat(np.arange(len(arrays)), lengths)
+    return np.bincount(owners[~_is_number(types)], minlength=len(arrays)) == 0
+
+
+def screen_features(features: list, spec: FeatureSpec) -> np.ndarray:
+    """
+    Check features in bulk.
+    :param features: List of GeoJSON features
+    :param spec: FeatureSpec of the schema features are being validated against
+    :return: Indices (in ascending order) of features that must be validated against the schema
+    """
+    n = len(features)
+    # Feature structure; anything else (including optional keys like 'id') is left to schema validation
+    ok = np.fromiter((type(f) is dict and f.keys() == _FEATURE_KEYS and f['type'] == 'Feature'
+                      for f in features), dtype=bool, count=n)
+    candidates = np.flatnonzero(ok)
+
+    geometries = [features[i]['geometry'] for i in candidates]
+    properties = [features[i]['properties'] for i in candidates]
+    m = len(candidates)
+    datum_keys = (_DATUM_KEYS, _DATUM_UNCERT_KEYS) if spec.uncertainty else (_DATUM_KEYS,)
+    struct_ok = np.fromiter((type(g) is dict and g.keys() == _GEOMETRY_KEYS and g['type'] == 'Point'
+                             and type(g['coordinates']) is list and len(g['coordinates']) >= 2
+                             and type(p) is dict and p.keys() in datum_keys
+                             for g, p in zip(geometries, properties)), dtype=bool, count=m)
+    ok[candidates[~struct_ok]] = False
+    candidates = candidates[struct_ok]
+    geometries = [g for g, keep in zip(geometries, struct_ok) if keep]
+    properties = [p for p, keep in zip(properties, struct_ok) if keep]
+    m = len(candidates)
+
+    # Coordinates and depth must be numbers
+    valid = _all_numbers([g['coordinates'] for g in geometries])
+    valid &= _is_number(np.fromiter((type(p['depth']) for p in properties), dtype=object, count=m))
+
+    # Time must be an RFC 3339 string
+    valid &= timestamps.check_times([p['time'] for p in properties], spec.time_format)[0]
+
+    # Uncertainty, where present, must be a 3-tuple of numbers
+    if spec.uncertainty:
+        has_uncert = np.fromiter(('uncertainty' in p for p in properties), dtype=bool, count=m)
+        uncert_idx = np.flatnonzero(has_uncert)
+        uncertainties = [properties[i]['uncertainty'] for i in uncert_idx]
+        uncert_ok = np.fromiter((type(u) is list and len(u) == 3 for u in uncertainties),
+                                dtype=bool, count=len(uncertainties))
+        uncert_ok[uncert_ok] = _all_numbers([u for u, keep in zip(uncertainties, uncert_ok) if keep])
+        valid[uncert_idx] &= uncert_ok
+
+    ok[candidates] = valid
+    return np.flatnonzero(~ok)
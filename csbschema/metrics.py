@@ -0,0 +1,227 @@
+"""
+Validation metrics, exported in the Prometheus text exposition format.
+
+Metrics are opt-in. Once enable() has been called, every call to validate_data in the process updates the registry;
+until then, validate_data does no more than check whether metrics are enabled. The 'csbschema validate' command
+(--metrics-file) and the validation server (--metrics) keep their own registries, as they validate documents in
+worker processes. The metrics are:
+    - csbschema_validations_total{version, result}: documents validated, where result is 'valid', 'invalid', or
+      'error' (the document could not be read or parsed)
+    - csbschema_validated_bytes_total{version}: size of the documents validated (if known, e.g. not for documents
+      given as an already parsed dict)
+    - csbschema_validated_features_total{version}: features in the documents validated
+    - csbschema_validation_duration_seconds{version}: histogram of the time taken to validate each document
+    - csbschema_validation_errors_total{version, path, message}: validation errors. Array indices in paths are
+      replaced by '*' (e.g. /features/*/properties), and once max_error_series distinct (version, path, message)
+      combinations have been seen, further errors are counted with the path and message 'other'.
+"""
+from __future__ import annotations
+
+import os
+import re
+import bisect
+import threading
+from pathlib import Path
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+MAX_ERROR_SERIES = 1000
+OVERFLOW = 'other'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+VALID = 'valid'
+INVALID = 'invalid'
+ERROR = 'error'
+
+_INDEX_RE = re.compile(r'/[0-9]+(?=/|$)')
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels) -> str:
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + '}'
+
+
+def error_path(path: str) -> str:
+    """
+    :return: JSON path of an error, with array indices replaced by '*'
+    """
+    return _INDEX_RE.sub('/*', path)
+
+
+def document_size(document) -> Optional[int]:
+    """
+    :param document: A document as given to validate_data
+    :return: Size of the document in bytes, or None if it isn't known (e.g. for an already parsed document, or a
+        file-like object)
+    """
+    if isinstance(document, (str, os.PathLike)):
+        try:
+            return os.path.getsize(document)
+        except OSError:
+            return None
+    if isinstance(document, memoryview):
+        return document.nbytes
+    if isinstance(document, (bytes, bytearray)):
+        return len(document)
+    return None
+
+
+def feature_count(result: dict) -> Optional[int]:
+    """
+    :param result: Result returned by validate_data
+    :return: Number of features in the validated document, or None if it isn't known
+    """
+    if 'feature_count' in result:
+        return result['feature_count']
+    document = result.get('document')
+    if isinstance(document, dict) and isinstance(document.get('features'), list):
+        return len(document['features'])
+    return None
+
+
+class Registry:
+    """
+    Counters and histograms of validations. Thread-safe.
+    """
+    def __init__(self, *,
+                 buckets: Iterable[float] = DEFAULT_BUCKETS,
+                 max_error_series: int = MAX_ERROR_SERIES):
+        """
+        :param buckets: Upper bounds, in seconds, of the validation duration histogram buckets
+        :param max_error_series: Maximum number of distinct (version, path, message) label combinations of
+            csbschema_validation_errors_total
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.max_error_series = max_error_series
+        self._lock = threading.Lock()
+        self._validations: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._bytes: Dict[str, int] = defaultdict(int)
+        self._features: Dict[str, int] = defaultdict(int)
+        # Per version: count of durations in each bucket (the last being +Inf), sum, and count
+        self._duration_buckets: Dict[str, List[int]] = {}
+        self._duration_sum: Dict[str, float] = defaultdict(float)
+        self._errors: Dict[Tuple[str, str, str], int] = defaultdict(int)
+
+    def observe(self, version: str, *,
+                valid: Optional[bool],
+                duration: float,
+                n_bytes: Optional[int] = None,
+                n_features: Optional[int] = None,
+                errors: Iterable[Mapping] = ()) -> None:
+        """
+        Record the validation of a document.
+        :param version: Schema version the document was validated against
+        :param valid: Whether the document was valid, or None if it could not be validated (e.g. it could not be
+            read or parsed)
+        :param duration: Time taken to validate the document, in seconds
+        :param n_bytes: Size of the document in bytes, if known
+        :param n_features: Number of features in the document, if known
+        :param errors: Validation errors, which can be read like {'path': ..., 'message': ...}
+        """
+        result = ERROR if valid is None else VALID if valid else INVALID
+        error_counts: Dict[Tuple[str, str], int] = defaultdict(int)
+        for e in errors:
+            error_counts[(error_path(e['path']), e['message'])] += 1
+
+        with self._lock:
+            self._validations[(version, result)] += 1
+            if n_bytes is not None:
+                self._bytes[version] += n_bytes
+            if n_features is not None:
+                self._features[version] += n_features
+            if version not in self._duration_buckets:
+                self._duration_buckets[version] = [0] * (len(self.buckets) + 1)
+            self._duration_buckets[version][bisect.bisect_left(self.buckets, duration)] += 1
+            self._duration_sum[version] += duration
+            for (path, message), n in error_counts.items():
+                key = (version, path, message)
+                if key not in self._errors and len(self._errors) >= self.max_error_series:
+                    key = (version, OVERFLOW, OVERFLOW)
+                self._errors[key] += n
+
+    def to_prometheus(self) -> str:
+        """
+        :return: The metrics in the Prometheus text exposition format
+        """
+        lines = []
+
+        def header(name: str, kind: str, description: str) -> None:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            header('csbschema_validations_total', 'counter', 'CSB documents validated, by schema version and result.')
+            for (version, result), n in sorted(self._validations.items()):
+                lines.append(f"csbschema_validations_total{_labels(version=version, result=result)} {n}")
+
+            header('csbschema_validated_bytes_total', 'counter', 'Size of the CSB documents validated.')
+            for version, n in sorted(self._bytes.items()):
+                lines.append(f"csbschema_validated_bytes_total{_labels(version=version)} {n}")
+
+            header('csbschema_validated_features_total', 'counter', 'Features in the CSB documents validated.')
+            for version, n in sorted(self._features.items()):
+                lines.append(f"csbschema_validated_features_total{_labels(version=version)} {n}")
+
+            name = 'csbschema_validation_duration_seconds'
+            header(name, 'histogram', 'Time taken to validate each CSB document.')
+            for version, counts in sorted(self._duration_buckets.items()):
+                cumulative = 0
+                for le, n in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += n
+                    bound = '+Inf' if le == float('inf') else repr(float(le))
+                    lines.append(f"{name}_bucket{_labels(version=version, le=bound)} {cumulative}")
+                lines.append(f"{name}_sum{_labels(version=version)} {self._duration_sum[version]!r}")
+                lines.append(f"{name}_count{_labels(version=version)} {cumulative}")
+
+            header('csbschema_validation_errors_total', 'counter',
+                   'CSB validation errors, by schema version, JSON path, and message.')
+            for (version, path, message), n in sorted(self._errors.items()):
+                lines.append(f"csbschema_validation_errors_total{_labels(version=version, path=path, message=message)}"
+                             f" {n}")
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path: Union[str, Path]) -> None:
+        """
+        Write the metrics in the Prometheus text exposition format (e.g. for the node_exporter textfile collector).
+        The file is replaced atomically, so that it is never read half-written.
+        """
+        partial = f"{path}.{os.getpid()}.tmp"
+        with open(partial, 'w', encoding='utf8') as f:
+            f.write(self.to_prometheus())
+        os.replace(partial, path)
+
+
+_registry: Optional[Registry] = None
+
+
+def enable(registry: Optional[Registry] = None) -> Registry:
+    """
+    Record metrics for every call to validate_data in this process.
+    :param registry: Registry to record metrics in. If None, the registry already enabled is kept, or a new one is
+        created.
+    :return: The enabled registry
+    """
+    global _registry
+    if registry is None:
+        registry = _registry if _registry is not None else Registry()
+    _registry = registry
+    return registry
+
+
+def disable() -> None:
+    """
+    Stop recording metrics for calls to validate_data.
+    """
+    global _registry
+    _registry = None
+
+
+def get_registry() -> Optional[Registry]:
+    """
+    :return: The enabled registry, or None if metrics are not enabled
+    """
+    return _registry
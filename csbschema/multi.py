@@ -0,0 +1,89 @@
+"""
+Validation of one document against several schema versions, parsing it only once.
+
+The parsed document is shared by the validators, which do not modify it. With jobs > 1, the versions are validated
+in parallel in worker processes forked after the document has been parsed, so that each worker has the parsed
+document without it being copied or pickled. Where fork is not available (e.g. on Windows), threads are used
+instead, which (because of the GIL) share the parse but do not validate in parallel.
+"""
+from __future__ import annotations
+
+import json
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterable, Tuple
+
+import csbschema
+from csbschema import validators, compression
+
+# Parsed document shared with forked worker processes
+_document = None
+
+
+def _set_document(document) -> None:
+    global _document
+    _document = document
+
+
+def _validate_shared(version: str, kwargs: dict) -> Tuple[bool, dict]:
+    """
+    Validate the shared document in a worker process. The document is left out of the result, so that it is not
+    pickled back to the parent process, which already has it.
+    """
+    (valid, result) = csbschema.validate_data(_document, version=version, **kwargs)
+    result.pop('document', None)
+    return valid, result
+
+
+def _executor(document, jobs: int) -> Executor:
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('fork'),
+                                   initializer=_set_document, initargs=(document,))
+    return ThreadPoolExecutor(max_workers=jobs, thread_name_prefix='csbschema')
+
+
+def validate_multi(document_path: validators.DocumentSource, *,
+                   versions: Iterable[str],
+                   jobs: int = 1,
+                   **kwargs) -> Dict[str, Tuple[bool, dict]]:
+    """
+    Validate a document against several schema versions, parsing it only once.
+    :param document_path: Document to be validated (see csbschema.validate_data)
+    :param versions: Versions of schema validators to validate the document against
+    :param jobs: Number of versions to validate in parallel
+    :param kwargs: Additional keyword arguments passed to csbschema.validate_data for each version (e.g.
+        return_document=False, max_errors). Streaming and GeoJSON text sequences are not supported, as the whole
+        document is parsed.
+    :return: Dict mapping each version to the result of validating the document against it, as returned by
+        csbschema.validate_data. If the results include the document, it is the same object in each.
+    """
+    versions = list(dict.fromkeys(versions))
+    for version in versions:
+        if version not in csbschema.VALIDATORS:
+            raise ValueError(f"Unknown validator version: {version}")
+    for option in ('stream', 'sequence'):
+        if option in kwargs:
+            raise ValueError(f"{option} is not supported by validate_multi, as the whole document is parsed")
+    if jobs < 1:
+        raise ValueError(f"jobs must be at least 1, not {jobs}")
+
+    with compression.open_document(document_path) as source:
+        parsed = validators._open_document(source)
+    # A JSON value that is not an object or array (e.g. a string) can't be told apart from a path once parsed, so is
+    # given to the validators as JSON
+    document = parsed if validators._is_parsed(parsed) else json.dumps(parsed).encode('utf8')
+    jobs = min(jobs, len(versions))
+    if jobs <= 1:
+        return {version: csbschema.validate_data(document, version=version, **kwargs) for version in versions}
+
+    with _executor(document, jobs) as executor:
+        if isinstance(executor, ProcessPoolExecutor):
+            futures = {version: executor.submit(_validate_shared, version, kwargs) for version in versions}
+        else:
+            futures = {version: executor.submit(csbschema.validate_data, document, version=version, **kwargs)
+                       for version in versions}
+        results = {version: future.result() for version, future in futures.items()}
+    if kwargs.get('return_document', True):
+        for (_, result) in results.values():
+            result['document'] = parsed
+    return results
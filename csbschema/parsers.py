@@ -0,0 +1,161 @@
+"""
+JSON parser backends used to parse whole documents.
+
+Documents are parsed straight from the buffer they are read into (e.g. a memory-mapped file), without first being
+copied into a bytes object. The backend is chosen with set_parser(), or the CSBSCHEMA_JSON_PARSER environment
+variable, and may be one of:
+    - 'stdlib': the json module from the Python standard library
+    - 'orjson': orjson (https://github.com/ijl/orjson), if installed
+    - 'simdjson': pysimdjson (https://github.com/TkTech/pysimdjson), if installed
+    - 'auto' (the default): the fastest of the above that is installed
+
+If the selected backend is not installed, the stdlib parser is used instead. Documents that a backend fails to parse
+(e.g. because they contain integers too large for orjson, or a byte order mark) are re-parsed using the stdlib
+parser, so the parsed document, and the error raised for invalid JSON, are the same whichever backend is used.
+
+Parsing a large document allocates millions of containers, which would otherwise trigger many (fruitless) cyclic
+garbage collections, so the garbage collector is paused while parsing; parsed JSON never contains reference cycles.
+The collector is process-wide, so when documents are parsed in several threads at once it stays paused until the
+last of them has been parsed, and is then only re-enabled if it was enabled when the first began.
+"""
+from __future__ import annotations
+
+import gc
+import os
+import json
+import logging
+import threading
+import functools
+import contextlib
+from typing import Iterator, List, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:  # pragma: no cover
+    simdjson = None
+
+logger = logging.getLogger(__name__)
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+STDLIB = 'stdlib'
+ORJSON = 'orjson'
+SIMDJSON = 'simdjson'
+AUTO = 'auto'
+# Backends in order of preference when the backend is 'auto'
+BACKENDS = (ORJSON, SIMDJSON, STDLIB)
+DEFAULT_PARSER = os.environ.get('CSBSCHEMA_JSON_PARSER', AUTO)
+
+
+def _parse_stdlib(buffer: Buffer) -> Union[dict, list]:
+    return json.loads(str(buffer, 'utf-8-sig'))
+
+
+def _parse_orjson(buffer: Buffer) -> Union[dict, list]:
+    return orjson.loads(buffer)
+
+
+_simdjson_parsers = threading.local()
+
+
+def _parse_simdjson(buffer: Buffer) -> Union[dict, list]:
+    # simdjson parsers may not be shared between threads, but are expensive enough to create that one is kept for
+    # each thread
+    parser = getattr(_simdjson_parsers, 'parser', None)
+    if parser is None:
+        parser = _simdjson_parsers.parser = simdjson.Parser()
+    return parser.parse(buffer, True)
+
+
+_PARSERS = {
+    STDLIB: _parse_stdlib,
+    ORJSON: _parse_orjson if orjson is not None else None,
+    SIMDJSON: _parse_simdjson if simdjson is not None else None
+}
+
+
+def available_backends() -> List[str]:
+    """
+    :return: Names of the parser backends that are installed, in order of preference
+    """
+    return [name for name in BACKENDS if _PARSERS[name] is not None]
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve(name: str) -> str:
+    if name == AUTO:
+        return available_backends()[0]
+    if name not in _PARSERS:
+        raise ValueError(f"Unknown JSON parser backend: {name}")
+    if _PARSERS[name] is None:
+        logger.warning(f"JSON parser backend {name} is not installed, using {STDLIB} instead.")
+        return STDLIB
+    return name
+
+
+_parser_name = DEFAULT_PARSER
+
+
+def set_parser(name: str) -> None:
+    """
+    Set the parser backend used to parse documents.
+    :param name: 'auto', 'stdlib', 'orjson', or 'simdjson'
+    :raises ValueError: If name is not the name of a backend
+    """
+    global _parser_name
+    _resolve(name)
+    _parser_name = name
+
+
+def get_parser() -> str:
+    """
+    :return: Name of the parser backend that is used to parse documents (i.e., after falling back to 'stdlib' if
+        the selected backend is not installed)
+    """
+    return _resolve(_parser_name)
+
+
+# Number of parses in progress (in any thread) with the garbage collector paused, and whether it was enabled when
+# the first of them began
+_gc_lock = threading.Lock()
+_gc_pauses = 0
+_gc_was_enabled = False
+
+
+@contextlib.contextmanager
+def _gc_paused() -> Iterator[None]:
+    global _gc_pauses, _gc_was_enabled
+    with _gc_lock:
+        if _gc_pauses == 0:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if _gc_pauses == 0 and _gc_was_enabled:
+                gc.enable()
+
+
+def parse(buffer: Buffer) -> Union[dict, list]:
+    """
+    Parse a JSON document using the selected parser backend.
+    :param buffer: UTF-8 encoded JSON document
+    :return: Parsed document
+    :raises ValueError: If buffer is not a valid UTF-8 encoded JSON document
+    """
+    name = get_parser()
+    with _gc_paused():
+        if name == STDLIB:
+            return _parse_stdlib(buffer)
+        try:
+            return _PARSERS[name](buffer)
+        except ValueError:
+            return _parse_stdlib(buffer)
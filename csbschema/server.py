@@ -0,0 +1,441 @@
+"""
+Long-running validation server, and a client for it.
+
+The server keeps a pool of worker processes in which validators for every schema version in VALIDATORS have been
+compiled ahead of time, so that validating a document does not pay for interpreter startup, imports, or schema
+compilation. It speaks HTTP/1.1, on a local TCP port or on a Unix domain socket:
+    - POST /validate validates a document, given either as the request body (of at most max_body_size bytes, or
+      the response has status 413), or by the 'path' query parameter (a path on the server's filesystem, which is
+      only accepted if the server was given a document_root directory that contains it, or the response has status
+      403). Other query parameters are 'version' (default: DEFAULT_VALIDATOR_VERSION, or 'auto' to detect the
+      version), and the validate_data options 'stream', 'sequence', 'compiled' (default: the server's compiled
+      option), 'fast_path', 'fail_fast', 'timings', 'check_time_order' ('true' or 'false'), 'max_errors', and
+      'max_time_gap' (the options that only apply to GeoJSON documents can't be given with an XYZ version, or the
+      response has status 400, but are ignored for XYZ metadata when the version is 'auto'). The response is the
+      JSON object {"valid": ..., "errors": [{"path": ..., "message": ...}, ...]}, with 'truncated',
+      'feature_count', 'timings' and 'detection' as described for validate_data, and 'errors' omitted if the
+      document is valid.
+      If the document can't be read or parsed, or a parameter is invalid, the response has status 400 and is the
+      JSON object {"error": ..., "type": ...}, where type is 'OSError' or 'ValueError'. If validation fails in
+      any other way (e.g. a worker process dies), the response has status 500, and type is 'Error'.
+    - GET /health returns {"status": "ok", "versions": [...]}.
+    - GET /metrics returns validation metrics in the Prometheus text format (see csbschema.metrics), if the server
+      was started with metrics=True.
+
+Server addresses are given as 'unix:PATH' for a Unix domain socket, or 'http://HOST:PORT' (or 'HOST:PORT').
+"""
+from __future__ import annotations
+
+import os
+import json
+import time
+import stat
+import socket
+import logging
+import functools
+import socketserver
+import http.client
+from pathlib import Path
+from concurrent.futures import Executor, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple, Union
+from urllib.parse import parse_qs, quote, urlencode, urlsplit
+
+import csbschema
+from csbschema.metrics import CONTENT_TYPE, Registry, document_size
+from csbschema import parsers
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+UNIX_PREFIX = 'unix:'
+# Default maximum size, in bytes, of documents given as the request body
+DEFAULT_MAX_BODY_SIZE = 1 << 30
+
+# validate_data options that may be given as query parameters, and their types
+_BOOL_OPTIONS = ('stream', 'sequence', 'compiled', 'fast_path', 'fail_fast', 'timings', 'check_time_order')
+_INT_OPTIONS = ('max_errors',)
+_FLOAT_OPTIONS = ('max_time_gap',)
+
+
+def parse_address(address: str) -> Union[str, Tuple[str, int]]:
+    """
+    :param address: 'unix:PATH', 'http://HOST:PORT', or 'HOST:PORT'
+    :return: Path of a Unix domain socket, or (host, port) tuple
+    :raises ValueError: If address is not a valid server address
+    """
+    if address.startswith(UNIX_PREFIX):
+        return address[len(UNIX_PREFIX):]
+    url = urlsplit(address if '//' in address else f"//{address}")
+    if url.scheme not in ('', 'http') or url.hostname is None:
+        raise ValueError(f"Invalid server address: {address}")
+    return url.hostname, url.port if url.port is not None else DEFAULT_PORT
+
+
+def format_address(address: Union[str, Tuple[str, int]]) -> str:
+    if isinstance(address, str):
+        return f"{UNIX_PREFIX}{address}"
+    return f"http://{address[0]}:{address[1]}"
+
+
+def _init_worker(compiled: bool, parser: str) -> None:
+    parsers.set_parser(parser)
+    csbschema.warmup(compiled=compiled)
+
+
+def _validate(document: Union[str, bytes], version: str, options: dict) -> dict:
+    """
+    Validate a document in a worker process.
+    :return: JSON-serializable response
+    """
+    (valid, result) = csbschema.validate_data(document, version=version, return_document=False, **options)
+    response = {'valid': valid}
+    if 'errors' in result:
+        response['errors'] = [dict(e) for e in result['errors']]
+    if result.get('truncated', False):
+        response['truncated'] = True
+    if 'feature_count' in result:
+        response['feature_count'] = result['feature_count']
+    if 'timings' in result:
+        response['timings'] = result['timings']
+    if 'detection' in result:
+        response['detection'] = result['detection']
+    return response
+
+
+def _parse_options(params: dict) -> dict:
+    options = {}
+    for name in _BOOL_OPTIONS:
+        if name in params:
+            value = params[name][-1].lower()
+            if value not in ('true', 'false', '1', '0'):
+                raise ValueError(f"Invalid value for {name}: {params[name][-1]}")
+            options[name] = value in ('true', '1')
+    for name in _INT_OPTIONS:
+        if name in params:
+            try:
+                options[name] = int(params[name][-1])
+            except ValueError:
+                raise ValueError(f"Invalid value for {name}: {params[name][-1]}") from None
+    for name in _FLOAT_OPTIONS:
+        if name in params:
+            try:
+                options[name] = float(params[name][-1])
+            except ValueError:
+                raise ValueError(f"Invalid value for {name}: {params[name][-1]}") from None
+    return options
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server_version = f"csbschema/{csbschema.__version__}"
+    protocol_version = 'HTTP/1.1'
+
+    def address_string(self) -> str:
+        # Clients of Unix domain sockets have no address
+        return self.client_address[0] if self.client_address else UNIX_PREFIX
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode('utf8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: int, e: Exception) -> None:
+        if status >= 500:
+            error_type = 'Error'
+        else:
+            error_type = 'OSError' if isinstance(e, OSError) else 'ValueError'
+        self._send_json(status, {'error': str(e), 'type': error_type})
+
+    def _document_path(self, path: str) -> str:
+        """
+        :return: The real path of a document given by the path parameter
+        :raises PermissionError: If the server has no document root, or the document is not under it
+        """
+        root = self.server.document_root
+        if root is None:
+            raise PermissionError('Documents can only be given as the request body')
+        real_path = os.path.realpath(path)
+        if os.path.commonpath([root, real_path]) != root:
+            raise PermissionError("Documents given by path must be under the server's document root")
+        return real_path
+
+    def _send_metrics(self) -> None:
+        data = self.server.metrics.to_prometheus().encode('utf8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        path = urlsplit(self.path).path
+        if path == '/health':
+            self._send_json(200, {'status': 'ok', 'versions': list(csbschema.VALIDATORS.keys())})
+        elif path == '/metrics' and self.server.metrics is not None:
+            self._send_metrics()
+        else:
+            self._send_error(404, ValueError(f"Unknown resource: {self.path}"))
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            if length < 0:
+                raise ValueError()
+        except ValueError:
+            self.close_connection = True
+            self._send_error(400, ValueError(f"Invalid Content-Length: {self.headers.get('Content-Length')}"))
+            return
+        if length > self.server.max_body_size:
+            # The body is not read, so the connection can't be used for further requests
+            self.close_connection = True
+            self._send_error(413, ValueError(f"Request body of {length} bytes is larger than the maximum of "
+                                             f"{self.server.max_body_size} bytes"))
+            return
+        body = self.rfile.read(length) if length > 0 else None
+        if url.path != '/validate':
+            self._send_error(404, ValueError(f"Unknown resource: {url.path}"))
+            return
+        try:
+            params = parse_qs(url.query)
+            version = params.get('version', [csbschema.DEFAULT_VALIDATOR_VERSION])[-1]
+            if version != csbschema.AUTO and version not in csbschema.VALIDATORS:
+                raise ValueError(f"Unknown validator version: {version}")
+            options = _parse_options(params)
+            if version.startswith('XYZ'):
+                geojson_options = [name for name in options if name in csbschema._GEOJSON_OPTIONS]
+                if len(geojson_options) > 0:
+                    raise ValueError(f"Options that only apply to GeoJSON documents can't be given for {version}: "
+                                     f"{', '.join(geojson_options)}")
+            options.setdefault('compiled', self.server.compiled)
+            if body is not None:
+                document = body
+            elif 'path' in params:
+                document = self._document_path(params['path'][-1])
+            else:
+                raise ValueError('Document must be given as the request body, or by the path parameter')
+        except PermissionError as e:
+            self._send_error(403, e)
+            return
+        except ValueError as e:
+            self._send_error(400, e)
+            return
+
+        start = time.perf_counter()
+        try:
+            response = self.server.executor.submit(_validate, document, version, options).result()
+        except Exception as e:
+            if self.server.metrics is not None:
+                self.server.metrics.observe(version, valid=None, duration=time.perf_counter() - start,
+                                            n_bytes=document_size(document))
+            if isinstance(e, (OSError, ValueError)):
+                self._send_error(400, e)
+            else:
+                logger.exception(f"Unable to validate document: {e}")
+                self._send_error(500, e)
+            return
+        if self.server.metrics is not None:
+            # Metrics are recorded here, as documents are validated in worker processes
+            if 'detection' in response:
+                version = response['detection']['version']
+            self.server.metrics.observe(version, valid=response['valid'], duration=time.perf_counter() - start,
+                                        n_bytes=document_size(document), n_features=response.get('feature_count'),
+                                        errors=response.get('errors', ()))
+        self._send_json(200, response)
+
+
+class _TCPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ValidationServer:
+    """
+    Validation server. Requests are handled in threads, which hand documents to a pool of worker processes.
+    """
+    def __init__(self, address: Union[str, Tuple[str, int]] = (DEFAULT_HOST, DEFAULT_PORT), *,
+                 jobs: Optional[int] = None,
+                 compiled: bool = False,
+                 parser: str = parsers.DEFAULT_PARSER,
+                 executor: Optional[Executor] = None,
+                 metrics: bool = False,
+                 document_root: Optional[Union[str, Path]] = None,
+                 max_body_size: int = DEFAULT_MAX_BODY_SIZE):
+        """
+        :param address: Path of a Unix domain socket, or (host, port) tuple to listen on. Use port 0 to listen on
+            any free port.
+        :param jobs: Number of worker processes. Defaults to the number of CPUs.
+        :param compiled: If True, validate using code generated from the schemas (which workers generate when they
+            start), unless a request says otherwise.
+        :param parser: JSON parser backend used by workers (see csbschema.parsers)
+        :param executor: Executor to validate documents in, rather than a process pool created by the server.
+        :param metrics: If True, record metrics of the documents validated, which are served at /metrics, and are
+            available as the metrics attribute (a csbschema.metrics.Registry).
+        :param document_root: Directory under which documents may be given by path. If None, documents can only be
+            given as the request body, so that clients can't read other files the server can read.
+        :param max_body_size: Maximum size, in bytes, of documents given as the request body
+        """
+        self._owns_executor = executor is None
+        if executor is None:
+            jobs = jobs if jobs is not None else (os.cpu_count() or 1)
+            executor = ProcessPoolExecutor(max_workers=jobs,
+                                           initializer=functools.partial(_init_worker, compiled, parser))
+            # Start the workers (which compile the validators) now, rather than when the first requests arrive
+            for f in [executor.submit(os.getpid) for _ in range(jobs)]:
+                f.result()
+        self.executor = executor
+        self.compiled = compiled
+        self.metrics = Registry() if metrics else None
+
+        if isinstance(address, str):
+            # Remove a socket left behind by a server that was not shut down cleanly
+            if os.path.exists(address) and stat.S_ISSOCK(os.stat(address).st_mode):
+                os.unlink(address)
+            self._httpd = _UnixServer(address, _RequestHandler)
+        else:
+            self._httpd = _TCPServer(address, _RequestHandler)
+        self._httpd.executor = executor
+        self._httpd.metrics = self.metrics
+        self._httpd.compiled = compiled
+        self._httpd.document_root = os.path.realpath(document_root) if document_root is not None else None
+        self._httpd.max_body_size = max_body_size
+        self.address = self._httpd.server_address if isinstance(address, str) else self._httpd.server_address[:2]
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def shutdown(self) -> None:
+        """
+        Stop serve_forever() (which must be running in another thread).
+        """
+        self._httpd.shutdown()
+
+    def close(self) -> None:
+        self._httpd.server_close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+        if self._owns_executor:
+            self.executor.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> ValidationServer:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: Optional[float] = None):
+        super().__init__('localhost', timeout=timeout)
+        self._socket_path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self._socket_path)
+
+
+class ValidationClient:
+    """
+    Client for a ValidationServer. A client keeps its connection open between requests, and so should not be shared
+    between threads.
+    """
+    def __init__(self, address: str, *, timeout: Optional[float] = None):
+        """
+        :param address: Server address ('unix:PATH', 'http://HOST:PORT', or 'HOST:PORT')
+        :param timeout: Timeout, in seconds, for connecting to and receiving responses from the server
+        """
+        self.address = parse_address(address)
+        self.timeout = timeout
+        self._connection: Optional[http.client.HTTPConnection] = None
+        # Whether the server accepts documents by path (until it refuses one)
+        self._send_paths = True
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._connection is None:
+            if isinstance(self.address, str):
+                self._connection = _UnixHTTPConnection(self.address, timeout=self.timeout)
+            else:
+                self._connection = http.client.HTTPConnection(*self.address, timeout=self.timeout)
+        return self._connection
+
+    def _request(self, method: str, url: str, body: Optional[bytes] = None) -> Tuple[int, dict]:
+        for attempt in range(2):
+            connection = self._connect()
+            try:
+                connection.request(method, url, body=body)
+                response = connection.getresponse()
+                return response.status, json.loads(response.read())
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # The server closed a kept-alive connection; reconnect, and try once more
+                self.close()
+                if attempt > 0:
+                    raise
+
+    def validate(self, document: Union[str, Path, bytes], *,
+                 version: str = csbschema.DEFAULT_VALIDATOR_VERSION,
+                 **kwargs) -> Tuple[bool, dict]:
+        """
+        Validate a document using the server.
+        :param document: Path of a document, or the document itself. A document given by path is read by the server if
+            it is under the server's document root, and otherwise read by the client and sent to the server.
+        :param version: Version of schema validator
+        :param kwargs: Additional validate_data options: stream, sequence, compiled, fast_path, fail_fast, timings,
+            check_time_order, max_errors, and max_time_gap
+        :return: Tuple[bool, dict], as returned by validate_data with return_document=False, except that errors are
+            dicts
+        :raises OSError: If the server can't be reached, or the document can't be read
+        :raises ValueError: If the document is not valid JSON, is too large, or an option is invalid
+        :raises RuntimeError: If the server failed to validate the document for any other reason
+        """
+        params = {'version': version}
+        for name, value in kwargs.items():
+            if name not in _BOOL_OPTIONS + _INT_OPTIONS + _FLOAT_OPTIONS:
+                raise ValueError(f"Unsupported option: {name}")
+            params[name] = str(value).lower() if isinstance(value, bool) else str(value)
+        if isinstance(document, (bytes, bytearray, memoryview)):
+            (status, response) = self._request('POST', f"/validate?{urlencode(params, quote_via=quote)}",
+                                               bytes(document))
+        else:
+            status = None
+            if self._send_paths:
+                path_params = dict(params, path=os.path.abspath(document))
+                (status, response) = self._request('POST', f"/validate?{urlencode(path_params, quote_via=quote)}")
+                # The server does not accept the document by path, so send it
+                self._send_paths = status != 403
+            if status is None or status == 403:
+                with open(document, 'rb') as f:
+                    body = f.read()
+                (status, response) = self._request('POST', f"/validate?{urlencode(params, quote_via=quote)}", body)
+        if status >= 500:
+            raise RuntimeError(response.get('error'))
+        if status != 200:
+            raise (OSError if response.get('type') == 'OSError' else ValueError)(response.get('error'))
+        valid = response.pop('valid')
+        return valid, response
+
+    def health(self) -> dict:
+        (_, response) = self._request('GET', '/health')
+        return response
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self) -> ValidationClient:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,132 @@
+"""
+Memoization of B12 GeoJSON feature validation by shape.
+
+The shape signature of a feature is its structure: the keys of each object (in order), the length of each array,
+and the type of each value, but not the values themselves. Whether a feature is valid according to the
+GeoJSONFeature definition depends only on its shape, apart from a few value-dependent constraints: the 'Feature'
+and 'Point' type enums, and the RFC3339_time pattern (array lengths, which minItems and maxItems depend on, are
+part of the shape). So once a feature of a given shape has been found valid by schema validation, features of the
+same shape only need their value-dependent constraints checked. Almost all the features of a CSB trackline have the
+same shape, so this is much faster than validating each feature against the schema, including for features the
+NumPy bulk checks (see csbschema.fastpath) leave to schema validation, e.g. features with an 'id', or with
+uncertainty in documents validated against a schema without it.
+
+As with the bulk checks, memoization is only used for schemas whose feature definitions are known (see
+csbschema.fastpath.match_feature_definitions), so that the value-dependent constraints are known to be exactly those
+checked here. It does not need NumPy.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, NamedTuple, Optional
+
+from csbschema import fastpath
+
+# Maximum number of shapes remembered for each schema. Real tracklines have very few shapes, so this is only
+# reached by unusual (e.g. adversarial) documents, after which new shapes are validated against the schema.
+DEFAULT_MAXSIZE = 1024
+
+_SCALARS = frozenset((str, int, float, bool, type(None)))
+
+
+class UnknownShape(ValueError):
+    """
+    Raised for values that are not as decoded from JSON (e.g. a dict subclass), whose shape is not known.
+    """
+
+
+def signature(value: Any) -> Any:
+    """
+    :return: Hashable shape signature of a JSON value
+    :raises UnknownShape: If value contains values of types not decoded from JSON
+    """
+    t = type(value)
+    if t is dict:
+        return t, tuple((k, signature(v)) for k, v in value.items())
+    if t is list:
+        return t, tuple(signature(v) for v in value)
+    if t not in _SCALARS:
+        raise UnknownShape(f"Unknown shape of value of type {t.__name__}")
+    return t
+
+
+class ShapeCacheInfo(NamedTuple):
+    """
+    Statistics of a ShapeCache, like those of functools.lru_cache.
+    """
+    # Features found valid by their shape and values alone
+    hits: int
+    # Features that had to be validated against the schema
+    misses: int
+    # Number of shapes remembered, and the maximum
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+class ShapeCache:
+    """
+    Shapes of features found valid against one schema's GeoJSONFeature definition.
+    """
+    __slots__ = ('time_re', 'maxsize', '_shapes', '_hits', '_misses')
+
+    def __init__(self, time_pattern: str, *, maxsize: int = DEFAULT_MAXSIZE):
+        self.time_re = re.compile(time_pattern)
+        self.maxsize = maxsize
+        self._shapes = set()
+        self._hits = 0
+        self._misses = 0
+
+    @classmethod
+    def from_schema(cls, schema: dict, *, maxsize: int = DEFAULT_MAXSIZE) -> Optional[ShapeCache]:
+        """
+        :param schema: B12 GeoJSON schema document
+        :return: ShapeCache, or None if the schema's feature definitions are not ones for which memoization is known
+            to be equivalent to schema validation
+        """
+        definitions = fastpath.match_feature_definitions(schema)
+        if definitions is None:
+            return None
+        return cls(definitions[0], maxsize=maxsize)
+
+    def is_valid(self, feature: Any) -> bool:
+        """
+        :return: True if a feature of the same shape has been found valid, and the feature's value-dependent
+            constraints hold, in which case the feature is valid. Otherwise, the feature must be validated against
+            the schema.
+        """
+        try:
+            known = len(self._shapes) > 0 and signature(feature) in self._shapes
+        except UnknownShape:
+            known = False
+        if known:
+            # The shape guarantees that these members exist and are of the right types
+            geometry = feature['geometry']
+            if (feature['type'] == 'Feature' and (geometry is None or geometry['type'] == 'Point')
+                    and self.time_re.search(feature['properties']['time']) is not None):
+                self._hits += 1
+                return True
+        self._misses += 1
+        return False
+
+    def add(self, feature: Any) -> None:
+        """
+        Remember the shape of a feature that has been found valid against the schema.
+        """
+        if len(self._shapes) < self.maxsize:
+            try:
+                self._shapes.add(signature(feature))
+            except UnknownShape:
+                pass
+
+    def cache_info(self) -> ShapeCacheInfo:
+        return ShapeCacheInfo(self._hits, self._misses, len(self._shapes), self.maxsize)
+
+    def clear(self) -> None:
+        self._shapes.clear()
+        self._hits = 0
+        self._misses = 0
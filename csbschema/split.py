@@ -0,0 +1,170 @@
+"""
+Splitting the 'features' array of a B12 GeoJSON document into chunks of elements, without parsing it.
+
+To validate the features of a single large document in parallel, each worker process parses and validates a byte
+range of the document holding a chunk of consecutive features, so that the parent process never parses (or pickles)
+the features. Finding the element boundaries exactly would mean scanning the whole document for the quotes, brackets
+and commas that delimit them, which would take about as long as parsing it, so instead:
+    - find_features_start scans the document from the start (usually only its first few kilobytes) for the opening
+      bracket of the 'features' member of the top-level object.
+    - split_points guesses where to split the array into chunks of about the same size: at the first '}, {' (i.e.
+      between two objects) after each of a number of evenly spaced offsets.
+    - find_array_end scans the last chunk for the closing bracket of the array.
+A guess is right if and only if the chunk before it parses as a JSON array: a split inside a string, or anywhere
+other than between two elements of the array, leaves an unterminated string or unbalanced brackets in that chunk.
+So callers must parse every chunk (e.g. with csbschema.parsers.parse(b'[' + chunk + b']')), and fall back to
+parsing the whole document if any chunk fails to parse (which may also mean that the document is not valid JSON).
+
+The scans are done with NumPy, a block at a time: the quotes that are not escaped by an odd number of backslashes
+delimit strings, and the brackets outside strings give the nesting depth. NumPy is an optional
+dependency; if it is not installed, documents can't be split.
+"""
+from __future__ import annotations
+
+import re
+from typing import Iterator, List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+AVAILABLE = np is not None
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+# Number of bytes scanned at a time: scans start with small blocks, since they usually stop early, and double the
+# block size up to the maximum, which bounds the memory used by the scans
+FIRST_SCAN_BLOCK_SIZE = 1 << 16
+SCAN_BLOCK_SIZE = 1 << 24
+
+_QUOTE = ord('"')
+_BACKSLASH = ord('\\')
+_OPEN_BRACKET = ord('[')
+_CLOSE_BRACKET = ord(']')
+_BRACKETS = tuple(map(ord, '{}[]'))
+
+# The member name before the opening bracket of the features array (searched for in the bytes just before it)
+_FEATURES_KEY_RE = re.compile(rb'"features"[ \t\n\r]*:[ \t\n\r]*\Z')
+_FEATURES_KEY_SEARCH = 256
+# A comma between two objects
+_SPLIT_RE = re.compile(rb'\}[ \t\n\r]*(,)[ \t\n\r]*\{')
+
+
+def _unescaped_quotes(a: np.ndarray, trailing_backslashes: int) -> np.ndarray:
+    """
+    :param a: Block of bytes
+    :param trailing_backslashes: Number of consecutive backslashes at the end of the previous block
+    :return: Mask of the quotes in the block that are not escaped by an odd number of backslashes
+    """
+    quotes = a == _QUOTE
+    backslashes = np.flatnonzero(a == _BACKSLASH)
+    if len(backslashes) == 0 and trailing_backslashes == 0:
+        return quotes
+    # Length of the run of backslashes just before each quote
+    positions = np.flatnonzero(quotes)
+    run_lengths = np.zeros(len(positions), dtype=np.int64)
+    if len(backslashes) > 0:
+        last = np.searchsorted(backslashes, positions) - 1
+        adjacent = (last >= 0) & (backslashes[np.maximum(last, 0)] == positions - 1)
+        new_run = np.ones(len(backslashes), dtype=bool)
+        new_run[1:] = backslashes[1:] != backslashes[:-1] + 1
+        run_start = np.maximum.accumulate(np.where(new_run, np.arange(len(backslashes)), 0))
+        last = last[adjacent]
+        run_lengths[adjacent] = last - run_start[last] + 1
+        # Runs at the start of the block continue the run at the end of the previous block
+        run_lengths[adjacent] += np.where(backslashes[run_start[last]] == 0, trailing_backslashes, 0)
+    run_lengths[positions == 0] = trailing_backslashes
+    quotes[positions[run_lengths % 2 == 1]] = False
+    return quotes
+
+
+def _trailing_backslashes(a: np.ndarray, previous: int) -> int:
+    n = 0
+    while n < len(a) and a[len(a) - 1 - n] == _BACKSLASH:
+        n += 1
+    return previous + n if n == len(a) else n
+
+
+def _scan(buffer: Buffer, start: int) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Scan a buffer for brackets outside strings, from an offset that is outside any string.
+    :return: Iterator of a tuple for each block: the offsets of the brackets, the brackets, and the nesting depth
+        (relative to start) before each bracket
+    """
+    in_string = False
+    trailing_backslashes = 0
+    depth = 0
+    block_start = start
+    block_size = min(FIRST_SCAN_BLOCK_SIZE, SCAN_BLOCK_SIZE)
+    while block_start < len(buffer):
+        a = np.frombuffer(buffer, dtype=np.uint8, count=min(block_size, len(buffer) - block_start),
+                          offset=block_start)
+        quotes = _unescaped_quotes(a, trailing_backslashes if in_string else 0)
+        trailing_backslashes = _trailing_backslashes(a, trailing_backslashes)
+        # Whether each byte is in a string: after an odd number of quotes
+        in_strings = np.logical_xor.accumulate(quotes)
+        if in_string:
+            in_strings = ~in_strings
+        in_string = bool(in_strings[-1])
+
+        brackets = (a == _BRACKETS[0]) | (a == _BRACKETS[1]) | (a == _BRACKETS[2]) | (a == _BRACKETS[3])
+        offsets = np.flatnonzero(brackets & ~in_strings)
+        chars = a[offsets]
+        # '[' and '{' (0x5B, 0x7B) open, ']' and '}' (0x5D, 0x7D) close
+        changes = np.where((chars & 0x02) != 0, 1, -1)
+        depth_after = depth + np.cumsum(changes)
+        if len(depth_after) > 0:
+            depth = int(depth_after[-1])
+        yield offsets + block_start, chars, depth_after - changes
+        block_start += len(a)
+        block_size = min(2 * block_size, SCAN_BLOCK_SIZE)
+
+
+def find_features_start(buffer: Buffer) -> Optional[int]:
+    """
+    :param buffer: UTF-8 encoded JSON document
+    :return: Offset of the opening bracket of the 'features' array of the top-level object, or None if there is none
+    """
+    for offsets, chars, depths in _scan(buffer, 0):
+        if (depths < 0).any():
+            return None
+        for i in np.flatnonzero((chars == _OPEN_BRACKET) & (depths == 1)).tolist():
+            offset = int(offsets[i])
+            if _FEATURES_KEY_RE.search(bytes(buffer[max(0, offset - _FEATURES_KEY_SEARCH):offset])) is not None:
+                return offset
+    return None
+
+
+def find_array_end(buffer: Buffer, start: int) -> Optional[int]:
+    """
+    :param buffer: UTF-8 encoded JSON document
+    :param start: Offset just after the opening bracket of an array, or after the comma between two of its elements
+    :return: Offset of the closing bracket of the array, or None if there is none
+    """
+    for offsets, chars, depths in _scan(buffer, start):
+        closes = np.flatnonzero((depths == 0) & ((chars & 0x02) == 0))
+        if len(closes) > 0:
+            i = int(closes[0])
+            return int(offsets[i]) if depths[i] == 0 and chars[i] == _CLOSE_BRACKET else None
+    return None
+
+
+def split_points(buffer: Buffer, start: int, n_chunks: int) -> List[int]:
+    """
+    Guess where to split the elements of an array of objects into chunks of about the same size.
+    :param buffer: UTF-8 encoded JSON document
+    :param start: Offset of the opening bracket of the array
+    :param n_chunks: Number of chunks
+    :return: Offsets (in ascending order) of the commas between elements at which to split the array. There may be
+        fewer than n_chunks - 1, if the array has too few elements.
+    """
+    points: List[int] = []
+    step = (len(buffer) - start) / n_chunks
+    for k in range(1, n_chunks):
+        target = max(int(start + k * step), points[-1] + 1 if points else start)
+        m = _SPLIT_RE.search(buffer, target)
+        if m is None:
+            break
+        points.append(m.start(1))
+    return points
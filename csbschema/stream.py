@@ -0,0 +1,196 @@
+"""
+Incremental reading of large JSON documents.
+
+Only the members of the top-level object that are requested as streamed arrays (e.g. 'features' in B12 GeoJSON
+documents) are read element-by-element; all other members are decoded whole. This keeps memory use roughly constant
+no matter how many elements a streamed array holds.
+"""
+from __future__ import annotations
+
+import re
+import json
+import codecs
+from typing import Any, BinaryIO, Container, Iterator, Tuple
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Values decoded (or decode failures) this close to the end of the buffer may be truncated by the chunk boundary
+# (e.g. a number or literal split across two reads), so more data are read and the value is decoded again.
+_NEAR_END = 32
+_WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+
+
+class JSONStreamReader:
+    """
+    Read successive JSON values and structural characters from a binary UTF-8 stream, buffering at most
+    a few chunks at a time.
+    """
+    def __init__(self, fp: BinaryIO, *, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self._json_decoder = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        # Character offset of the start of _buf within the document, used for error reporting
+        self._offset = 0
+        self._eof = False
+        self.bytes_read = 0
+
+    def _fill(self) -> bool:
+        """
+        Read another chunk into the buffer, discarding already consumed text.
+        :return: False if the end of the stream had already been reached, True otherwise.
+        """
+        if self._eof:
+            return False
+        if self._pos > 0:
+            self._offset += self._pos
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        chunk = self._fp.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            self._buf += self._text_decoder.decode(b'', final=True)
+        else:
+            self.bytes_read += len(chunk)
+            self._buf += self._text_decoder.decode(chunk)
+        return True
+
+    def error(self, mesg: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(mesg, self._buf, self._pos)
+
+    def peek(self) -> str:
+        """
+        :return: The next non-whitespace character, without consuming it, or '' at the end of the stream.
+        """
+        while True:
+            self._pos = _WHITESPACE_RE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        """
+        Consume the next non-whitespace character, which must be one of chars.
+        :return: The character consumed.
+        """
+        c = self.peek()
+        if c == '' or c not in chars:
+            expected = ' or '.join([repr(ch) for ch in chars])
+            raise self.error(f"Expecting {expected} at character {self._offset + self._pos}")
+        self._pos += 1
+        return c
+
+    def read_value(self) -> Any:
+        """
+        Decode and consume the next JSON value.
+        """
+        self.peek()
+        while True:
+            near_end = len(self._buf) - _NEAR_END
+            try:
+                value, end = self._json_decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                if (e.pos >= near_end or e.msg.startswith('Unterminated string')) and self._fill():
+                    continue
+                raise json.JSONDecodeError(e.msg, e.doc, e.pos) from None
+            if end >= near_end and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def at_end(self) -> bool:
+        return self.peek() == ''
+
+
+class NotAnObjectError(json.JSONDecodeError):
+    """
+    Raised by iter_object when the stream holds a valid JSON value that is not an object. The value, which is
+    decoded whole, is kept so that it can be handled like any other parsed document (e.g. validated against a schema
+    that requires an object).
+    """
+    def __init__(self, value: Any, reader: JSONStreamReader):
+        super().__init__('Expecting top-level object', reader._buf, reader._pos)
+        self.value = value
+
+
+class ArrayElements:
+    """
+    Iterator over the elements of a streamed JSON array. Elements not consumed by the caller are skipped when the
+    enclosing object is read further.
+    """
+    def __init__(self, reader: JSONStreamReader):
+        self._reader = reader
+        self._started = False
+        self._done = False
+        # Number of elements read so far
+        self.count = 0
+
+    def __iter__(self) -> ArrayElements:
+        return self
+
+    def __next__(self) -> Any:
+        if self._done:
+            raise StopIteration
+        if not self._started:
+            self._started = True
+            self._reader.expect('[')
+            if self._reader.peek() == ']':
+                self._reader.expect(']')
+                self._done = True
+                raise StopIteration
+        elif self._reader.expect(',]') == ']':
+            self._done = True
+            raise StopIteration
+        value = self._reader.read_value()
+        self.count += 1
+        return value
+
+    def exhaust(self) -> int:
+        """
+        Skip the remaining elements.
+        :return: Number of elements skipped
+        """
+        return sum(1 for _ in self)
+
+
+def iter_object(fp: BinaryIO, *,
+                stream_arrays: Container[str] = (),
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[str, Any]]:
+    """
+    Iterate over the members of the top-level JSON object in a binary UTF-8 stream.
+    :param fp: Stream to read from
+    :param stream_arrays: Names of members whose array values should be returned as an ArrayElements iterator,
+        rather than being decoded whole. The iterator is only valid until the next member is read.
+    :param chunk_size: Number of bytes to read from fp at a time
+    :return: Iterator of (name, value) tuples
+    :raises NotAnObjectError: If the stream holds a valid JSON value that is not an object (before any member is
+        returned)
+    """
+    reader = JSONStreamReader(fp, chunk_size=chunk_size)
+    if reader.peek() not in ('{', ''):
+        value = reader.read_value()
+        if not reader.at_end():
+            raise reader.error('Extra data')
+        raise NotAnObjectError(value, reader)
+    reader.expect('{')
+    if reader.peek() == '}':
+        reader.expect('}')
+    else:
+        while True:
+            key = reader.read_value()
+            if not isinstance(key, str):
+                raise reader.error('Expecting property name enclosed in double quotes')
+            reader.expect(':')
+            if key in stream_arrays and reader.peek() == '[':
+                elements = ArrayElements(reader)
+                yield key, elements
+                elements.exhaust()
+            else:
+                yield key, reader.read_value()
+            if reader.expect(',}') == '}':
+                break
+    if not reader.at_end():
+        raise reader.error('Extra data')
@@ -0,0 +1,298 @@
+"""
+Generate synthetic CSB documents, e.g. for benchmarking and load testing validators.
+
+Documents can be generated for any schema version in csbschema.VALIDATORS. GeoJSON documents have a track of
+features with plausible positions, depths and times, and are written a chunk of features at a time, so that documents
+of any size can be generated without building them in memory. Documents can be deliberately broken: a given fraction
+of features can be made invalid, and the metadata can be made invalid. Each broken feature (or metadata) causes
+exactly one validation error, so the number of errors a validator should report is known (see
+Summary.expected_errors).
+Generation is deterministic for a given seed.
+"""
+from __future__ import annotations
+
+import io
+import contextlib
+import json
+import time
+import uuid
+import random
+from pathlib import Path
+from typing import BinaryIO, Generator, List, NamedTuple, Optional, Union
+
+import csbschema
+
+DEFAULT_N_FEATURES = 1000
+# Number of features encoded before being written out
+CHUNK_SIZE = 1000
+# Time of the first feature (2024-01-01T00:00:00Z), and the interval between features, in seconds
+START_TIME = 1704067200
+TIME_INTERVAL = 1.0
+_INDENT = '\n    '
+_SEPARATOR = ',' + _INDENT
+
+# Ways in which a feature can be broken, each of which causes one validation error
+FEATURE_ERRORS = ('missing_depth', 'missing_time', 'bad_time', 'bad_depth', 'short_coordinates')
+
+_FEATURE = ('{{"type": "Feature", "geometry": {{"type": "Point", "coordinates": [{lon:.6f}, {lat:.6f}]}}, '
+            '"properties": {{"depth": {depth:.1f}, "time": "{time}"{uncertainty}}}}}')
+
+
+class Summary(NamedTuple):
+    """
+    Summary of a generated document.
+    """
+    version: str
+    features: int
+    # Number of features with observation uncertainty
+    uncertainty_features: int
+    # Number of features made invalid
+    invalid_features: int
+    # Number of validation errors the document should cause
+    expected_errors: int
+
+
+def _is_xyz(version: str) -> bool:
+    return version.startswith('XYZ-')
+
+
+def _is_3_0_0(version: str) -> bool:
+    return '3.0.0-' in version
+
+
+def _has_uncertainty_metadata(version: str) -> bool:
+    # Uncertainty metadata were added in the 2023-08 schemas
+    return not version.endswith('2023-03')
+
+
+def _uncertainty_3_0_0() -> dict:
+    return {'type': 'Uncertainty',
+            'timestamp': '2024-01-01T00:00:00Z',
+            'detail': {'name': 'Synthetic Uncertainty Estimator', 'parameters': 'a=0.5, b=0.013', 'version': '1.0.0',
+                       'comment': 'Generated by csbschema.synth', 'reference': 'https://github.com/CCOMJHC/csbschema'}}
+
+
+def _uncertainty_3_1_0() -> dict:
+    return {'type': 'Uncertainty',
+            'timestamp': '2024-01-01T00:00:00Z',
+            'name': 'Synthetic Uncertainty Estimator',
+            'parameters': {'a': 0.5, 'b': 0.013},
+            'version': '1.0.0',
+            'comment': 'Generated by csbschema.synth',
+            'reference': 'https://github.com/CCOMJHC/csbschema'}
+
+
+def _metadata(version: str, rng: random.Random, uncertainty_metadata: bool, invalid_metadata: bool) -> dict:
+    """
+    :return: Metadata of a document: the whole document for XYZ versions, otherwise the GeoJSON 'properties'
+    """
+    vessel_id = f"SYNTH-{uuid.UUID(int=rng.getrandbits(128), version=4)}"
+    id_number = rng.randrange(200000000, 800000000)
+    if _is_3_0_0(version):
+        metadata = {
+            'providerContactPoint': {
+                'orgName': 'Synthetic Data Inc',
+                'email': 'support@example.com',
+                'logger': 'csbschema.synth',
+                'loggerVersion': csbschema.__version__
+            },
+            'convention': 'XYZ CSB 3.0' if _is_xyz(version) else 'GeoJSON CSB 3.0',
+            'dataLicense': 'CC0 1.0',
+            'platform': {
+                'uniqueID': vessel_id,
+                'type': 'Ship',
+                'name': 'Synthetic Vessel',
+                'length': 65,
+                'IDType': 'MMSI',
+                'IDNumber': id_number,
+                'correctors': {
+                    'positionReferencePoint': 'GNSS'
+                }
+            }
+        }
+        if _is_xyz(version):
+            metadata = {'crs': {'horizontal': {'type': 'EPSG', 'value': 4326}, 'vertical': 'Transducer'}, **metadata}
+    else:
+        metadata = {
+            'trustedNode': {
+                'providerOrganizationName': 'Synthetic Data Inc',
+                'providerEmail': 'support@example.com',
+                'uniqueVesselID': vessel_id,
+                'convention': 'XYZ GeoJSON CSB 3.1' if _is_xyz(version) else 'GeoJSON CSB 3.1',
+                'dataLicense': 'CC0 1.0',
+                'providerLogger': 'csbschema.synth',
+                'providerLoggerVersion': csbschema.__version__,
+                'navigationCRS': 'EPSG:4326',
+                'verticalReferenceOfDepth': 'Transducer',
+                'vesselPositionReferencePoint': 'GNSS'
+            },
+            'platform': {
+                'uniqueID': vessel_id,
+                'type': 'Private vessel',
+                'name': 'Synthetic Vessel',
+                'length': 65,
+                'IDType': 'MMSI',
+                'IDNumber': str(id_number),
+                'soundSpeedDocumented': False,
+                'positionOffsetsDocumented': False,
+                'dataProcessed': uncertainty_metadata
+            }
+        }
+        if uncertainty_metadata:
+            metadata['processing'] = [_uncertainty_3_1_0()]
+    if invalid_metadata:
+        convention = metadata['trustedNode'] if 'trustedNode' in metadata else metadata
+        convention['convention'] = 'CSB 0.0'
+    return metadata
+
+
+def _format_time(t: float) -> str:
+    return f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(t))}.{int(t * 1000) % 1000:03d}Z"
+
+
+def _break_feature(feature: dict, error: str) -> None:
+    properties = feature['properties']
+    if error == 'missing_depth':
+        del properties['depth']
+    elif error == 'missing_time':
+        del properties['time']
+    elif error == 'bad_time':
+        properties['time'] = properties['time'].replace('T', ' ')
+    elif error == 'bad_depth':
+        properties['depth'] = str(properties['depth'])
+    else:
+        feature['geometry']['coordinates'] = feature['geometry']['coordinates'][:1]
+
+
+def iter_document(*,
+                  version: str = csbschema.DEFAULT_VALIDATOR_VERSION,
+                  n_features: int = DEFAULT_N_FEATURES,
+                  uncertainty: float = 0.0,
+                  uncertainty_metadata: Optional[bool] = None,
+                  error_rate: float = 0.0,
+                  invalid_metadata: bool = False,
+                  seed: Optional[int] = None) -> Generator[bytes, None, Summary]:
+    """
+    Generate a synthetic CSB document, a chunk at a time.
+    :param version: Schema version the document is for
+    :param n_features: Number of features. Ignored for XYZ metadata, which have no features.
+    :param uncertainty: Fraction (from 0 to 1) of features with observation uncertainty
+    :param uncertainty_metadata: Whether to include Uncertainty metadata. If None, they are included if any feature
+        has observation uncertainty (and the schema version has Uncertainty metadata). If False when features have
+        uncertainty, the document is invalid (unless the schema version does not check for Uncertainty metadata).
+    :param error_rate: Fraction (from 0 to 1) of features that are made invalid, each in one of the ways in
+        FEATURE_ERRORS
+    :param invalid_metadata: If True, make the metadata invalid (by giving an unknown convention)
+    :param seed: Seed for the random number generator
+    :return: Generator of UTF-8 encoded chunks of the document. The value returned by the generator (i.e., the value
+        of StopIteration) is the document's Summary.
+    :raises ValueError: If an option is invalid
+    """
+    if version not in csbschema.VALIDATORS:
+        raise ValueError(f"Unknown validator version: {version}")
+    if n_features < 0:
+        raise ValueError(f"n_features must be 0 or greater, not {n_features}")
+    for name, fraction in (('uncertainty', uncertainty), ('error_rate', error_rate)):
+        if not 0.0 <= fraction <= 1.0:
+            raise ValueError(f"{name} must be between 0 and 1, not {fraction}")
+    if uncertainty_metadata is None:
+        uncertainty_metadata = uncertainty > 0.0 and _has_uncertainty_metadata(version)
+    elif uncertainty_metadata and not _has_uncertainty_metadata(version):
+        raise ValueError(f"Schema version {version} does not have Uncertainty metadata")
+    # Options are checked above, rather than when the first chunk is generated
+    return _iter_document(version, n_features, uncertainty, uncertainty_metadata, error_rate, invalid_metadata, seed)
+
+
+def _iter_document(version: str, n_features: int, uncertainty: float, uncertainty_metadata: bool, error_rate: float,
+                   invalid_metadata: bool, seed: Optional[int]) -> Generator[bytes, None, Summary]:
+    rng = random.Random(seed)
+    metadata = _metadata(version, rng, uncertainty_metadata, invalid_metadata)
+    expected_errors = 1 if invalid_metadata else 0
+    if _is_xyz(version):
+        if uncertainty_metadata and _is_3_0_0(version):
+            metadata['lineage'] = [_uncertainty_3_0_0()]
+        yield json.dumps(metadata, indent=2).encode('utf8')
+        return Summary(version, 0, 0, 0, expected_errors)
+
+    header = {'type': 'FeatureCollection'}
+    if _is_3_0_0(version):
+        header['crs'] = {'horizontal': {'type': 'EPSG', 'value': 4326}, 'vertical': 'Transducer'}
+        header['properties'] = metadata
+        if uncertainty_metadata:
+            header['lineage'] = [_uncertainty_3_0_0()]
+    else:
+        header['crs'] = {'type': 'name', 'properties': {'name': 'EPSG:4326'}}
+        header['properties'] = metadata
+    header_json = json.dumps(header, indent=2)
+    # Leave the document open, so that features can be appended
+    yield f"{header_json[:-2]},\n  \"features\": [".encode('utf8')
+
+    # A vessel track starting at a random position
+    (lon, lat) = (rng.uniform(-180.0, 180.0), rng.uniform(-60.0, 60.0))
+    depth = rng.uniform(5.0, 200.0)
+    n_uncertainty = 0
+    n_invalid = 0
+    first_with_uncertainty = None
+    chunk: List[str] = []
+    for i in range(n_features):
+        lon = (lon + rng.uniform(-1e-4, 1e-4) + 180.0) % 360.0 - 180.0
+        lat = min(max(lat + rng.uniform(-1e-4, 1e-4), -89.0), 89.0)
+        depth = min(max(depth + rng.gauss(0.0, 0.2), 0.5), 11000.0)
+        t = _format_time(START_TIME + i * TIME_INTERVAL + rng.random() * 0.5)
+        if uncertainty > 0.0 and rng.random() < uncertainty:
+            uncert = f", \"uncertainty\": [{rng.uniform(0.5, 5.0):.2f}, {rng.uniform(0.5, 5.0):.2f}, " \
+                     f"{rng.uniform(0.1, 1.0):.2f}]"
+            n_uncertainty += 1
+            if first_with_uncertainty is None:
+                first_with_uncertainty = i
+        else:
+            uncert = ''
+        feature = _FEATURE.format(lon=lon, lat=lat, depth=depth, time=t, uncertainty=uncert)
+        if error_rate > 0.0 and rng.random() < error_rate:
+            # Broken features are rare, so are decoded and re-encoded to break them
+            decoded = json.loads(feature)
+            _break_feature(decoded, rng.choice(FEATURE_ERRORS))
+            feature = json.dumps(decoded)
+            n_invalid += 1
+        chunk.append(feature)
+        if len(chunk) == CHUNK_SIZE or i == n_features - 1:
+            # Features after the first chunk are separated from the previous chunk
+            separator = _SEPARATOR if i >= CHUNK_SIZE else _INDENT
+            yield (separator + _SEPARATOR.join(chunk)).encode('utf8')
+            chunk = []
+    yield b'\n  ]\n}\n'
+
+    expected_errors += n_invalid
+    if first_with_uncertainty is not None and not uncertainty_metadata and _has_uncertainty_metadata(version):
+        # Observation uncertainty without Uncertainty metadata is reported for the first such feature, as is the
+        # absence of the metadata ('processing' or 'lineage') that should contain them
+        expected_errors += 2
+    return Summary(version, n_features, n_uncertainty, n_invalid, expected_errors)
+
+
+def write_document(output: Union[str, Path, BinaryIO], **kwargs) -> Summary:
+    """
+    Write a synthetic CSB document.
+    :param output: Path of the file to write, or a binary file-like object to write to
+    :param kwargs: Options passed to iter_document
+    :return: Summary of the document
+    :raises ValueError: If an option is invalid
+    """
+    chunks = iter_document(**kwargs)
+    with contextlib.nullcontext(output) if not isinstance(output, (str, Path)) else open(output, 'wb') as f:
+        while True:
+            try:
+                f.write(next(chunks))
+            except StopIteration as e:
+                return e.value
+
+
+def generate_document(**kwargs) -> bytes:
+    """
+    Generate a (small) synthetic CSB document in memory.
+    :param kwargs: Options passed to iter_document
+    :return: The document
+    """
+    buffer = io.BytesIO()
+    write_document(buffer, **kwargs)
+    return buffer.getvalue()
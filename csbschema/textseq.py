@@ -0,0 +1,115 @@
+"""
+Reading of B12 GeoJSON documents written as GeoJSON text sequences (RFC 8142) or newline-delimited JSON (NDJSON).
+
+Loggers that append features as they are recorded can write a document as a sequence of records rather than as a
+single FeatureCollection: a header record, which is the top-level object of the document without its features (e.g.
+{"type": "FeatureCollection", "properties": {...}}), followed by one record per feature. Records are either one per
+line (NDJSON), or, if the document starts with the record separator character RS (0x1E), each preceded by RS (RFC
+8142), in which case a record may span several lines. Blank records are ignored.
+
+Records are read a block of READ_BLOCK_SIZE bytes at a time, so that documents of any size are read in bounded memory.
+The line number of each record is kept so that errors can be reported by line, but only compactly (see LineMap).
+"""
+from __future__ import annotations
+
+import bisect
+import codecs
+from typing import Any, BinaryIO, Iterator, List, Tuple
+
+from csbschema import parsers
+
+# Number of bytes read at a time
+READ_BLOCK_SIZE = 1 << 20
+
+RS = b'\x1e'
+_LF = b'\n'
+
+
+def iter_records(f: BinaryIO) -> Iterator[Tuple[int, bytes]]:
+    """
+    :param f: Binary file-like object from which the sequence is read
+    :return: Iterator of (line number, record) tuples for the records that are not blank, where the line number is
+        that of the first line of the record's JSON text
+    """
+    separator = None
+    # Line number of the start of rest, the text after the last separator read
+    line = 1
+    rest = b''
+    while True:
+        block = f.read(READ_BLOCK_SIZE)
+        data = rest + block
+        if separator is None:
+            if block and codecs.BOM_UTF8.startswith(data):
+                # Not yet known whether the sequence starts with a byte order mark
+                rest = data
+                continue
+            if data.startswith(codecs.BOM_UTF8):
+                data = data[len(codecs.BOM_UTF8):]
+            start = data.lstrip()
+            if block and not start:
+                rest = data
+                continue
+            separator = RS if start.startswith(RS) else _LF
+        if block:
+            end = data.rfind(separator)
+            if end < 0:
+                rest = data
+                continue
+            (records, rest) = (data[:end].split(separator), data[end + 1:])
+        else:
+            (records, rest) = (data.split(separator), b'')
+        for record in records:
+            text = record.lstrip()
+            if text:
+                yield line + record.count(_LF, 0, len(record) - len(text)), record
+            line += record.count(_LF) if separator == RS else 1
+        if not block:
+            break
+
+
+def read_header(f: BinaryIO) -> Any:
+    """
+    :param f: Binary file-like object from which the sequence is read
+    :return: The parsed header record
+    :raises ValueError: If the sequence has no records, or the header record is not valid JSON
+    """
+    for (line, record) in iter_records(f):
+        return parse_header(line, record)
+    raise ValueError('GeoJSON text sequence has no header record')
+
+
+def parse_header(line: int, record: bytes) -> Any:
+    try:
+        return parsers.parse(record)
+    except ValueError as e:
+        raise ValueError(f"Header record (line {line}) is not valid JSON: {e}") from e
+
+
+class LineMap:
+    """
+    Line numbers of the header and feature records of a sequence. Consecutive records on consecutive lines are
+    stored as one run, so that memory use does not grow with the number of features unless records span several
+    lines or are separated by blank lines.
+    """
+    __slots__ = ('header_line', '_indices', '_offsets')
+
+    def __init__(self, header_line: int = 1):
+        self.header_line = header_line
+        # Index of the first feature of each run, and the difference between line number and index for the run
+        self._indices: List[int] = []
+        self._offsets: List[int] = []
+
+    def add(self, index: int, line: int) -> None:
+        """
+        Record the line number of a feature. Features must be added in order.
+        """
+        if len(self._offsets) == 0 or line - index != self._offsets[-1]:
+            self._indices.append(index)
+            self._offsets.append(line - index)
+
+    def line(self, index: int) -> int:
+        """
+        :return: Line number of a feature
+        """
+        run = bisect.bisect_right(self._indices, index) - 1
+        return index + self._offsets[run] if run >= 0 else self.header_line
@@ -0,0 +1,322 @@
+"""
+Batched validation and parsing of B12 feature timestamps, and checks of the time ordering of features.
+
+Validating each feature's 'time' against the schema's RFC3339_time pattern with a regular expression is one of the
+most expensive checks done per feature. For the patterns of the B12 schemas, check_times instead checks the times in
+bulk with NumPy: times of the same length are copied into a 2-D array of bytes, and the layout of the usual form
+(e.g. '2016-03-03T18:41:49.123Z') is checked a column at a time. Only times that are not accepted this way (e.g. with
+a year of more than four digits, or that are invalid) are checked with the regular expression, so the result is
+always the same as the schema's. The same step parses the times into seconds since the Unix epoch (timezone naive
+times, which B12 3.0.0 allows, are taken to be UTC), which are used by TimeOrder, the opt-in checks that features
+are in time order: that times do not go backwards, are not duplicated, and (optionally) have no implausible gaps.
+These can't be expressed in JSON schema.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+AVAILABLE = np is not None
+
+# RFC3339_time patterns of the B12 schemas, and whether they require the 'Z' timezone designator
+_KNOWN_PATTERNS: Dict[str, bool] = {
+    r"^([0-9]+)-(0[1-9]|1[012])-(0[1-9]|[12][0-9]|3[01])[Tt]([01][0-9]|2[0-3]):([0-5][0-9]):([0-5][0-9]|60)"
+    r"([.][0-9]+)?[Zz]?$": False,
+    r"^([0-9]+)-(0[1-9]|1[012])-(0[1-9]|[12][0-9]|3[01])[Tt]([01][0-9]|2[0-3]):([0-5][0-9]):([0-5][0-9]|60)"
+    r"([.][0-9]+)?[Zz]$": True,
+}
+# Used to parse times accepted by a pattern that is not known
+_PARSE_RE = re.compile(r"^([0-9]+)-([0-9]{2})-([0-9]{2})[Tt]([0-9]{2}):([0-9]{2}):([0-9]{2})([.][0-9]+)?")
+
+# Length of 'YYYY-MM-DDTHH:MM:SS', and the longest time checked in bulk (with up to 15 digits of fractional seconds,
+# which are exactly representable)
+_SECONDS_END = 19
+_MAX_BULK_LENGTH = _SECONDS_END + 17
+
+_ORD_0 = ord('0')
+
+
+def _days_from_civil(year, month, day):
+    """
+    :return: Days since 1970-01-01 of a date in the proleptic Gregorian calendar (works on ints or NumPy arrays)
+    """
+    year = year - (month <= 2)
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def _epoch_from_match(m: re.Match) -> float:
+    (year, month, day, hour, minute, second) = (int(g) for g in m.groups()[:6])
+    fraction = m.group(7)
+    seconds = (_days_from_civil(year, month, day) * 86400 + hour * 3600 + minute * 60 + second)
+    return seconds + (float(fraction) if fraction is not None else 0.0)
+
+
+class TimeFormat:
+    """
+    A schema's RFC3339_time definition.
+    """
+    __slots__ = ('time_re', 'zone_required')
+
+    def __init__(self, pattern: str):
+        self.time_re = re.compile(pattern)
+        # None if the pattern is not known, in which case times are only checked with the regular expression
+        self.zone_required: Optional[bool] = _KNOWN_PATTERNS.get(pattern)
+
+    def parse(self, value: Any) -> Optional[float]:
+        """
+        :return: Seconds since the Unix epoch of a single time, or None if value is not a valid time
+        """
+        if type(value) is not str or self.time_re.search(value) is None:
+            return None
+        m = _PARSE_RE.match(value)
+        return _epoch_from_match(m) if m is not None else None
+
+
+def _check_bulk(a: np.ndarray, fmt: TimeFormat) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Check and parse times of the same length.
+    :param a: Array of shape (number of times, length) of the bytes of the times
+    :return: Tuple of mask of times of the usual form, and their seconds since the Unix epoch
+    """
+    (n, length) = a.shape
+    # Bytes below '0' wrap around to above '9'
+    digits = a - np.uint8(_ORD_0)
+    is_digit = digits <= 9
+
+    def number(start: int, end: int) -> np.ndarray:
+        value = digits[:, start].astype(np.int64)
+        for i in range(start + 1, end):
+            value = value * 10 + digits[:, i]
+        return value
+
+    zone = (a[:, -1] == ord('Z')) | (a[:, -1] == ord('z'))
+    end = length - 1 if length > _SECONDS_END else length
+    if fmt.zone_required:
+        ok = zone.copy()
+    else:
+        # Without a timezone designator, the last character must be a digit of the seconds or fraction
+        ok = zone | is_digit[:, -1]
+        end = np.where(zone, length - 1, length)
+    ok &= is_digit[:, [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]].all(axis=1)
+    ok &= (a[:, 4] == ord('-')) & (a[:, 7] == ord('-')) & (a[:, 13] == ord(':')) & (a[:, 16] == ord(':'))
+    ok &= (a[:, 10] == ord('T')) | (a[:, 10] == ord('t'))
+    (year, month, day) = (number(0, 4), number(5, 7), number(8, 10))
+    (hour, minute, second) = (number(11, 13), number(14, 16), number(17, 19))
+    ok &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+    ok &= (hour <= 23) & (minute <= 59) & (second <= 60)
+
+    # Fraction of a second: nothing, or '.' followed by at least one digit, up to the end (less any designator)
+    # (computed as numerator / 10 ** number of digits, so that it is the same as float() of the fraction)
+    numerator = np.zeros(n, dtype=np.int64)
+    n_digits = np.zeros(n, dtype=np.int64)
+    if length > _SECONDS_END:
+        end = np.broadcast_to(end, (n,))
+        has_fraction = end > _SECONDS_END
+        ok &= ~has_fraction | ((a[:, _SECONDS_END] == ord('.')) & (end > _SECONDS_END + 1))
+        for i in range(_SECONDS_END + 1, length):
+            in_fraction = i < end
+            ok &= ~in_fraction | is_digit[:, i]
+            numerator = np.where(in_fraction, numerator * 10 + digits[:, i], numerator)
+            n_digits += in_fraction
+    seconds = _days_from_civil(year, month, day) * 86400 + hour * 3600 + minute * 60 + second
+    return ok, seconds + numerator / 10.0 ** n_digits
+
+
+def check_times(times: Sequence[Any], fmt: TimeFormat) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Check times against a schema's RFC3339_time definition in bulk, and parse them.
+    :param times: Values of features' 'time' members
+    :param fmt: TimeFormat of the schema
+    :return: Tuple of mask of which of times are valid, and their seconds since the Unix epoch (NaN where invalid)
+    """
+    n = len(times)
+    valid = np.zeros(n, dtype=bool)
+    epochs = np.full(n, np.nan)
+    remaining = range(n)
+    if fmt.zone_required is not None and n > 0:
+        is_str = np.fromiter(map(type, times), dtype=object, count=n) == str
+        str_indices = np.flatnonzero(is_str)
+        strings = times if len(str_indices) == n else [times[i] for i in str_indices]
+        lengths = np.fromiter(map(len, strings), dtype=np.intp, count=len(strings))
+        # Non-ASCII characters are replaced by one byte each ('?', which is not valid anywhere in a time), so that
+        # the bytes of each time are at the same offsets as its characters
+        data = np.frombuffer(''.join(strings).encode('ascii', errors='replace'), dtype=np.uint8)
+        offsets = np.cumsum(lengths) - lengths
+        unique_lengths = np.unique(lengths).tolist()
+        for length in unique_lengths:
+            if not _SECONDS_END <= length <= _MAX_BULK_LENGTH:
+                continue
+            if len(unique_lengths) == 1:
+                # All the times have the same length (the usual case)
+                group = np.arange(len(strings))
+                rows = data.reshape(len(strings), length)
+            else:
+                group = np.flatnonzero(lengths == length)
+                rows = data[offsets[group, None] + np.arange(length)]
+            (ok, seconds) = _check_bulk(rows, fmt)
+            indices = str_indices[group[ok]]
+            valid[indices] = True
+            epochs[indices] = seconds[ok]
+        remaining = np.flatnonzero(~valid).tolist()
+    # Anything else (including times of unusual forms the regular expression may still accept) is checked one at a time
+    parse = fmt.parse
+    for i in remaining:
+        epoch = parse(times[i])
+        if epoch is not None:
+            valid[i] = True
+            epochs[i] = epoch
+    return valid, epochs
+
+
+def _feature_time(feature: Any) -> Any:
+    if type(feature) is dict:
+        properties = feature.get('properties')
+        if type(properties) is dict:
+            return properties.get('time')
+    return None
+
+
+# Kinds of time ordering issue
+BACKWARDS = 'backwards'
+DUPLICATE = 'duplicate'
+GAP = 'gap'
+
+
+class TimeIssue(NamedTuple):
+    """
+    A feature whose time is out of order with that of the previous feature with a valid time.
+    """
+    kind: str
+    index: int
+    # Index of the previous feature with a valid time
+    previous_index: int
+    # Time in seconds since the time of the previous feature
+    delta: float
+    max_gap: Optional[float] = None
+
+    @property
+    def path(self) -> str:
+        return f"/features/{self.index}/properties/time"
+
+    @property
+    def message(self) -> str:
+        if self.kind == BACKWARDS:
+            return (f"Time is {-self.delta:.3f} s before the time of feature {self.previous_index}; "
+                    'features must be in time order.')
+        if self.kind == DUPLICATE:
+            return f"Time is the same as the time of feature {self.previous_index}."
+        return (f"Time is {self.delta:.3f} s after the time of feature {self.previous_index}, more than the maximum "
+                f"gap of {self.max_gap:g} s.")
+
+
+def _issue(index: int, delta: float, previous_index: int, max_gap: Optional[float]) -> Optional[TimeIssue]:
+    """
+    :param delta: Time in seconds since the time of the previous feature with a valid time
+    """
+    if delta < 0:
+        return TimeIssue(BACKWARDS, index, previous_index, delta)
+    if delta == 0:
+        return TimeIssue(DUPLICATE, index, previous_index, delta)
+    if max_gap is not None and delta > max_gap:
+        return TimeIssue(GAP, index, previous_index, delta, max_gap)
+    return None
+
+
+class TimeOrder:
+    """
+    Feature hook checking that features are in time order: each feature's time must be later than that of the
+    previous feature with a valid time, and (if max_gap is not None) no more than max_gap seconds later. Features
+    without a valid time are skipped, as they are reported by schema validation.
+    """
+    __slots__ = ('fmt', 'max_gap', 'max_issues', 'issues', '_first_index', '_first_time', '_previous_index',
+                 '_previous_time')
+
+    def __init__(self, fmt: TimeFormat, *,
+                 max_gap: Optional[float] = None,
+                 max_issues: Optional[int] = None):
+        """
+        :param fmt: TimeFormat of the schema features are validated against
+        :param max_gap: Largest plausible time in seconds between consecutive features, or None not to check gaps
+        :param max_issues: If not None, stop checking once this many issues have been found
+        """
+        self.fmt = fmt
+        self.max_gap = max_gap
+        self.max_issues = max_issues
+        self.issues: List[TimeIssue] = []
+        # Index and time of the first and last features with a valid time
+        self._first_index: Optional[int] = None
+        self._first_time: Optional[float] = None
+        self._previous_index: Optional[int] = None
+        self._previous_time: Optional[float] = None
+
+    def __call__(self, features: list, first_index: int) -> None:
+        if self.max_issues is not None and len(self.issues) >= self.max_issues:
+            return
+        times = [_feature_time(f) for f in features]
+        if AVAILABLE:
+            (valid, epochs) = check_times(times, self.fmt)
+            indices = np.flatnonzero(valid)
+            self._check(first_index + indices, epochs[indices])
+        else:
+            for i, t in enumerate(times):
+                epoch = self.fmt.parse(t)
+                if epoch is not None:
+                    self._check_one(first_index + i, epoch)
+        if self.max_issues is not None:
+            del self.issues[self.max_issues:]
+
+    def _check(self, indices: np.ndarray, epochs: np.ndarray) -> None:
+        if len(indices) == 0:
+            return
+        (last_index, last_time) = (int(indices[-1]), float(epochs[-1]))
+        if self._previous_index is None:
+            (self._first_index, self._first_time) = (int(indices[0]), float(epochs[0]))
+            previous_indices = indices[:-1]
+            deltas = np.diff(epochs)
+            indices = indices[1:]
+        else:
+            previous_indices = np.concatenate(([self._previous_index], indices[:-1]))
+            deltas = np.diff(epochs, prepend=self._previous_time)
+        (self._previous_index, self._previous_time) = (last_index, last_time)
+        out_of_order = deltas <= 0
+        if self.max_gap is not None:
+            out_of_order |= deltas > self.max_gap
+        for j in np.flatnonzero(out_of_order):
+            self.issues.append(_issue(int(indices[j]), float(deltas[j]), int(previous_indices[j]), self.max_gap))
+
+    def _check_one(self, index: int, epoch: float) -> None:
+        if self._previous_index is None:
+            (self._first_index, self._first_time) = (index, epoch)
+        else:
+            issue = _issue(index, epoch - self._previous_time, self._previous_index, self.max_gap)
+            if issue is not None:
+                self.issues.append(issue)
+        self._previous_index = index
+        self._previous_time = epoch
+
+    def merge(self, other: TimeOrder, offset: int) -> None:
+        """
+        Merge the issues found by a TimeOrder (with the same format and limits) that checked the features following
+        those checked by this one, as if this one had checked them.
+        :param other: TimeOrder that checked the following features, numbered from 0
+        :param offset: Index within the document of the first feature checked by other
+        """
+        if self.max_issues is not None and len(self.issues) >= self.max_issues:
+            return
+        if other._first_index is None:
+            return
+        self._check_one(offset + other._first_index, other._first_time)
+        self.issues.extend(issue._replace(index=offset + issue.index, previous_index=offset + issue.previous_index)
+                           for issue in other.issues)
+        (self._previous_index, self._previous_time) = (offset + other._previous_index, other._previous_time)
+        if self.max_issues is not None:
+            del self.issues[self.max_issues:]
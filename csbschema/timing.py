@@ -0,0 +1,133 @@
+"""
+Timing of the phases of validation.
+
+Validation of a document is split into phases:
+    - load_validator: loading and compiling the schema validators (only slow the first time a process uses a schema)
+    - parse: parsing the document. When streaming, the document is parsed during the structural phase instead.
+    - structural: validating the document against the JSON schema. Semantic rules on individual features (e.g.
+      looking for observation uncertainty) are run during the structural pass over the features, so are included.
+    - semantic: rules that can't be expressed in JSON schema (e.g. that uncertainty metadata are present if features
+      have observation uncertainty)
+
+Phase durations are returned in the result of validate_data(..., timings=True). Hooks added with add_span_hook are
+called with a Span as each phase of every validation ends, followed by a Span for the whole validation (named
+'validate'), e.g. to send them to a tracing system.
+"""
+from __future__ import annotations
+
+import time
+import threading
+import contextlib
+from typing import Callable, ContextManager, Dict, List, NamedTuple, Optional
+
+LOAD_VALIDATOR = 'load_validator'
+PARSE = 'parse'
+STRUCTURAL = 'structural'
+SEMANTIC = 'semantic'
+VALIDATE = 'validate'
+PHASES = (LOAD_VALIDATOR, PARSE, STRUCTURAL, SEMANTIC)
+# Key of the total duration in timings returned by validate_data
+TOTAL = 'total'
+
+
+class Span(NamedTuple):
+    """
+    A timed phase of validation.
+    """
+    name: str
+    # Start time, in seconds since the epoch
+    start: float
+    # Duration, in seconds
+    duration: float
+    # E.g. 'schema', the schema resource name, and for 'validate' spans, 'feature_count' and 'error_count'
+    attributes: dict
+
+
+SpanHook = Callable[[Span], None]
+
+_hooks: List[SpanHook] = []
+_hooks_lock = threading.Lock()
+
+
+def add_span_hook(hook: SpanHook) -> None:
+    """
+    Call hook with a Span for each phase of every validation (in any thread), and for each validation as a whole.
+    Hooks are called in the validating thread, so should be quick, and must not raise exceptions.
+    """
+    with _hooks_lock:
+        _hooks.append(hook)
+
+
+def remove_span_hook(hook: SpanHook) -> None:
+    """
+    :raises ValueError: If hook was not added
+    """
+    with _hooks_lock:
+        _hooks.remove(hook)
+
+
+class PhaseTimer:
+    """
+    Times the phases of one validation, starting when created.
+    """
+    __slots__ = ('durations', 'attributes', '_hooks', '_start', '_start_time')
+
+    def __init__(self, hooks: List[SpanHook], attributes: dict):
+        self.durations: Dict[str, float] = {}
+        self.attributes = attributes
+        self._hooks = hooks
+        self._start_time = time.time()
+        self._start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        start_time = time.time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.durations[name] = self.durations.get(name, 0.0) + duration
+            for hook in self._hooks:
+                hook(Span(name, start_time, duration, self.attributes))
+
+    def finish(self, feature_count: Optional[int], error_count: int) -> Dict[str, float]:
+        """
+        :return: Duration of each phase, and the total duration
+        """
+        total = time.perf_counter() - self._start
+        if len(self._hooks) > 0:
+            span = Span(VALIDATE, self._start_time, total,
+                        dict(self.attributes, feature_count=feature_count, error_count=error_count))
+            for hook in self._hooks:
+                hook(span)
+        return dict(self.durations, **{TOTAL: total})
+
+
+class _NullTimer:
+    """
+    Stand-in for PhaseTimer when validation is not being timed.
+    """
+    __slots__ = ()
+    _phase = contextlib.nullcontext()
+
+    def phase(self, name: str) -> ContextManager[None]:
+        return self._phase
+
+    def finish(self, feature_count: Optional[int], error_count: int) -> None:
+        return None
+
+
+NULL_TIMER = _NullTimer()
+
+
+def start(timings: bool, **attributes) -> PhaseTimer | _NullTimer:
+    """
+    :param timings: If True, time the phases of validation even if there are no span hooks
+    :param attributes: Attributes of the spans
+    :return: A PhaseTimer if timings is True or there are span hooks, otherwise a timer that does nothing
+    """
+    hooks = list(_hooks)
+    if timings or len(hooks) > 0:
+        return PhaseTimer(hooks, attributes)
+    return NULL_TIMER
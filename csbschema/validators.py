@@ -1,32 +1,204 @@
 from __future__ import annotations
 
+import io
 import sys
 import mmap
 import json
+import functools
+import itertools
+import contextlib
+import logging
 from pathlib import Path
-from typing import Tuple, Union, List, Optional
-from collections.abc import Callable
+from typing import Tuple, Union, List, Optional, Iterable, Iterator, BinaryIO, ContextManager
+from collections.abc import Callable, Mapping
 import re
+import secrets
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from importlib import resources
 
 import jsonschema
 from jsonschema import Draft202012Validator
 
+from csbschema import stream, fastpath, compiler, parsers, timing, shapes, timestamps, split, xyz, textseq
+
+logger = logging.getLogger(__name__)
+
 ID_NUMBER_MMSI_RE = re.compile(r"^\d{9}$")
 ID_NUMBER_IMO_RE = re.compile(r"^IMO\d{7}$")
 ID_NUMBER_RE = {'MMSI': ID_NUMBER_MMSI_RE,
                 'IMO': ID_NUMBER_IMO_RE}
 
+# A document to validate: the path of a JSON document, an already parsed document, a buffer containing a JSON
+# document (parsed without copying), or a binary file-like object from which a JSON document can be read.
+DocumentSource = Union[Path, str, dict, bytes, bytearray, memoryview, BinaryIO]
 
-def _error_factory(path: str, message: str) -> dict:
-    return {'path': path, 'message': message}
+# XYZ data supplied alongside XYZ metadata (see csbschema.xyz): the path of a data file, a buffer containing the
+# data, or a binary file-like object from which the data can be read.
+XYZDataSource = Union[Path, str, bytes, bytearray, memoryview, BinaryIO]
 
+# Hook called with each batch of features, and the index within the document of the batch's first feature, during
+# the structural validation pass over a document's features. To be used when features are validated in parallel
+# (see feature_jobs), a hook must be picklable, and have a method merge(other, offset) that merges in the state of a
+# copy of the hook that was called with the following features (numbered from 0), of which the first is at offset.
+FeatureHook = Callable[[list, int], None]
 
-def _validate_return(document: dict, errors: List[dict]) -> Tuple[bool, dict]:
-    if len(errors) == 0:
-        return True, {'document': document}
+# Maximum number of compiled schema validators kept in the process-wide validator cache. This is larger than the
+# number of bundled schemas so that, by default, no validator is ever evicted.
+VALIDATOR_CACHE_SIZE = 16
+# Number of features checked at a time by the bulk (fast path) feature checks when streaming
+FAST_PATH_BATCH_SIZE = 10000
+# When validating features in parallel, the number of chunks of features per job (more chunks than jobs evens out
+# the load), and the minimum size in bytes of a chunk (smaller documents are validated with fewer jobs)
+FEATURE_CHUNKS_PER_JOB = 4
+MIN_FEATURE_CHUNK_SIZE = 1 << 20
+
+
+class ErrorRecord(Mapping):
+    """
+    A validation error. Behaves like the (read-only) dict {'path': ..., 'message': ...}, but stores the path as the
+    tuple of path elements at which the error was found, only formatting it as a JSON path string when 'path' is
+    read. Use dict(error) to get a plain dict (e.g. for JSON serialization).
+    """
+    __slots__ = ('path_elements', 'message', '_path')
+
+    _KEYS = ('path', 'message')
+
+    def __init__(self, path_elements: Tuple, message: str, *, path: Optional[str] = None):
+        self.path_elements = path_elements
+        self.message = message
+        self._path = path
+
+    @property
+    def path(self) -> str:
+        if self._path is None:
+            self._path = '/' + '/'.join([str(elem) for elem in self.path_elements])
+        return self._path
+
+    def __getitem__(self, key: str) -> str:
+        if key == 'path':
+            return self.path
+        if key == 'message':
+            return self.message
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+def _error_factory(path: str, message: str) -> ErrorRecord:
+    return ErrorRecord(tuple(path.split('/')[1:]) if path != '/' else (), message, path=path)
+
+
+def _structural_error(e: jsonschema.ValidationError, *, context_path: Tuple = ()) -> ErrorRecord:
+    return ErrorRecord((*context_path, *e.absolute_path), e.message)
+
+
+class _ErrorBudgetExhausted(Exception):
+    """
+    Raised by _ErrorList to stop validation once an error beyond its error budget has been found.
+    """
+
+
+class _ErrorList(list):
+    """
+    List of validation errors with an optional error budget. Up to max_errors errors are kept. Adding a further error
+    marks the list as truncated and raises _ErrorBudgetExhausted, which stops validation, so a list is only truncated
+    if errors were actually left out of it.
+    """
+    def __init__(self, max_errors: Optional[int] = None):
+        super().__init__()
+        if max_errors is not None and max_errors < 1:
+            raise ValueError(f"max_errors must be at least 1, not {max_errors}")
+        self.max_errors = max_errors
+        self.truncated = False
+
+    def append(self, error: ErrorRecord) -> None:
+        if self.truncated or (self.max_errors is not None and len(self) >= self.max_errors):
+            self.truncate()
+        super().append(error)
+
+    def extend(self, errors: Iterable[ErrorRecord]) -> None:
+        # Append errors one at a time so that iterators of errors are only consumed up to the error budget
+        for e in errors:
+            self.append(e)
+        if getattr(errors, 'truncated', False):
+            # Errors were left out of the list being added
+            self.truncate()
+
+    def truncate(self) -> None:
+        """
+        Mark the list as truncated, because errors beyond the error budget were found (possibly by another list,
+        e.g. of a worker process, whose errors have been added to this one), and stop validation.
+        """
+        self.truncated = True
+        raise _ErrorBudgetExhausted()
+
+    def __reduce__(self):
+        # Pickled (e.g. returned by a worker process) without going through append, which checks the error budget
+        return _restore_error_list, (list(self), self.max_errors, self.truncated)
+
+
+def _restore_error_list(errors: List[ErrorRecord], max_errors: Optional[int], truncated: bool) -> _ErrorList:
+    restored = _ErrorList(max_errors)
+    restored[:] = errors
+    restored.truncated = truncated
+    return restored
+
+
+def _uses_schema(schema_rsrc_name: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator for the version-specific validators, which are called with the document to validate (and keyword
+    arguments), and are passed the internal resource name of the schema they validate against as schema_rsrc_name.
+    The resource name is also kept as the validator's schema_rsrc_name attribute (see csbschema.SCHEMA_RESOURCES),
+    so that it is only given here.
+    :param schema_rsrc_name: Internal resource name of schema document to use for validation
+    """
+    def decorate(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def validate(document_path: DocumentSource, **kwargs) -> Tuple[bool, dict]:
+            return func(document_path, schema_rsrc_name=schema_rsrc_name, **kwargs)
+        validate.schema_rsrc_name = schema_rsrc_name
+        return validate
+    return decorate
+
+
+def _new_error_list(max_errors: Optional[int], fail_fast: bool) -> _ErrorList:
+    return _ErrorList(1 if fail_fast else max_errors)
+
+
+def _validate_return(document: dict, errors: List[ErrorRecord], *,
+                     return_document: bool = True,
+                     n_features: Optional[int] = None,
+                     timer: timing.PhaseTimer = timing.NULL_TIMER,
+                     timings: bool = False) -> Tuple[bool, dict]:
+    if n_features is None and isinstance(document, dict) and isinstance(document.get('features'), list):
+        n_features = len(document['features'])
+    durations = timer.finish(n_features, len(errors))
+    if return_document:
+        result = {'document': document}
     else:
-        return False, {'document': document, 'errors': errors}
+        # Slim result: don't keep the document alive (or send it between processes) just to report the number of
+        # features it contained.
+        result = {}
+    if n_features is not None and (not return_document or timings):
+        result['feature_count'] = n_features
+    if timings:
+        result['timings'] = durations
+
+    if len(errors) == 0:
+        return True, result
+    result['errors'] = list(errors)
+    if getattr(errors, 'truncated', False):
+        result['truncated'] = True
+    return False, result
 
 
 def _get_schema_file(resource_path: str) -> Path:
@@ -39,8 +211,29 @@ def _get_schema_file(resource_path: str) -> Path:
         return Path(str(resources.files('csbschema').joinpath(f"data/{resource_path}")))
 
 
+def _validator_cache(func: Callable[[str], object]) -> Callable[[str], object]:
+    """
+    Like functools.lru_cache(maxsize=VALIDATOR_CACHE_SIZE), for functions that load something per schema resource,
+    but also loads each value only once: a thread asking for a value that another thread is loading waits for it,
+    rather than loading (and getting) its own copy.
+    """
+    cached = functools.lru_cache(maxsize=VALIDATOR_CACHE_SIZE)(func)
+    lock = threading.RLock()
+
+    @functools.wraps(func)
+    def get(schema_rsrc_name: str):
+        with lock:
+            return cached(schema_rsrc_name)
+    get.cache_info = cached.cache_info
+    get.cache_clear = cached.cache_clear
+    return get
+
+
+@_validator_cache
 def _get_validator(schema_rsrc_name: str) -> Draft202012Validator:
     """
+    Load and compile the validator for a schema resource. Compiled validators are cached (thread-safely) per
+    schema resource name for the life of the process, so the schema is only read and parsed once.
     :param schema_rsrc_name: Internal resource name of schema document to use for validation
     :return: Draft202012Validator instance
     """
@@ -50,15 +243,621 @@ def _get_validator(schema_rsrc_name: str) -> Draft202012Validator:
     return jsonschema.Draft202012Validator(schema)
 
 
-def _open_document(document_path: Union[Path, str]) -> Union[dict, list]:
-    with open(document_path, 'rb') as f:
+@_validator_cache
+def _get_feature_validator(schema_rsrc_name: str) -> Draft202012Validator:
+    """
+    :param schema_rsrc_name: Internal resource name of schema document to use for validation
+    :return: Draft202012Validator instance for the schema's GeoJSONFeature definition
+    """
+    schema = _get_validator(schema_rsrc_name).schema
+    return jsonschema.Draft202012Validator({'$ref': '#/definitions/GeoJSONFeature',
+                                            'definitions': schema['definitions']})
+
+
+@_validator_cache
+def _get_compiled_validator(schema_rsrc_name: str) -> Optional[compiler.CompiledValidator]:
+    """
+    :param schema_rsrc_name: Internal resource name of schema document to use for validation
+    :return: Validator using code generated from the schema, or None if the schema cannot be compiled
+    """
+    try:
+        return compiler.compile_schema(_get_validator(schema_rsrc_name).schema)
+    except compiler.UnsupportedSchemaError as e:
+        logger.warning(f"Unable to compile schema {schema_rsrc_name}, using generic validator instead: {e}")
+        return None
+
+
+def _select_validator(schema_rsrc_name: str, compiled: bool) -> Union[Draft202012Validator,
+                                                                      compiler.CompiledValidator]:
+    """
+    :return: Compiled validator if requested and available, otherwise the generic Draft202012Validator
+    """
+    if compiled:
+        validator = _get_compiled_validator(schema_rsrc_name)
+        if validator is not None:
+            return validator
+    return _get_validator(schema_rsrc_name)
+
+
+def _select_feature_validator(schema_rsrc_name: str, compiled: bool) -> Union[Draft202012Validator,
+                                                                              compiler.CompiledValidator]:
+    """
+    :return: Compiled validator for the schema's GeoJSONFeature definition if requested and available, otherwise
+        the generic Draft202012Validator
+    """
+    if compiled:
+        validator = _get_compiled_validator(schema_rsrc_name)
+        if validator is not None:
+            return validator.definition('GeoJSONFeature')
+    return _get_feature_validator(schema_rsrc_name)
+
+
+@_validator_cache
+def _get_feature_spec(schema_rsrc_name: str) -> Optional[fastpath.FeatureSpec]:
+    """
+    :param schema_rsrc_name: Internal resource name of schema document to use for validation
+    :return: FeatureSpec for bulk feature checks, or None if the fast path is not available for the schema
+    """
+    return fastpath.FeatureSpec.from_schema(_get_validator(schema_rsrc_name).schema)
+
+
+@_validator_cache
+def _get_shape_cache(schema_rsrc_name: str) -> Optional[shapes.ShapeCache]:
+    """
+    :param schema_rsrc_name: Internal resource name of schema document to use for validation
+    :return: ShapeCache of the shapes of features found valid against the schema, or None if memoization is not
+        available for the schema
+    """
+    return shapes.ShapeCache.from_schema(_get_validator(schema_rsrc_name).schema)
+
+
+@_validator_cache
+def _get_time_format(schema_rsrc_name: str) -> timestamps.TimeFormat:
+    """
+    :param schema_rsrc_name: Internal resource name of schema document to use for validation
+    :return: TimeFormat of the schema's RFC3339_time definition
+    """
+    return timestamps.TimeFormat(_get_validator(schema_rsrc_name).schema['definitions']['RFC3339_time']['pattern'])
+
+
+def shape_cache_info(schema_rsrc_name: str) -> Optional[shapes.ShapeCacheInfo]:
+    """
+    :param schema_rsrc_name: Internal resource name of schema document
+    :return: Statistics of the memoization of feature validation against the schema in this process, or None if
+        memoization is not available for the schema
+    """
+    cache = _get_shape_cache(schema_rsrc_name)
+    return cache.cache_info() if cache is not None else None
+
+
+def clear_validator_cache() -> None:
+    """
+    Discard all cached compiled validators.
+    """
+    _get_validator.cache_clear()
+    _get_feature_validator.cache_clear()
+    _get_compiled_validator.cache_clear()
+    _get_feature_spec.cache_clear()
+    _get_shape_cache.cache_clear()
+    _get_time_format.cache_clear()
+
+
+def _load_validators(schema_rsrc_name: str, *,
+                    fast_path: bool = True,
+                    compiled: bool = False) -> Tuple[Union[Draft202012Validator, compiler.CompiledValidator],
+                                                     Optional[fastpath.FeatureSpec]]:
+    """
+    Load (or get from the cache) the validators used to validate a GeoJSON document and its features.
+    :return: Tuple of the document validator, and the FeatureSpec for bulk feature checks (None if fast_path is False
+        or the fast path is not available for the schema)
+    """
+    validator = _select_validator(schema_rsrc_name, compiled)
+    _select_feature_validator(schema_rsrc_name, compiled)
+    if not fast_path:
+        return validator, None
+    _get_shape_cache(schema_rsrc_name)
+    return validator, _get_feature_spec(schema_rsrc_name)
+
+
+def _iter_feature_errors(schema_rsrc_name: str, features: list, *,
+                         first_index: int = 0,
+                         fast_path: bool = True,
+                         compiled: bool = False) -> Iterator[ErrorRecord]:
+    """
+    Validate features against the schema's GeoJSONFeature definition.
+    :param schema_rsrc_name: Internal resource name of schema document to use for validation
+    :param features: Features to validate
+    :param first_index: Index within the document of the first of features
+    :param fast_path: If True, check features in bulk (if possible), then skip the schema validation of features
+        whose shape has already been found valid (see csbschema.shapes), only using the schema to validate the rest.
+    :param compiled: If True, use the validator generated from the schema by csbschema.compiler.
+    :return: Iterator of errors, in feature order
+    """
+    feature_validator = _select_feature_validator(schema_rsrc_name, compiled)
+    spec = _get_feature_spec(schema_rsrc_name) if fast_path else None
+    shape_cache = _get_shape_cache(schema_rsrc_name) if fast_path else None
+    if spec is None:
+        indices = range(len(features))
+    else:
+        indices = fastpath.screen_features(features, spec).tolist()
+    for i in indices:
+        feature = features[i]
+        if shape_cache is not None and shape_cache.is_valid(feature):
+            continue
+        valid = True
+        for e in feature_validator.iter_errors(feature):
+            valid = False
+            yield _structural_error(e, context_path=('features', first_index + i))
+        if valid and shape_cache is not None:
+            shape_cache.add(feature)
+
+
+def _iter_batches(features: list, n: int) -> Iterator[list]:
+    for i in range(0, len(features), n):
+        yield features[i:i + n]
+
+
+def _walk_features(schema_rsrc_name: str, batches: Iterable[list], errors: _ErrorList,
+                   feature_hooks: Iterable[FeatureHook], *,
+                   fast_path: bool = True,
+                   compiled: bool = False) -> None:
+    """
+    Validate batches of features against the schema's GeoJSONFeature definition, passing each batch to the feature
+    hooks while it is being validated.
+    """
+    n_features = 0
+    for batch in batches:
+        for hook in feature_hooks:
+            hook(batch, n_features)
+        errors.extend(_iter_feature_errors(schema_rsrc_name, batch, first_index=n_features, fast_path=fast_path,
+                                           compiled=compiled))
+        n_features += len(batch)
+
+
+def _walk_document(schema_rsrc_name: str,
+                   document_path: DocumentSource,
+                   errors: _ErrorList, *,
+                   feature_hooks: Iterable[FeatureHook] = (),
+                   stream: bool = False,
+                   feature_jobs: int = 1,
+                   lines: Optional[textseq.LineMap] = None,
+                   fast_path: bool = True,
+                   compiled: bool = False,
+                   timer: timing.PhaseTimer = timing.NULL_TIMER) -> Tuple[Union[dict, list], Optional[int]]:
+    """
+    Do structural validation of a B12 GeoJSON document in a single pass over its features. The top-level members
+    other than 'features' are validated against the schema, then the features are validated in batches against the
+    schema's GeoJSONFeature definition. Semantic rules that depend on features are run by feature_hooks, which are
+    called with each batch of features while it is being validated, so that features are only visited once. Errors
+    are reported in the same order as when the whole document is validated against the schema at once.
+    :param schema_rsrc_name: Internal resource name of schema document to use for validation
+    :param document_path: The document to validate
+    :param errors: List to which structural validation errors are appended. Validation stops once the list's error
+        budget is used up.
+    :param feature_hooks: Callables taking a batch of features and the index within the document of its first feature
+    :param stream: If True, read and validate features one at a time rather than loading the whole document into
+        memory (ignored if document_path is an already parsed document).
+    :param feature_jobs: If greater than 1, validate chunks of features in parallel in this many worker processes
+        (see _walk_features_parallel), if document_path is a path or a buffer, and the document can be split.
+    :param lines: If not None, the document is a GeoJSON text sequence, which is read a record at a time (see
+        _walk_sequence), and the line numbers of its records are added to lines. stream and feature_jobs are ignored.
+    :param fast_path: If True, check features in bulk (in batches of FAST_PATH_BATCH_SIZE), if possible.
+    :param compiled: If True, use the validator generated from the schema by csbschema.compiler.
+    :param timer: Timer for the load_validator, parse, and structural phases (see csbschema.timing)
+    :return: Tuple[Union[dict, list], Optional[int]]: the document (without its 'features' member if streamed or
+        validated in parallel), and the number of features (None if the document has no 'features' array).
+    """
+    if feature_jobs < 1:
+        raise ValueError(f"feature_jobs must be at least 1, not {feature_jobs}")
+    if lines is not None:
+        return _walk_sequence(schema_rsrc_name, document_path, errors, lines, feature_hooks=feature_hooks,
+                              fast_path=fast_path, compiled=compiled, timer=timer)
+    if feature_jobs > 1 and not _is_parsed(document_path) and not hasattr(document_path, 'read'):
+        with timer.phase(timing.LOAD_VALIDATOR):
+            (validator, _) = _load_validators(schema_rsrc_name, fast_path=fast_path, compiled=compiled)
+        feature_hooks = list(feature_hooks)
+        with _open_buffer(document_path) as buffer:
+            walked = _walk_features_parallel(schema_rsrc_name, buffer, errors, validator, feature_hooks=feature_hooks,
+                                             feature_jobs=feature_jobs, fast_path=fast_path, compiled=compiled,
+                                             timer=timer)
+        if walked is not None:
+            return walked
+
+    if stream and not _is_parsed(document_path):
+        return _stream_document(schema_rsrc_name, document_path, errors, feature_hooks=feature_hooks,
+                                fast_path=fast_path, compiled=compiled, timer=timer)
+
+    with timer.phase(timing.LOAD_VALIDATOR):
+        (validator, _) = _load_validators(schema_rsrc_name, fast_path=fast_path, compiled=compiled)
+    with timer.phase(timing.PARSE):
+        document = _open_document(document_path)
+    features = document.get('features') if isinstance(document, dict) else None
+    if not isinstance(features, list):
+        with timer.phase(timing.STRUCTURAL), contextlib.suppress(_ErrorBudgetExhausted):
+            errors.extend(_structural_error(e) for e in validator.iter_errors(document))
+        return document, None
+
+    with timer.phase(timing.STRUCTURAL), contextlib.suppress(_ErrorBudgetExhausted):
+        # Validate the top-level members with an empty stand-in for the features so that errors are reported in
+        # the same order as when the whole document is validated at once.
+        errors.extend(_structural_error(e) for e in validator.iter_errors(dict(document, features=[])))
+        _walk_features(schema_rsrc_name, _iter_batches(features, FAST_PATH_BATCH_SIZE), errors, feature_hooks,
+                       fast_path=fast_path, compiled=compiled)
+    return document, len(features)
+
+
+def _parse_records(records: List[Tuple[int, bytes]]) -> List[Union[list, ValueError]]:
+    """
+    Parse a batch of feature records, all at once if they are all valid JSON.
+    :return: Runs of consecutive records: a list of the parsed records, or the error for a record that is not valid
+        JSON
+    """
+    try:
+        features = parsers.parse(b'[' + b','.join([record for (_, record) in records]) + b']')
+        if len(features) == len(records):
+            return [features]
+    except ValueError:
+        pass
+    runs: List[Union[list, ValueError]] = []
+    for (_, record) in records:
+        try:
+            feature = parsers.parse(record)
+        except ValueError as e:
+            runs.append(e)
+            continue
+        if len(runs) == 0 or not isinstance(runs[-1], list):
+            runs.append([])
+        runs[-1].append(feature)
+    return runs
+
+
+def _walk_sequence(schema_rsrc_name: str,
+                   document_path: DocumentSource,
+                   errors: _ErrorList,
+                   lines: textseq.LineMap, *,
+                   feature_hooks: Iterable[FeatureHook] = (),
+                   fast_path: bool = True,
+                   compiled: bool = False,
+                   timer: timing.PhaseTimer = timing.NULL_TIMER) -> Tuple[Union[dict, list], int]:
+    """
+    Do structural validation of a B12 GeoJSON document written as a GeoJSON text sequence (see csbschema.textseq),
+    as _stream_document does for a FeatureCollection: the header record is validated against the schema as the
+    top-level object of the document, and each following record is validated as a feature, a batch at a time.
+    Feature records that are not valid JSON are reported as errors at /features/{i}.
+    :param errors: List to which structural validation errors are appended. If the list's error budget is used
+        up, the remaining records are read (to count the features), but not parsed.
+    :param lines: LineMap to which the line numbers of the records are added
+    :param timer: Timer for the load_validator and structural phases. Parsing is included in the structural phase.
+    :return: Tuple[Union[dict, list], int]: the header record without its 'features' member, and the number of
+        features.
+    :raises ValueError: If the sequence has no records, or the header record is not valid JSON
+    """
+    if _is_parsed(document_path):
+        raise ValueError('A GeoJSON text sequence must be given as a path, a buffer, or a file-like object')
+    with timer.phase(timing.LOAD_VALIDATOR):
+        (validator, spec) = _load_validators(schema_rsrc_name, fast_path=fast_path, compiled=compiled)
+    batch_size = FAST_PATH_BATCH_SIZE if spec is not None else 1
+
+    with timer.phase(timing.STRUCTURAL):
+        feature_errors = _ErrorList(errors.max_errors)
+        n_features = 0
+        # Number of features up to the end of the batch being validated
+        batch_end = 0
+        with _open_binary(document_path) as f:
+            records = textseq.iter_records(f)
+            first = next(records, None)
+            if first is None:
+                raise ValueError('GeoJSON text sequence has no header record')
+            lines.header_line = first[0]
+            header = textseq.parse_header(*first)
+            try:
+                for batch in _batched(records, batch_size):
+                    batch_end = n_features + len(batch)
+                    for (i, (line, _)) in enumerate(batch):
+                        lines.add(n_features + i, line)
+                    for run in _parse_records(batch):
+                        if isinstance(run, ValueError):
+                            feature_errors.append(ErrorRecord(('features', n_features),
+                                                              f"Feature record is not valid JSON: {run}"))
+                            n_features += 1
+                            continue
+                        for hook in feature_hooks:
+                            hook(run, n_features)
+                        feature_errors.extend(_iter_feature_errors(schema_rsrc_name, run, first_index=n_features,
+                                                                   fast_path=fast_path, compiled=compiled))
+                        n_features += len(run)
+            except _ErrorBudgetExhausted:
+                # Count the remaining features without parsing them
+                n_features = batch_end
+                for (line, _) in records:
+                    lines.add(n_features, line)
+                    n_features += 1
+
+        # Validate the header with an empty stand-in for the features so that errors are reported in the same
+        # order as when a FeatureCollection is validated
+        with contextlib.suppress(_ErrorBudgetExhausted):
+            if isinstance(header, dict):
+                if header.get('features', []) != []:
+                    errors.append(ErrorRecord(('features',), 'Features must be given as records after the header '
+                                                             'record, not in the header record.'))
+                errors.extend(_structural_error(e) for e in validator.iter_errors(dict(header, features=[])))
+                header.pop('features', None)
+            else:
+                errors.extend(_structural_error(e) for e in validator.iter_errors(header))
+            errors.extend(feature_errors)
+
+    return header, n_features
+
+
+def _add_line_numbers(errors: List[ErrorRecord], lines: textseq.LineMap) -> None:
+    """
+    Add the line number of the record at which each error was found (the header record, unless the error is in a
+    feature) to its message.
+    """
+    for (i, e) in enumerate(errors):
+        elements = e.path_elements
+        line = lines.header_line
+        if len(elements) > 1 and elements[0] == 'features':
+            with contextlib.suppress(ValueError):
+                line = lines.line(int(elements[1]))
+        errors[i] = ErrorRecord(elements, f"{e.message} (line {line})", path=e._path)
+
+
+def _is_parsed(document: DocumentSource) -> bool:
+    return isinstance(document, (dict, list))
+
+
+def _open_document(document: DocumentSource) -> Union[dict, list]:
+    """
+    :param document: Path of a JSON document, an already parsed document, a buffer containing a JSON document, or
+        a binary file-like object from which a JSON document can be read
+    :return: Parsed document
+    """
+    if _is_parsed(document):
+        return document
+    if isinstance(document, (bytes, bytearray, memoryview)):
+        return parsers.parse(document)
+    if hasattr(document, 'read'):
+        return parsers.parse(document.read())
+    with open(document, 'rb') as f:
         with mmap.mmap(f.fileno(), length=0, access=mmap.ACCESS_READ) as mm:
-            return json.load(mm)
+            # Parse straight from the memory-mapped file
+            with memoryview(mm) as buffer:
+                return parsers.parse(buffer)
+
+
+@contextlib.contextmanager
+def _open_buffer(document: Union[Path, str, bytes, bytearray, memoryview]) -> Iterator[memoryview]:
+    """
+    :param document: Path of a JSON document (which is memory-mapped), or a buffer containing a JSON document
+    :return: Context manager giving a memoryview of the document
+    """
+    if isinstance(document, (bytes, bytearray, memoryview)):
+        with memoryview(document) as buffer:
+            yield buffer
+        return
+    with open(document, 'rb') as f:
+        with mmap.mmap(f.fileno(), length=0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as buffer:
+                yield buffer
+
+
+def _open_binary(document: DocumentSource) -> ContextManager[BinaryIO]:
+    """
+    :param document: Path of a JSON document, a buffer containing a JSON document, or a binary file-like object
+    :return: Context manager giving a binary file-like object from which the document can be read. File-like
+        objects passed in are not closed.
+    """
+    if isinstance(document, (bytes, bytearray, memoryview)):
+        return io.BytesIO(document)
+    if hasattr(document, 'read'):
+        return contextlib.nullcontext(document)
+    return open(document, 'rb')
+
+
+def _batched(iterable: Iterable, n: int) -> Iterator[list]:
+    it = iter(iterable)
+    while True:
+        batch = list(itertools.islice(it, n))
+        if not batch:
+            return
+        yield batch
+
+
+def _stream_document(schema_rsrc_name: str,
+                     document_path: DocumentSource,
+                     errors: _ErrorList, *,
+                     feature_hooks: Iterable[FeatureHook] = (),
+                     fast_path: bool = True,
+                     compiled: bool = False,
+                     timer: timing.PhaseTimer = timing.NULL_TIMER) -> Tuple[dict, Optional[int]]:
+    """
+    Do structural validation of a B12 GeoJSON document, as _walk_document does, without loading the whole document
+    into memory. Features are read and validated a batch at a time.
+    :param errors: List to which structural validation errors are appended. If the list's error budget is used
+        up, the remaining features are read, but not validated.
+    :param timer: Timer for the load_validator and structural phases. Parsing is included in the structural phase.
+    :return: Tuple[dict, Optional[int]]: the document without its 'features' member, and the number of features
+        (None if the document has no 'features' array).
+    """
+    with timer.phase(timing.LOAD_VALIDATOR):
+        (validator, spec) = _load_validators(schema_rsrc_name, fast_path=fast_path, compiled=compiled)
+    batch_size = FAST_PATH_BATCH_SIZE if spec is not None else 1
+
+    with timer.phase(timing.STRUCTURAL):
+        header = {}
+        feature_errors = _ErrorList(errors.max_errors)
+        n_features = None
+        with _open_binary(document_path) as f:
+            try:
+                for key, value in stream.iter_object(f, stream_arrays=('features',)):
+                    if not isinstance(value, stream.ArrayElements):
+                        header[key] = value
+                        continue
+                    try:
+                        _walk_features(schema_rsrc_name, _batched(value, batch_size), feature_errors, feature_hooks,
+                                       fast_path=fast_path, compiled=compiled)
+                    except _ErrorBudgetExhausted:
+                        # Skip the remaining features, but keep reading so that members after 'features' are
+                        # validated
+                        value.exhaust()
+                    n_features = value.count
+            except stream.NotAnObjectError as not_object:
+                # The document has no features to stream, so is validated whole, as it is when not streaming
+                with contextlib.suppress(_ErrorBudgetExhausted):
+                    errors.extend(_structural_error(e) for e in validator.iter_errors(not_object.value))
+                return not_object.value, None
+
+        # Validate the top-level members with an empty stand-in for the streamed features so that errors are
+        # reported in the same order as when the whole document is validated at once.
+        if n_features is not None:
+            header['features'] = []
+        with contextlib.suppress(_ErrorBudgetExhausted):
+            errors.extend(_structural_error(e) for e in validator.iter_errors(header))
+            errors.extend(feature_errors)
+        if n_features is not None:
+            del header['features']
+
+    return header, n_features
+
+
+# Buffer containing the document whose features are being validated in parallel, shared with forked worker processes
+_feature_buffer: Optional[memoryview] = None
+
+
+def _set_feature_buffer(buffer: memoryview) -> None:
+    global _feature_buffer
+    _feature_buffer = buffer
+
+
+def _validate_feature_chunk(schema_rsrc_name: str, start: int, end: Optional[int],
+                            feature_hooks: List[FeatureHook], max_errors: Optional[int], *,
+                            fast_path: bool,
+                            compiled: bool) -> Tuple[int, int, _ErrorList, List[FeatureHook]]:
+    """
+    Validate a chunk of the features of the shared document in a worker process.
+    :param start: Offset in the shared buffer of the opening bracket of the features array, or of the comma before
+        the chunk's first feature
+    :param end: Offset of the comma after the chunk's last feature, or None for the last chunk, which ends at the
+        closing bracket of the features array
+    :return: Tuple of the number of features in the chunk, the offset at which the chunk ends, the errors (with
+        feature indices numbered from the start of the chunk, and truncated if the chunk has more errors than
+        max_errors), and the feature hooks after being called with the
+        chunk's features
+    :raises ValueError: If the chunk is not a sequence of JSON values, i.e. if start or end is not between two
+        features (or the document is not valid JSON)
+    """
+    if end is None:
+        end = split.find_array_end(_feature_buffer, start + 1)
+        if end is None:
+            raise ValueError('The features array does not end')
+    features = parsers.parse(b''.join((b'[', _feature_buffer[start + 1:end], b']')))
+    errors = _ErrorList(max_errors)
+    with contextlib.suppress(_ErrorBudgetExhausted):
+        _walk_features(schema_rsrc_name, _iter_batches(features, FAST_PATH_BATCH_SIZE), errors, feature_hooks,
+                       fast_path=fast_path, compiled=compiled)
+    return len(features), end, errors, feature_hooks
+
+
+def _feature_error(e: ErrorRecord, offset: int) -> ErrorRecord:
+    return ErrorRecord(('features', offset + e.path_elements[1], *e.path_elements[2:]), e.message)
+
+
+def _walk_features_parallel(schema_rsrc_name: str,
+                            buffer: memoryview,
+                            errors: _ErrorList,
+                            validator: Union[Draft202012Validator, compiler.CompiledValidator], *,
+                            feature_hooks: List[FeatureHook],
+                            feature_jobs: int,
+                            fast_path: bool = True,
+                            compiled: bool = False,
+                            timer: timing.PhaseTimer = timing.NULL_TIMER) -> Optional[Tuple[dict, int]]:
+    """
+    Do structural validation of a B12 GeoJSON document, as _walk_document does, validating chunks of its features in
+    parallel in worker processes. The workers are forked with the buffer, and each parses its own chunk of features
+    from it (see csbschema.split), so that features are neither parsed by the parent process nor pickled. Errors and
+    feature hooks are merged in feature order, renumbering features from the start of the document.
+    :param buffer: The document
+    :return: Tuple[dict, int]: the document without its 'features' member, and the number of features; or None if
+        the features can't be validated in parallel (e.g. the document is too small, is not a single object with a
+        'features' array, or is not valid JSON), in which case errors and feature_hooks are left unchanged, and the
+        document should be validated serially.
+    """
+    if not split.AVAILABLE or 'fork' not in multiprocessing.get_all_start_methods():
+        return None
+    if not all(callable(getattr(hook, 'merge', None)) for hook in feature_hooks):
+        return None
+    with timer.phase(timing.PARSE):
+        start = split.find_features_start(buffer)
+        if start is None:
+            return None
+        n_chunks = min(feature_jobs * FEATURE_CHUNKS_PER_JOB, (len(buffer) - start) // MIN_FEATURE_CHUNK_SIZE)
+        points = split.split_points(buffer, start, n_chunks) if n_chunks > 1 else []
+        if len(points) == 0:
+            return None
+
+    with timer.phase(timing.STRUCTURAL):
+        # Chunks of features, as [start, end, result], where result is None until the chunk has been validated, and
+        # False if it did not parse. A chunk that does not parse was split from the next chunk at the wrong place
+        # (or the document is not valid JSON), so the two are merged and validated again.
+        chunks = [[chunk_start, chunk_end, None] for chunk_start, chunk_end in zip([start, *points], [*points, None])]
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=min(feature_jobs, len(chunks)), mp_context=context,
+                                 initializer=_set_feature_buffer, initargs=(buffer,)) as executor:
+            while any(result is None for (_, _, result) in chunks):
+                futures = [(chunk, executor.submit(_validate_feature_chunk, schema_rsrc_name, chunk[0], chunk[1],
+                                                   feature_hooks, errors.max_errors, fast_path=fast_path,
+                                                   compiled=compiled))
+                           for chunk in chunks if chunk[2] is None]
+                for chunk, future in futures:
+                    try:
+                        chunk[2] = future.result()
+                    except ValueError:
+                        chunk[2] = False
+                merged = []
+                for chunk in chunks:
+                    if len(merged) > 0 and merged[-1][2] is False:
+                        merged[-1] = [merged[-1][0], chunk[1], None]
+                    else:
+                        merged.append(chunk)
+                if merged[-1][2] is False:
+                    # The features array does not end where expected: validate the document serially, which also
+                    # reports it if it is not valid JSON
+                    return None
+                chunks = merged
+        chunks = [result for (_, _, result) in chunks]
+
+    with timer.phase(timing.PARSE):
+        # Parse the document with a unique string in place of the features array, to check that the array is the
+        # document's only 'features' member
+        stand_in = f"csbschema-{secrets.token_hex(8)}"
+        try:
+            header = parsers.parse(b''.join((buffer[:start], f'"{stand_in}"'.encode(), buffer[chunks[-1][1] + 1:])))
+        except ValueError:
+            return None
+        if not isinstance(header, dict) or header.get('features') != stand_in:
+            return None
+        header['features'] = []
+
+    with timer.phase(timing.STRUCTURAL):
+        offsets = list(itertools.accumulate((n for (n, _, _, _) in chunks), initial=0))
+        for (_, _, _, chunk_hooks), offset in zip(chunks, offsets):
+            for hook, chunk_hook in zip(feature_hooks, chunk_hooks):
+                hook.merge(chunk_hook, offset)
+        with contextlib.suppress(_ErrorBudgetExhausted):
+            # Validate the top-level members with an empty stand-in for the features, as when streaming
+            errors.extend(_structural_error(e) for e in validator.iter_errors(header))
+            for (_, _, chunk_errors, _), offset in zip(chunks, offsets):
+                errors.extend(_feature_error(e, offset) for e in chunk_errors)
+                if chunk_errors.truncated:
+                    errors.truncate()
+    del header['features']
+    return header, offsets[-1]
 
 
 def _get_properties(document: dict, errors: List, *,
                     not_found_mesg: Optional[str] = None) -> Optional[dict]:
-    if 'properties' not in document:
+    if not isinstance(document, dict) or 'properties' not in document:
         mesg = not_found_mesg
         if mesg is None:
             mesg = "'properties' property is needed for semantic validation, but was not found."
@@ -111,7 +910,7 @@ def _get_lineage(document: dict, errors: List, *,
 
 def _get_features(document: dict, errors: List, *,
                   not_found_mesg: Optional[str] = None) -> Optional[dict]:
-    if 'features' not in document:
+    if not isinstance(document, dict) or 'features' not in document:
         mesg = not_found_mesg
         if mesg is None:
             mesg = "'features' property is needed for semantic validation, but was not found."
@@ -163,9 +962,86 @@ def validate_b12_3_0_0_properties(document: dict, errors: List) -> None:
                                          f"Unknown IDType {id_type}."))
 
 
-def validate_b12_3_0_0_features(document: dict, errors: List) -> None:
+def _has_uncertainty(feature) -> bool:
+    return (isinstance(feature, dict) and isinstance(feature.get('properties'), dict)
+            and 'uncertainty' in feature['properties'])
+
+
+def _first_feature_with_uncertainty(features: list) -> Optional[int]:
+    for i, f in enumerate(features):
+        if _has_uncertainty(f):
+            return i
+    return None
+
+
+class _FirstFeatureWithUncertainty:
+    """
+    Feature hook recording the index of the first feature with observation uncertainty.
     """
+    __slots__ = ('index',)
 
+    def __init__(self):
+        self.index: Optional[int] = None
+
+    def __call__(self, features: list, first_index: int) -> None:
+        if self.index is None:
+            i = _first_feature_with_uncertainty(features)
+            if i is not None:
+                self.index = first_index + i
+
+    def merge(self, other: _FirstFeatureWithUncertainty, offset: int) -> None:
+        if self.index is None and other.index is not None:
+            self.index = offset + other.index
+
+
+def _new_time_order(schema_rsrc_name: str, errors: _ErrorList, *,
+                    check_time_order: bool,
+                    max_time_gap: Optional[float]) -> Optional[timestamps.TimeOrder]:
+    """
+    :return: Feature hook checking the time order of features, or None if the time order is not to be checked
+    """
+    if max_time_gap is not None and not max_time_gap > 0:
+        raise ValueError(f"max_time_gap must be greater than 0, not {max_time_gap}")
+    if not check_time_order and max_time_gap is None:
+        return None
+    # One issue more than the error budget is looked for, so that the errors are only truncated if there are more
+    return timestamps.TimeOrder(_get_time_format(schema_rsrc_name), max_gap=max_time_gap,
+                                max_issues=errors.max_errors + 1 if errors.max_errors is not None else None)
+
+
+def validate_time_order(time_order: timestamps.TimeOrder, errors: List) -> None:
+    """
+    Report features that are out of time order, as found by a TimeOrder feature hook
+    """
+    for issue in time_order.issues:
+        errors.append(_error_factory(issue.path, issue.message))
+
+
+def validate_b12_3_0_0_uncertainty_meta(document: dict, errors: List, first_feature_with_uncert: int) -> None:
+    """
+    Check that Uncertainty lineage metadata are present given that observation uncertainty was found
+    :param first_feature_with_uncert: Index of the first feature with observation uncertainty
+    """
+    properties: dict = _get_properties(document, errors)
+    if properties is None:
+        return
+
+    error_mesg: str = 'Observation uncertainty found, but Uncertainty metadata was not found.'
+    uncert_meta_present = False
+    lineage: dict = _get_lineage(document, errors)
+    if lineage is not None:
+        for l in lineage:
+            if l['type'] == 'Uncertainty':
+                uncert_meta_present = True
+                break
+    if not uncert_meta_present:
+        errors.append(_error_factory(f"/features/{first_feature_with_uncert}/properties",
+                                     error_mesg))
+
+
+def validate_b12_3_0_0_features(document: dict, errors: List) -> None:
+    """
+    Do custom semantic validation on features for B12 v. 3.0.0
     """
     features = _get_features(document, errors)
     if features is None:
@@ -173,115 +1049,140 @@ def validate_b12_3_0_0_features(document: dict, errors: List) -> None:
 
     # Look for presence of uncertainty in any datum, if present, make sure Uncertainty processing metadata
     # element is also present
-    uncert_present = False
-    first_feature_with_uncert = 0
-    for f in features:
-        if 'uncertainty' in f['properties']:
-            uncert_present = True
-            break
-        first_feature_with_uncert += 1
-    if uncert_present:
-        properties: dict = _get_properties(document, errors)
-        if properties is None:
-            return
-
-        error_mesg: str = 'Observation uncertainty found, but Uncertainty metadata was not found.'
-        uncert_meta_present = False
-        lineage: dict = _get_lineage(document, errors)
-        if lineage is not None:
-            for l in lineage:
-                if l['type'] == 'Uncertainty':
-                    uncert_meta_present = True
-                    break
-        if not uncert_meta_present:
-            errors.append(_error_factory(f"/features/{first_feature_with_uncert}/properties",
-                                         error_mesg))
+    first_feature_with_uncert = _first_feature_with_uncertainty(features)
+    if first_feature_with_uncert is not None:
+        validate_b12_3_0_0_uncertainty_meta(document, errors, first_feature_with_uncert)
 
 
 def validate_b12_3_0_0(schema_rsrc_name: str,
-                       document_path: Union[Path, str], *,
-                       validate_uncertainty: bool = True) -> Tuple[bool, dict]:
+                       document_path: DocumentSource, *,
+                       validate_uncertainty: bool = True,
+                       check_time_order: bool = False,
+                       max_time_gap: Optional[float] = None,
+                       stream: bool = False,
+                       feature_jobs: int = 1,
+                       sequence: bool = False,
+                       fast_path: bool = True,
+                       compiled: bool = False,
+                       max_errors: Optional[int] = None,
+                       fail_fast: bool = False,
+                       return_document: bool = True,
+                       timings: bool = False) -> Tuple[bool, dict]:
     """
     Validate B12 version 3.0.0 CSB data and metadata against JSON schema
     :param schema_rsrc_name: Internal resource name of schema document to use for validation
-    :param document_path: The document to validate
+    :param document_path: The document to validate (see DocumentSource): a path, an already parsed document, bytes
+        or a memoryview containing JSON, or a binary file-like object
     :param validate_uncertainty: Boolean flag controlling whether uncertainty metadata should be validated.
+    :param check_time_order: If True, check that features are in time order: that the time of each feature is
+        later than that of the previous feature (with a valid time), so that times neither go backwards nor are
+        duplicated. Errors are reported at /features/{i}/properties/time.
+    :param max_time_gap: If not None, also check that the time of each feature is no more than this many seconds
+        later than that of the previous feature (implies check_time_order).
+    :param stream: If True, read and validate features one at a time rather than loading the whole document into
+        memory. The 'document' returned will then not include the 'features' member. Ignored if document_path is
+        an already parsed document.
+    :param feature_jobs: If greater than 1, and document_path is a path or a buffer, validate the features in
+        parallel in this many worker processes, each parsing and validating a chunk of the features (see
+        csbschema.split). The 'document' returned will then not include the 'features' member. Needs NumPy and the
+        fork start method; otherwise, or if the document is too small to split, the features are validated serially.
+    :param sequence: If True, the document is a GeoJSON text sequence (or NDJSON): a header record holding the
+        top-level members of the document other than 'features', followed by one record per feature (see
+        csbschema.textseq). Records are read and validated a batch at a time, so memory use does not grow with the
+        number of features, and the line number of the record at which each error was found is added to its message.
+        The 'document' returned is the header record. stream and feature_jobs are ignored.
+    :param fast_path: If True, check features in bulk (if NumPy is installed), and skip the schema validation of
+        features whose shape has already been found valid, only validating the remaining features against the
+        schema. This gives the same errors as schema validation, but is much faster.
+    :param compiled: If True, validate using code generated from the schema by csbschema.compiler rather than
+        the generic jsonschema validator. This gives the same errors, but is faster.
+    :param max_errors: If not None, report at most this many errors, stopping validation once a further error is
+        found.
+    :param fail_fast: If True, report only the first error, stopping validation once a second is found (equivalent
+        to max_errors=1).
+    :param return_document: If False, the returned dict will not contain 'document', but will instead contain
+        'feature_count', the number of features in the document (if it has a 'features' array).
+    :param timings: If True, the returned dict will also contain 'timings', the time in seconds taken by each phase of
+        validation (see csbschema.timing), and 'feature_count'.
     :return: Tuple[bool, dict]. If bool is True (which signals that validation succeeded), then dict will contain
         a single key 'document' whose value is a dict representing the document that was validated. If bool is False
         (which signals that validation failed), then dict will contain two keys: (1) 'document' whose value
         is a dict representing the document that failed validation; and (2) 'errors' whose value is a list
-        of dicts mapping JSON path elements to errors encountered at that element.
+        of dicts mapping JSON path elements to errors encountered at that element. If validation was stopped because
+        errors beyond the error budget were found, dict will also contain the key 'truncated' with the value True.
     """
-    validator = _get_validator(schema_rsrc_name)
-    document = _open_document(document_path)
-
-    errors = []
-    for e in validator.iter_errors(document):
-        # Basic validation against schema failed, note the failures, but allow validation to continue
-        errors.append(_error_factory('/' + '/'.join([str(elem) for elem in e.absolute_path]),
-                                     e.message))
-
-    # Do custom "semantic" validation that is difficult/not possible to express in JSON schema
-    validate_b12_3_0_0_properties(document, errors)
-    if validate_uncertainty:
-        validate_b12_3_0_0_features(document, errors)
-
-    return _validate_return(document, errors)
-
-
-def validate_b12_3_0_0_2023_03(document_path: Union[Path, str]) -> Tuple[bool, dict]:
+    timer = timing.start(timings, schema=schema_rsrc_name)
+    errors = _new_error_list(max_errors, fail_fast)
+    # Semantic rules on features are run during the structural validation pass over the features
+    uncertainty = _FirstFeatureWithUncertainty()
+    time_order = _new_time_order(schema_rsrc_name, errors, check_time_order=check_time_order,
+                                 max_time_gap=max_time_gap)
+    feature_hooks = [uncertainty] if validate_uncertainty else []
+    if time_order is not None:
+        feature_hooks.append(time_order)
+    lines = textseq.LineMap() if sequence else None
+    (document, n_features) = _walk_document(schema_rsrc_name, document_path, errors, feature_hooks=feature_hooks,
+                                            stream=stream, feature_jobs=feature_jobs, lines=lines,
+                                            fast_path=fast_path, compiled=compiled, timer=timer)
+
+    with timer.phase(timing.SEMANTIC), contextlib.suppress(_ErrorBudgetExhausted):
+        # Do custom "semantic" validation that is difficult/not possible to express in JSON schema
+        validate_b12_3_0_0_properties(document, errors)
+        if validate_uncertainty:
+            if n_features is None:
+                _get_features(document, errors)
+            elif uncertainty.index is not None:
+                validate_b12_3_0_0_uncertainty_meta(document, errors, uncertainty.index)
+        if time_order is not None:
+            validate_time_order(time_order, errors)
+
+    if lines is not None:
+        _add_line_numbers(errors, lines)
+    return _validate_return(document, errors, return_document=return_document, n_features=n_features,
+                            timer=timer, timings=timings)
+
+
+@_uses_schema('CSB-schema-3_0_0-2023-03.json')
+def validate_b12_3_0_0_2023_03(document_path: DocumentSource, *, schema_rsrc_name: str,
+                               **kwargs) -> Tuple[bool, dict]:
     """
     Validate B12 version 3.0.0 CSB data and metadata against 2023-03 JSON schema
     :param document_path: The document to validate
+    :param kwargs: Additional keyword arguments (e.g. stream) passed to validate_b12_3_0_0
     :return: Tuple[bool, dict]. If bool is True (which signals that validation succeeded), then dict will contain
         a single key 'document' whose value is a dict representing the document that was validated. If bool is False
         (which signals that validation failed), then dict will contain two keys: (1) 'document' whose value
         is a dict representing the document that failed validation; and (2) 'errors' whose value is a list
         of dicts mapping JSON path elements to errors encountered at that element.
     """
-    return validate_b12_3_0_0('CSB-schema-3_0_0-2023-03.json', document_path,
-                              validate_uncertainty=False)
+    return validate_b12_3_0_0(schema_rsrc_name, document_path,
+                              validate_uncertainty=False, **kwargs)
 
 
-def validate_b12_3_0_0_2023_08(document_path: Union[Path, str]) -> Tuple[bool, dict]:
+@_uses_schema('CSB-schema-3_0_0-2023-08.json')
+def validate_b12_3_0_0_2023_08(document_path: DocumentSource, *, schema_rsrc_name: str,
+                               **kwargs) -> Tuple[bool, dict]:
     """
     Validate B12 version 3.0.0 CSB data and metadata against 2023-08 JSON schema
     :param document_path: The document to validate
+    :param kwargs: Additional keyword arguments (e.g. stream) passed to validate_b12_3_0_0
     :return: Tuple[bool, dict]. If bool is True (which signals that validation succeeded), then dict will contain
         a single key 'document' whose value is a dict representing the document that was validated. If bool is False
         (which signals that validation failed), then dict will contain two keys: (1) 'document' whose value
         is a dict representing the document that failed validation; and (2) 'errors' whose value is a list
         of dicts mapping JSON path elements to errors encountered at that element.
     """
-    return validate_b12_3_0_0('CSB-schema-3_0_0-2023-08.json', document_path)
+    return validate_b12_3_0_0(schema_rsrc_name, document_path, **kwargs)
 
 
-def validate_b12_xyz_3_0_0(schema_rsrc_name: str,
-                           document_path: Union[Path, str]) -> Tuple[bool, dict]:
+def validate_b12_xyz_3_0_0_properties(document: dict, errors: List) -> None:
     """
-    Validate B12 version 3.0.0 CSB XYZ metadata against JSON schema
-    :param schema_rsrc_name: Internal resource name of schema document to use for validation
-    :param document_path: The document to validate
-    :param validator:
-    :return: Tuple[bool, dict]. If bool is True (which signals that validation succeeded), then dict will contain
-        a single key 'document' whose value is a dict representing the document that was validated. If bool is False
-        (which signals that validation failed), then dict will contain two keys: (1) 'document' whose value
-        is a dict representing the document that failed validation; and (2) 'errors' whose value is a list
-        of dicts mapping JSON path elements to errors encountered at that element.
+    Do custom semantic validation on XYZ metadata platform properties
     """
-    validator = _get_validator(schema_rsrc_name)
-    document = _open_document(document_path)
-
-    errors = []
-    for e in validator.iter_errors(document):
-        # Basic validation against schema failed, note the failures, but allow validation to continue
-        errors.append(_error_factory('/' + '/'.join([str(elem) for elem in e.absolute_path]),
-                                     e.message))
-
     if 'platform' not in document:
         errors.append(_error_factory('/',
                                      "'platform' is a required property."))
-        return _validate_return(document, errors)
+        return
 
     platform = document['platform']
     # Custom validation for Platform.IDNumber, which depends on Platform.IDType
@@ -312,37 +1213,149 @@ def validate_b12_xyz_3_0_0(schema_rsrc_name: str,
             errors.append(_error_factory('/platform/IDType',
                           f"Unknown IDType {id_type}."))
 
-    return _validate_return(document, errors)
+
+def _xyz_geographic(document: dict) -> bool:
+    """
+    :return: Whether the horizontal CRS of XYZ data is geographic: EPSG:4326, as for GeoJSON, unless the metadata
+        give another CRS
+    """
+    if not isinstance(document, dict):
+        return True
+    if isinstance(document.get('trustedNode'), dict):
+        # B12 3.1.0
+        crs = document['trustedNode'].get('navigationCRS', 'EPSG:4326')
+        return crs == 'EPSG:4326'
+    if isinstance(document.get('crs'), dict) and isinstance(document['crs'].get('horizontal'), dict):
+        # B12 3.0.0
+        horizontal = document['crs']['horizontal']
+        return horizontal.get('type') != 'EPSG' or horizontal.get('value') == 4326
+    return True
+
+
+def _walk_xyz_data(checker: xyz.DataChecker, xyz_data: XYZDataSource, errors: _ErrorList) -> None:
+    """
+    Check XYZ data, a block at a time. Checking stops once the error budget of errors is used up.
+    """
+    with _open_binary(xyz_data) as f:
+        errors.extend(ErrorRecord(*issue) for issue in checker.iter_issues(f))
 
 
-def validate_b12_xyz_3_0_0_2023_03(document_path: Union[Path, str]) -> Tuple[bool, dict]:
+def validate_b12_xyz_uncertainty_meta(document: dict, errors: List, first_row_with_uncert: int, *,
+                                      processing_key: str) -> None:
+    """
+    Check that Uncertainty processing metadata are present given that observation uncertainty was found in XYZ data
+    :param first_row_with_uncert: Index of the first line of data with observation uncertainty
+    :param processing_key: Member of the metadata listing processing steps ('lineage' for B12 3.0.0, 'processing'
+        for B12 3.1.0)
+    """
+    steps = document.get(processing_key) if isinstance(document, dict) else None
+    if not isinstance(steps, list) or not any(isinstance(p, dict) and p.get('type') == 'Uncertainty' for p in steps):
+        errors.append(_error_factory(f"/data/{first_row_with_uncert}/uncertainty",
+                                     'Observation uncertainty found, but Uncertainty metadata was not found.'))
+
+
+def validate_b12_xyz_3_0_0(schema_rsrc_name: str,
+                           document_path: DocumentSource, *,
+                           xyz_data: Optional[XYZDataSource] = None,
+                           validate_uncertainty: bool = True,
+                           compiled: bool = False,
+                           max_errors: Optional[int] = None,
+                           fail_fast: bool = False,
+                           return_document: bool = True,
+                           timings: bool = False) -> Tuple[bool, dict]:
+    """
+    Validate B12 version 3.0.0 CSB XYZ metadata against JSON schema
+    :param schema_rsrc_name: Internal resource name of schema document to use for validation
+    :param document_path: The document to validate (see DocumentSource): a path, an already parsed document, bytes
+        or a memoryview containing JSON, or a binary file-like object
+    :param xyz_data: If not None, the XYZ data described by the metadata (see XYZDataSource), which are checked a
+        block at a time (see csbschema.xyz). Issues with the data are reported at /data/{i}/{column}.
+    :param validate_uncertainty: Boolean flag controlling whether uncertainty metadata should be validated, if the
+        data have observation uncertainty.
+    :param compiled: If True, validate using code generated from the schema by csbschema.compiler.
+    :param max_errors: If not None, report at most this many errors, stopping validation once a further error is
+        found.
+    :param fail_fast: If True, report only the first error, stopping validation once a second is found (equivalent
+        to max_errors=1).
+    :param return_document: If False, the returned dict will not contain 'document', but will instead contain
+        'feature_count', the number of features in the document (if it has a 'features' array).
+    :param timings: If True, the returned dict will also contain 'timings', the time in seconds taken by each phase of
+        validation (see csbschema.timing), and 'feature_count' (the number of lines of data, if xyz_data is given).
+    :param validator:
+    :return: Tuple[bool, dict]. If bool is True (which signals that validation succeeded), then dict will contain
+        a single key 'document' whose value is a dict representing the document that was validated. If bool is False
+        (which signals that validation failed), then dict will contain two keys: (1) 'document' whose value
+        is a dict representing the document that failed validation; and (2) 'errors' whose value is a list
+        of dicts mapping JSON path elements to errors encountered at that element. If validation was stopped because
+        errors beyond the error budget were found, dict will also contain the key 'truncated' with the value True.
+    """
+    timer = timing.start(timings, schema=schema_rsrc_name)
+    with timer.phase(timing.LOAD_VALIDATOR):
+        validator = _select_validator(schema_rsrc_name, compiled)
+    with timer.phase(timing.PARSE):
+        document = _open_document(document_path)
+
+    errors = _new_error_list(max_errors, fail_fast)
+    checker = None
+    if xyz_data is not None:
+        checker = xyz.DataChecker(_get_time_format(schema_rsrc_name), geographic=_xyz_geographic(document))
+    with contextlib.suppress(_ErrorBudgetExhausted):
+        with timer.phase(timing.STRUCTURAL):
+            for e in validator.iter_errors(document):
+                # Basic validation against schema failed, note the failures, but allow validation to continue
+                errors.append(_structural_error(e))
+
+        # Do custom "semantic" validation that is difficult/not possible to express in JSON schema
+        with timer.phase(timing.SEMANTIC):
+            validate_b12_xyz_3_0_0_properties(document, errors)
+
+        if checker is not None:
+            with timer.phase(timing.STRUCTURAL):
+                _walk_xyz_data(checker, xyz_data, errors)
+            with timer.phase(timing.SEMANTIC):
+                if validate_uncertainty and checker.first_row_with_uncertainty is not None:
+                    validate_b12_xyz_uncertainty_meta(document, errors, checker.first_row_with_uncertainty,
+                                                      processing_key='lineage')
+
+    return _validate_return(document, errors, return_document=return_document,
+                            n_features=checker.n_rows if checker is not None else None, timer=timer, timings=timings)
+
+
+@_uses_schema('XYZ-CSB-schema-3_0_0-2023-03.json')
+def validate_b12_xyz_3_0_0_2023_03(document_path: DocumentSource, *, schema_rsrc_name: str,
+                                   **kwargs) -> Tuple[bool, dict]:
     """
     Validate B12 version 3.0.0 CSB XYZ metadata against 2023-03 JSON schema. Note: this validates
     metadata only, and is intended for use with metadata JSON files that are separate from CSB
     data provided in CSV or other file types.
     :param document_path: The document to validate
+    :param kwargs: Additional keyword arguments passed to validate_b12_xyz_3_0_0
     :return: Tuple[bool, dict]. If bool is True (which signals that validation succeeded), then dict will contain
         a single key 'document' whose value is a dict representing the document that was validated. If bool is False
         (which signals that validation failed), then dict will contain two keys: (1) 'document' whose value
         is a dict representing the document that failed validation; and (2) 'errors' whose value is a list
         of dicts mapping JSON path elements to errors encountered at that element.
     """
-    return validate_b12_xyz_3_0_0('XYZ-CSB-schema-3_0_0-2023-03.json', document_path)
+    return validate_b12_xyz_3_0_0(schema_rsrc_name, document_path,
+                                  validate_uncertainty=False, **kwargs)
 
 
-def validate_b12_xyz_3_0_0_2023_08(document_path: Union[Path, str]) -> Tuple[bool, dict]:
+@_uses_schema('XYZ-CSB-schema-3_0_0-2023-08.json')
+def validate_b12_xyz_3_0_0_2023_08(document_path: DocumentSource, *, schema_rsrc_name: str,
+                                   **kwargs) -> Tuple[bool, dict]:
     """
     Validate B12 version 3.0.0 CSB XYZ metadata against 2023-03 JSON schema. Note: this validates
     metadata only, and is intended for use with metadata JSON files that are separate from CSB
     data provided in CSV or other file types.
     :param document_path: The document to validate
+    :param kwargs: Additional keyword arguments passed to validate_b12_xyz_3_0_0
     :return: Tuple[bool, dict]. If bool is True (which signals that validation succeeded), then dict will contain
         a single key 'document' whose value is a dict representing the document that was validated. If bool is False
         (which signals that validation failed), then dict will contain two keys: (1) 'document' whose value
         is a dict representing the document that failed validation; and (2) 'errors' whose value is a list
         of dicts mapping JSON path elements to errors encountered at that element.
     """
-    return validate_b12_xyz_3_0_0('XYZ-CSB-schema-3_0_0-2023-08.json', document_path)
+    return validate_b12_xyz_3_0_0(schema_rsrc_name, document_path, **kwargs)
 
 
 def validate_b12_3_1_0_platform(properties: dict, errors: List, *,
@@ -428,6 +1441,30 @@ def validate_b12_xyz_3_1_0_properties(document: dict, errors: List) -> None:
     validate_b12_3_1_0_platform(document, errors, context_path='')
 
 
+def validate_b12_3_1_0_uncertainty_meta(document: dict, errors: List, first_feature_with_uncert: int,
+                                        get_processing_meta: Callable[[dict, list], Optional[dict]] = \
+                                                _get_properties_processing) -> None:
+    """
+    Check that Uncertainty processing metadata are present given that observation uncertainty was found
+    :param first_feature_with_uncert: Index of the first feature with observation uncertainty
+    """
+    properties: dict = _get_properties(document, errors)
+    if properties is None:
+        return
+
+    error_mesg: str = 'Observation uncertainty found, but Uncertainty metadata was not found.'
+    uncert_meta_present = False
+    processing: dict = get_processing_meta(properties, errors)
+    if processing is not None:
+        for p in processing:
+            if p['type'] == 'Uncertainty':
+                uncert_meta_present = True
+                break
+    if not uncert_meta_present:
+        errors.append(_error_factory(f"/features/{first_feature_with_uncert}/properties",
+                                     error_mesg))
+
+
 def validate_b12_3_1_0_plus_features(document: dict, errors: List,
                                      get_processing_meta: Callable[[dict, list], Optional[dict]] = \
                                              _get_properties_processing) -> None:
@@ -441,154 +1478,244 @@ def validate_b12_3_1_0_plus_features(document: dict, errors: List,
 
     # Look for presence of uncertainty in any datum, if present, make sure Uncertainty processing metadata
     # element is also present
-    uncert_present = False
-    first_feature_with_uncert = 0
-    for f in features:
-        if 'uncertainty' in f['properties']:
-            uncert_present = True
-            break
-        first_feature_with_uncert += 1
-    if uncert_present:
-        properties: dict = _get_properties(document, errors)
-        if properties is None:
-            return
-
-        error_mesg: str = 'Observation uncertainty found, but Uncertainty metadata was not found.'
-        uncert_meta_present = False
-        processing: dict = get_processing_meta(properties, errors)
-        if processing is not None:
-            for p in processing:
-                if p['type'] == 'Uncertainty':
-                    uncert_meta_present = True
-                    break
-        if not uncert_meta_present:
-            errors.append(_error_factory(f"/features/{first_feature_with_uncert}/properties",
-                                         error_mesg))
+    first_feature_with_uncert = _first_feature_with_uncertainty(features)
+    if first_feature_with_uncert is not None:
+        validate_b12_3_1_0_uncertainty_meta(document, errors, first_feature_with_uncert, get_processing_meta)
 
 
 def validate_b12_3_1_0(schema_rsrc_name: str,
-                       document_path: Union[Path, str], *,
-                       validate_uncertainty: bool = True) -> Tuple[bool, dict]:
+                       document_path: DocumentSource, *,
+                       validate_uncertainty: bool = True,
+                       check_time_order: bool = False,
+                       max_time_gap: Optional[float] = None,
+                       stream: bool = False,
+                       feature_jobs: int = 1,
+                       sequence: bool = False,
+                       fast_path: bool = True,
+                       compiled: bool = False,
+                       max_errors: Optional[int] = None,
+                       fail_fast: bool = False,
+                       return_document: bool = True,
+                       timings: bool = False) -> Tuple[bool, dict]:
     """
     Validate B12 version 3.1.0 CSB data and metadata against JSON schema
     :param schema_rsrc_name: Internal resource name of schema document to use for validation
-    :param document_path: The document to validate
+    :param document_path: The document to validate (see DocumentSource): a path, an already parsed document, bytes
+        or a memoryview containing JSON, or a binary file-like object
     :param validate_uncertainty: Boolean flag controlling whether uncertainty metadata should be validated.
+    :param check_time_order: If True, check that features are in time order: that the time of each feature is
+        later than that of the previous feature (with a valid time), so that times neither go backwards nor are
+        duplicated. Errors are reported at /features/{i}/properties/time.
+    :param max_time_gap: If not None, also check that the time of each feature is no more than this many seconds
+        later than that of the previous feature (implies check_time_order).
+    :param stream: If True, read and validate features one at a time rather than loading the whole document into
+        memory. The 'document' returned will then not include the 'features' member. Ignored if document_path is
+        an already parsed document.
+    :param feature_jobs: If greater than 1, and document_path is a path or a buffer, validate the features in
+        parallel in this many worker processes, each parsing and validating a chunk of the features (see
+        csbschema.split). The 'document' returned will then not include the 'features' member. Needs NumPy and the
+        fork start method; otherwise, or if the document is too small to split, the features are validated serially.
+    :param sequence: If True, the document is a GeoJSON text sequence (or NDJSON): a header record holding the
+        top-level members of the document other than 'features', followed by one record per feature (see
+        csbschema.textseq). Records are read and validated a batch at a time, so memory use does not grow with the
+        number of features, and the line number of the record at which each error was found is added to its message.
+        The 'document' returned is the header record. stream and feature_jobs are ignored.
+    :param fast_path: If True, check features in bulk (if NumPy is installed), and skip the schema validation of
+        features whose shape has already been found valid, only validating the remaining features against the
+        schema. This gives the same errors as schema validation, but is much faster.
+    :param compiled: If True, validate using code generated from the schema by csbschema.compiler rather than
+        the generic jsonschema validator. This gives the same errors, but is faster.
+    :param max_errors: If not None, report at most this many errors, stopping validation once a further error is
+        found.
+    :param fail_fast: If True, report only the first error, stopping validation once a second is found (equivalent
+        to max_errors=1).
+    :param return_document: If False, the returned dict will not contain 'document', but will instead contain
+        'feature_count', the number of features in the document (if it has a 'features' array).
+    :param timings: If True, the returned dict will also contain 'timings', the time in seconds taken by each phase of
+        validation (see csbschema.timing), and 'feature_count'.
     :return: Tuple[bool, dict]. If bool is True (which signals that validation succeeded), then dict will contain
         a single key 'document' whose value is a dict representing the document that was validated. If bool is False
         (which signals that validation failed), then dict will contain two keys: (1) 'document' whose value
         is a dict representing the document that failed validation; and (2) 'errors' whose value is a list
-        of dicts mapping JSON path elements to errors encountered at that element.
+        of dicts mapping JSON path elements to errors encountered at that element. If validation was stopped because
+        errors beyond the error budget were found, dict will also contain the key 'truncated' with the value True.
     """
-    validator = _get_validator(schema_rsrc_name)
-    document = _open_document(document_path)
-
     # Do "structural" validation using jsonschema and capture all errors encountered
-    errors = []
-    for e in validator.iter_errors(document):
-        # Basic validation against schema failed, note the failures, but allow validation to continue
-        errors.append(_error_factory('/' + '/'.join([str(elem) for elem in e.absolute_path]),
-                                     e.message))
-
-    # Do custom "semantic" validation that is difficult/not possible to express in JSON schema
-    validate_b12_3_1_0_properties(document, errors)
-    if validate_uncertainty:
-        validate_b12_3_1_0_plus_features(document, errors)
-
-    return _validate_return(document, errors)
+    timer = timing.start(timings, schema=schema_rsrc_name)
+    errors = _new_error_list(max_errors, fail_fast)
+    # Semantic rules on features are run during the structural validation pass over the features
+    uncertainty = _FirstFeatureWithUncertainty()
+    time_order = _new_time_order(schema_rsrc_name, errors, check_time_order=check_time_order,
+                                 max_time_gap=max_time_gap)
+    feature_hooks = [uncertainty] if validate_uncertainty else []
+    if time_order is not None:
+        feature_hooks.append(time_order)
+    lines = textseq.LineMap() if sequence else None
+    (document, n_features) = _walk_document(schema_rsrc_name, document_path, errors, feature_hooks=feature_hooks,
+                                            stream=stream, feature_jobs=feature_jobs, lines=lines,
+                                            fast_path=fast_path, compiled=compiled, timer=timer)
+
+    with timer.phase(timing.SEMANTIC), contextlib.suppress(_ErrorBudgetExhausted):
+        # Do custom "semantic" validation that is difficult/not possible to express in JSON schema
+        validate_b12_3_1_0_properties(document, errors)
+        if validate_uncertainty:
+            if n_features is None:
+                _get_features(document, errors)
+            elif uncertainty.index is not None:
+                validate_b12_3_1_0_uncertainty_meta(document, errors, uncertainty.index)
+        if time_order is not None:
+            validate_time_order(time_order, errors)
+
+    if lines is not None:
+        _add_line_numbers(errors, lines)
+    return _validate_return(document, errors, return_document=return_document, n_features=n_features,
+                            timer=timer, timings=timings)
 
 
 def validate_b12_xyz_3_1_0(schema_rsrc_name: str,
-                           document_path: Union[Path, str]) -> Tuple[bool, dict]:
+                           document_path: DocumentSource, *,
+                           xyz_data: Optional[XYZDataSource] = None,
+                           validate_uncertainty: bool = True,
+                           compiled: bool = False,
+                           max_errors: Optional[int] = None,
+                           fail_fast: bool = False,
+                           return_document: bool = True,
+                           timings: bool = False) -> Tuple[bool, dict]:
     """
     Validate B12 version 3.1.0 CSB data and metadata against JSON schema
     :param schema_rsrc_name: Internal resource name of schema document to use for validation
-    :param document_path: The document to validate
-    :param validate_uncertainty: Boolean flag controlling whether uncertainty metadata should be validated.
+    :param document_path: The document to validate (see DocumentSource): a path, an already parsed document, bytes
+        or a memoryview containing JSON, or a binary file-like object
+    :param xyz_data: If not None, the XYZ data described by the metadata (see XYZDataSource), which are checked a
+        block at a time (see csbschema.xyz). Issues with the data are reported at /data/{i}/{column}.
+    :param validate_uncertainty: Boolean flag controlling whether uncertainty metadata should be validated, if the
+        data have observation uncertainty.
+    :param compiled: If True, validate using code generated from the schema by csbschema.compiler.
+    :param max_errors: If not None, report at most this many errors, stopping validation once a further error is
+        found.
+    :param fail_fast: If True, report only the first error, stopping validation once a second is found (equivalent
+        to max_errors=1).
+    :param return_document: If False, the returned dict will not contain 'document', but will instead contain
+        'feature_count', the number of features in the document (if it has a 'features' array).
+    :param timings: If True, the returned dict will also contain 'timings', the time in seconds taken by each phase of
+        validation (see csbschema.timing), and 'feature_count' (the number of lines of data, if xyz_data is given).
     :return: Tuple[bool, dict]. If bool is True (which signals that validation succeeded), then dict will contain
         a single key 'document' whose value is a dict representing the document that was validated. If bool is False
         (which signals that validation failed), then dict will contain two keys: (1) 'document' whose value
         is a dict representing the document that failed validation; and (2) 'errors' whose value is a list
-        of dicts mapping JSON path elements to errors encountered at that element.
+        of dicts mapping JSON path elements to errors encountered at that element. If validation was stopped because
+        errors beyond the error budget were found, dict will also contain the key 'truncated' with the value True.
     """
-    validator = _get_validator(schema_rsrc_name)
-    document = _open_document(document_path)
-
-    # Do "structural" validation using jsonschema and capture all errors encountered
-    errors = []
-    for e in validator.iter_errors(document):
-        # Basic validation against schema failed, note the failures, but allow validation to continue
-        errors.append(_error_factory('/' + '/'.join([str(elem) for elem in e.absolute_path]),
-                                     e.message))
-
-    # Do custom "semantic" validation that is difficult/not possible to express in JSON schema
-    validate_b12_xyz_3_1_0_properties(document, errors)
-
-    return _validate_return(document, errors)
-
-
-def validate_b12_3_1_0_2023_03(document_path: Union[Path, str]) -> Tuple[bool, dict]:
+    timer = timing.start(timings, schema=schema_rsrc_name)
+    with timer.phase(timing.LOAD_VALIDATOR):
+        validator = _select_validator(schema_rsrc_name, compiled)
+    with timer.phase(timing.PARSE):
+        document = _open_document(document_path)
+
+    errors = _new_error_list(max_errors, fail_fast)
+    checker = None
+    if xyz_data is not None:
+        checker = xyz.DataChecker(_get_time_format(schema_rsrc_name), geographic=_xyz_geographic(document))
+    with contextlib.suppress(_ErrorBudgetExhausted):
+        # Do "structural" validation using jsonschema and capture all errors encountered
+        with timer.phase(timing.STRUCTURAL):
+            for e in validator.iter_errors(document):
+                # Basic validation against schema failed, note the failures, but allow validation to continue
+                errors.append(_structural_error(e))
+
+        # Do custom "semantic" validation that is difficult/not possible to express in JSON schema
+        with timer.phase(timing.SEMANTIC):
+            validate_b12_xyz_3_1_0_properties(document, errors)
+
+        if checker is not None:
+            with timer.phase(timing.STRUCTURAL):
+                _walk_xyz_data(checker, xyz_data, errors)
+            with timer.phase(timing.SEMANTIC):
+                if validate_uncertainty and checker.first_row_with_uncertainty is not None:
+                    validate_b12_xyz_uncertainty_meta(document, errors, checker.first_row_with_uncertainty,
+                                                      processing_key='processing')
+
+    return _validate_return(document, errors, return_document=return_document,
+                            n_features=checker.n_rows if checker is not None else None, timer=timer, timings=timings)
+
+
+@_uses_schema('CSB-schema-3_1_0-2023-03.json')
+def validate_b12_3_1_0_2023_03(document_path: DocumentSource, *, schema_rsrc_name: str,
+                               **kwargs) -> Tuple[bool, dict]:
     """
     Validate B12 version 3.1.0 CSB data and metadata against 2023-03 JSON schema
     :param document_path: The document to validate
+    :param kwargs: Additional keyword arguments (e.g. stream) passed to validate_b12_3_1_0
     :return: Tuple[bool, dict]. If bool is True (which signals that validation succeeded), then dict will contain
         a single key 'document' whose value is a dict representing the document that was validated. If bool is False
         (which signals that validation failed), then dict will contain two keys: (1) 'document' whose value
         is a dict representing the document that failed validation; and (2) 'errors' whose value is a list
         of dicts mapping JSON path elements to errors encountered at that element.
     """
-    return validate_b12_3_1_0('CSB-schema-3_1_0-2023-03.json', document_path,
-                              validate_uncertainty=False)
+    return validate_b12_3_1_0(schema_rsrc_name, document_path,
+                              validate_uncertainty=False, **kwargs)
 
 
-def validate_b12_3_1_0_2024_04(document_path: Union[Path, str]) -> Tuple[bool, dict]:
+@_uses_schema('CSB-schema-3_1_0-2024-04.json')
+def validate_b12_3_1_0_2024_04(document_path: DocumentSource, *, schema_rsrc_name: str,
+                               **kwargs) -> Tuple[bool, dict]:
     """
     Validate B12 version 3.1.0 CSB data and metadata against 2024-04 JSON schema
     :param document_path: The document to validate
+    :param kwargs: Additional keyword arguments (e.g. stream) passed to validate_b12_3_1_0
     :return: Tuple[bool, dict]. If bool is True (which signals that validation succeeded), then dict will contain
         a single key 'document' whose value is a dict representing the document that was validated. If bool is False
         (which signals that validation failed), then dict will contain two keys: (1) 'document' whose value
         is a dict representing the document that failed validation; and (2) 'errors' whose value is a list
         of dicts mapping JSON path elements to errors encountered at that element.
     """
-    return validate_b12_3_1_0('CSB-schema-3_1_0-2024-04.json', document_path)
+    return validate_b12_3_1_0(schema_rsrc_name, document_path, **kwargs)
 
 
-def validate_b12_3_1_0_2023_08(document_path: Union[Path, str]) -> Tuple[bool, dict]:
+@_uses_schema('CSB-schema-3_1_0-2023-08.json')
+def validate_b12_3_1_0_2023_08(document_path: DocumentSource, *, schema_rsrc_name: str,
+                               **kwargs) -> Tuple[bool, dict]:
     """
     Validate B12 version 3.1.0 CSB data and metadata against 2023-08 JSON schema
     :param document_path: The document to validate
+    :param kwargs: Additional keyword arguments (e.g. stream) passed to validate_b12_3_1_0
     :return: Tuple[bool, dict]. If bool is True (which signals that validation succeeded), then dict will contain
         a single key 'document' whose value is a dict representing the document that was validated. If bool is False
         (which signals that validation failed), then dict will contain two keys: (1) 'document' whose value
         is a dict representing the document that failed validation; and (2) 'errors' whose value is a list
         of dicts mapping JSON path elements to errors encountered at that element.
     """
-    return validate_b12_3_1_0('CSB-schema-3_1_0-2023-08.json', document_path)
+    return validate_b12_3_1_0(schema_rsrc_name, document_path, **kwargs)
 
 
-def validate_b12_xyz_3_1_0_2024_04(document_path: Union[Path, str]) -> Tuple[bool, dict]:
+@_uses_schema('XYZ-CSB-schema-3_1_0-2024-04.json')
+def validate_b12_xyz_3_1_0_2024_04(document_path: DocumentSource, *, schema_rsrc_name: str,
+                                   **kwargs) -> Tuple[bool, dict]:
     """
     Validate B12 version 3.1.0 CSB XYZ metadata against 2024-04 JSON schema
     :param document_path: The document to validate
+    :param kwargs: Additional keyword arguments passed to validate_b12_xyz_3_1_0
     :return: Tuple[bool, dict]. If bool is True (which signals that validation succeeded), then dict will contain
         a single key 'document' whose value is a dict representing the document that was validated. If bool is False
         (which signals that validation failed), then dict will contain two keys: (1) 'document' whose value
         is a dict representing the document that failed validation; and (2) 'errors' whose value is a list
         of dicts mapping JSON path elements to errors encountered at that element.
     """
-    return validate_b12_xyz_3_1_0('XYZ-CSB-schema-3_1_0-2024-04.json', document_path)
+    return validate_b12_xyz_3_1_0(schema_rsrc_name, document_path, **kwargs)
 
 
-def validate_b12_xyz_3_1_0_2023_08(document_path: Union[Path, str]) -> Tuple[bool, dict]:
+@_uses_schema('XYZ-CSB-schema-3_1_0-2023-08.json')
+def validate_b12_xyz_3_1_0_2023_08(document_path: DocumentSource, *, schema_rsrc_name: str,
+                                   **kwargs) -> Tuple[bool, dict]:
     """
     Validate B12 version 3.1.0 CSB XYZ metadata against 2023-08 JSON schema
     :param document_path: The document to validate
+    :param kwargs: Additional keyword arguments passed to validate_b12_xyz_3_1_0
     :return: Tuple[bool, dict]. If bool is True (which signals that validation succeeded), then dict will contain
         a single key 'document' whose value is a dict representing the document that was validated. If bool is False
         (which signals that validation failed), then dict will contain two keys: (1) 'document' whose value
         is a dict representing the document that failed validation; and (2) 'errors' whose value is a list
         of dicts mapping JSON path elements to errors encountered at that element.
     """
-    return validate_b12_xyz_3_1_0('XYZ-CSB-schema-3_1_0-2023-08.json', document_path)
+    return validate_b12_xyz_3_1_0(schema_rsrc_name, document_path, **kwargs)
 
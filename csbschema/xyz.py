@@ -0,0 +1,311 @@
+"""
+Checks of the XYZ point data supplied alongside B12 XYZ metadata.
+
+XYZ metadata (validated against the XYZ-CSB-schema-* schemas) describe CSB data supplied separately, as delimited
+text with one sounding per line. The data are read in blocks of READ_BLOCK_SIZE bytes, so that files of any size are
+checked in bounded memory, and the values of each column of a block are parsed and checked in bulk with NumPy (or
+one at a time, if NumPy is not installed).
+
+Values are separated by commas (CSV) or by spaces and tabs (XYZ), whichever the first line uses. The columns are
+those of the members of a GeoJSON feature (see the schemas' GeoJSONFeature and CSBDatum definitions): longitude,
+latitude, depth, time, and optionally the three components of observation uncertainty (horizontal X, horizontal Y,
+and vertical Z). They are either named in a header line (in any order, with names as in COLUMN_NAMES, ignoring case,
+and ignoring columns with other names), or, without a header line, given in that order (4 or 7 values per line).
+Blank lines are ignored.
+
+Each value is checked as its GeoJSON counterpart would be: coordinates, depth, and uncertainty must be (finite)
+numbers, and times must match the schema's RFC3339_time pattern. Coordinates must also be valid longitudes and
+latitudes if the data's horizontal CRS is geographic. Issues are reported at /data/{i}/{column} (or at /data/{i}
+for lines with the wrong number of values), where i is the index of the data line (not counting the header line and
+blank lines, as features are counted), with the line number in the message.
+"""
+from __future__ import annotations
+
+import math
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from csbschema import timestamps
+
+AVAILABLE = np is not None
+
+# Number of bytes read and checked at a time
+READ_BLOCK_SIZE = 1 << 24
+
+# Paths of the values of a data line, relative to the line
+LON = ('lon',)
+LAT = ('lat',)
+DEPTH = ('depth',)
+TIME = ('time',)
+UNCERTAINTY = (('uncertainty', 0), ('uncertainty', 1), ('uncertainty', 2))
+# Columns of data without a header line, and their names in header lines
+COLUMNS = (LON, LAT, DEPTH, TIME)
+COLUMN_NAMES = {
+    'lon': LON, 'longitude': LON, 'x': LON,
+    'lat': LAT, 'latitude': LAT, 'y': LAT,
+    'depth': DEPTH, 'z': DEPTH,
+    'time': TIME, 'timestamp': TIME, 'datetime': TIME,
+    'uncertainty_x': UNCERTAINTY[0], 'uncertainty_y': UNCERTAINTY[1], 'uncertainty_z': UNCERTAINTY[2],
+}
+_RANGES = {LON: (-180.0, 180.0), LAT: (-90.0, 90.0)}
+# Order in which issues with the values of a line are reported
+_ORDER = {path: i for i, path in enumerate(COLUMNS + UNCERTAINTY)}
+
+
+class DataIssue(NamedTuple):
+    """
+    An issue with a data line (path_elements (), for issues with the data as a whole) or one of its values.
+    """
+    path_elements: Tuple
+    message: str
+
+
+def _issue(row: int, line: int, path: Tuple, message: str) -> DataIssue:
+    return DataIssue(('data', row, *path), f"{message} (line {line}).")
+
+
+def _parse_numbers(values: Sequence[bytes]) -> Tuple[Sequence[float], List[int]]:
+    """
+    :return: Tuple of the numbers (NaN where invalid), and the indices of values that are not finite numbers
+    """
+    if AVAILABLE:
+        try:
+            # Faster than converting the values to a NumPy array of strings, then to numbers
+            numbers = np.fromiter(map(float, values), dtype=np.float64, count=len(values))
+        except ValueError:
+            pass
+        else:
+            return numbers, np.flatnonzero(~np.isfinite(numbers)).tolist()
+    numbers = []
+    invalid = []
+    for i, value in enumerate(values):
+        try:
+            number = float(value)
+        except ValueError:
+            number = math.nan
+        if not math.isfinite(number):
+            invalid.append(i)
+        numbers.append(number)
+    return (np.array(numbers) if AVAILABLE else numbers), invalid
+
+
+def _out_of_range(numbers: Sequence[float], low: float, high: float) -> List[int]:
+    if AVAILABLE:
+        return np.flatnonzero((numbers < low) | (numbers > high)).tolist()
+    return [i for i, number in enumerate(numbers) if number < low or number > high]
+
+
+def _invalid_times(values: Sequence[bytes], fmt: timestamps.TimeFormat) -> List[int]:
+    if len(values) == 0:
+        return []
+    times = [value.strip() for value in b'\n'.join(values).decode('utf-8', errors='replace').split('\n')]
+    if AVAILABLE:
+        (valid, _) = timestamps.check_times(times, fmt)
+        return np.flatnonzero(~valid).tolist()
+    return [i for i, t in enumerate(times) if fmt.time_re.search(t) is None]
+
+
+def _non_empty_rows(columns: List[Sequence[bytes]]) -> List[int]:
+    """
+    :return: Indices of the rows in which any of the columns has a value that is not empty
+    """
+    if AVAILABLE:
+        non_empty = np.zeros(len(columns[0]), dtype=bool)
+        for values in columns:
+            non_empty |= np.char.str_len(np.char.strip(np.array(values, dtype=bytes))) > 0
+        return np.flatnonzero(non_empty).tolist()
+    return [j for j, values in enumerate(zip(*columns)) if any(value.strip() for value in values)]
+
+
+class DataChecker:
+    """
+    Checks the lines of XYZ data, keeping track of the number of data lines and the first with uncertainty.
+    """
+    __slots__ = ('fmt', 'geographic', 'n_rows', 'first_row_with_uncertainty', '_columns', '_separator', '_line')
+
+    def __init__(self, fmt: timestamps.TimeFormat, *, geographic: bool = True):
+        """
+        :param fmt: TimeFormat of the schema the metadata are validated against
+        :param geographic: If True, check that coordinates are valid longitudes and latitudes
+        """
+        self.fmt = fmt
+        self.geographic = geographic
+        self.n_rows = 0
+        self.first_row_with_uncertainty: Optional[int] = None
+        # Path of the value in each column (None for columns that are ignored), once the first line has been read
+        self._columns: Optional[List[Optional[Tuple]]] = None
+        self._separator: Optional[bytes] = None
+        self._line = 0
+
+    def iter_issues(self, f: BinaryIO) -> Iterator[DataIssue]:
+        """
+        :param f: Binary file-like object from which the data are read
+        :return: Iterator of issues, in line order
+        """
+        rest = b''
+        while True:
+            block = f.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+            block = rest + block
+            end = block.rfind(b'\n') + 1
+            (block, rest) = (block[:end], block[end:])
+            if block:
+                yield from self._check_block(block)
+        if rest:
+            yield from self._check_block(rest)
+
+    def _split(self, line: bytes) -> List[bytes]:
+        return line.split(self._separator) if self._separator is not None else line.split()
+
+    def _read_columns(self, line: bytes, line_number: int) -> Tuple[bool, List[DataIssue]]:
+        """
+        Work out the columns from the first line, which is a header line if its first value is a column name.
+        :return: Tuple of whether the line is a header line, and issues with the columns. If there are any issues,
+            the data can't be checked.
+        """
+        self._separator = b',' if b',' in line else None
+        names = [value.strip().decode('utf-8', errors='replace').lower() for value in self._split(line)]
+        if names[0] not in COLUMN_NAMES:
+            if len(names) not in (len(COLUMNS), len(COLUMNS) + len(UNCERTAINTY)):
+                return False, [DataIssue(('data',), f"Expected {len(COLUMNS)} or {len(COLUMNS) + len(UNCERTAINTY)} "
+                                                    'values (lon, lat, depth, time, and optionally uncertainty x, y, '
+                                                    f"and z), but found {len(names)} (line {line_number}).")]
+            self._columns = list(COLUMNS + UNCERTAINTY)[:len(names)]
+            return False, []
+
+        self._columns = [COLUMN_NAMES.get(name) for name in names]
+        issues = [DataIssue(('data',), f"Column '{name}' not found in header (line {line_number}).")
+                  for name, path in zip(('lon', 'lat', 'depth', 'time'), COLUMNS) if path not in self._columns]
+        if sum(path in self._columns for path in UNCERTAINTY) not in (0, len(UNCERTAINTY)):
+            issues.append(DataIssue(('data',), 'Header has only some of the uncertainty columns (uncertainty_x, '
+                                               f"uncertainty_y, and uncertainty_z) (line {line_number})."))
+        return True, issues
+
+    def _split_lines(self, lines: List[bytes], start: int,
+                     n_columns: int) -> Optional[Tuple[List[List[bytes]], List[int]]]:
+        """
+        Split delimited lines into columns in bulk, if every line is blank or has the right number of values.
+        :return: Tuple of the values of each column, and the offsets in lines of the lines with values, or None if
+            any line has the wrong number of values, or is blank but not empty
+        """
+        lines = lines[start:]
+        a = np.frombuffer(b'\n'.join(lines) + b'\n', dtype=np.uint8)
+        line_ends = np.flatnonzero(a == ord('\n'))
+        separators = np.cumsum(a == self._separator[0])[line_ends]
+        separators[1:] -= separators[:-1].copy()
+        lengths = np.diff(line_ends, prepend=-1) - 1
+        non_empty = lengths > 0
+        if not (separators[non_empty] == n_columns - 1).all() or (separators[~non_empty] != 0).any():
+            return None
+        line_offsets = np.flatnonzero(non_empty)
+        if len(line_offsets) < len(lines):
+            lines = [lines[i] for i in line_offsets.tolist()]
+        values = self._separator.join(lines).split(self._separator) if lines else []
+        return [values[k::n_columns] for k in range(n_columns)], (line_offsets + start).tolist()
+
+    def _split_rows(self, lines: List[bytes], start: int, n_columns: int,
+                    first_line: int) -> Tuple[List[Sequence[bytes]], List[int], List[int], List[Tuple]]:
+        """
+        Split lines into columns one at a time.
+        :return: Tuple of the values of each column, the indices and line numbers of the data lines with the right
+            number of values, and issues with the others
+        """
+        issues = []
+        rows = []
+        indices = []
+        line_numbers = []
+        for i in range(start, len(lines)):
+            values = self._split(lines[i])
+            if len(values) == n_columns:
+                rows.append(values)
+                indices.append(self.n_rows)
+                line_numbers.append(first_line + i)
+            elif len(values) > 1 or (len(values) == 1 and values[0].strip()):
+                issues.append((self.n_rows, -1, DataIssue(('data', self.n_rows),
+                                                          f"Expected {n_columns} values, but found {len(values)} "
+                                                          f"(line {first_line + i}).")))
+            else:
+                # Blank line
+                continue
+            self.n_rows += 1
+        columns = list(zip(*rows)) if len(rows) > 0 else [()] * n_columns
+        return columns, indices, line_numbers, issues
+
+    def _check_block(self, block: bytes) -> Iterator[DataIssue]:
+        lines = block.replace(b'\r\n', b'\n').split(b'\n')
+        if lines[-1] == b'':
+            lines.pop()
+        # Line number of lines[0]
+        first_line = self._line + 1
+        self._line += len(lines)
+        start = 0
+        if self._columns is None:
+            start = next((i for i, line in enumerate(lines) if line.strip()), None)
+            if start is None:
+                return
+            (header, issues) = self._read_columns(lines[start], first_line + start)
+            if len(issues) > 0:
+                # The data can't be interpreted, so are not checked
+                self._columns = []
+                yield from issues
+                return
+            if header:
+                start += 1
+        if len(self._columns) == 0:
+            return
+
+        # Values of each column of the data lines with the right number of values, and their indices and line numbers
+        n_columns = len(self._columns)
+        split = self._split_lines(lines, start, n_columns) if AVAILABLE and self._separator is not None else None
+        if split is not None:
+            (columns, line_offsets) = split
+            indices = range(self.n_rows, self.n_rows + len(line_offsets))
+            line_numbers = [first_line + i for i in line_offsets]
+            self.n_rows += len(line_offsets)
+            issues = []
+        else:
+            (columns, indices, line_numbers, issues) = self._split_rows(lines, start, n_columns, first_line)
+        columns = dict(zip(self._columns, columns))
+        columns.pop(None, None)
+        n_values = len(indices)
+
+        # Which lines have uncertainty: lines without it leave all its values empty, as features without it are valid
+        checked = {path: range(n_values) for path in columns}
+        if UNCERTAINTY[0] in columns and n_values > 0:
+            uncertain = _non_empty_rows([columns[path] for path in UNCERTAINTY])
+            for path in UNCERTAINTY:
+                checked[path] = uncertain
+            if self.first_row_with_uncertainty is None and len(uncertain) > 0:
+                self.first_row_with_uncertainty = indices[uncertain[0]]
+
+        for path, values in columns.items():
+            rows_checked = checked[path]
+            if len(rows_checked) < len(values):
+                values = [values[j] for j in rows_checked]
+            if path == TIME:
+                invalid = _invalid_times(values, self.fmt)
+                message = 'is not a valid RFC 3339 UTC time'
+            else:
+                (numbers, invalid) = _parse_numbers(values)
+                message = 'is not a number'
+                if path in _RANGES and self.geographic:
+                    (low, high) = _RANGES[path]
+                    for k in _out_of_range(numbers, low, high):
+                        j = rows_checked[k]
+                        issues.append((indices[j], _ORDER[path],
+                                       _issue(indices[j], line_numbers[j], path,
+                                              f"{float(numbers[k]):g} is not between {low:g} and {high:g}")))
+            for k in invalid:
+                j = rows_checked[k]
+                text = values[k].strip().decode('utf-8', errors='replace')
+                issues.append((indices[j], _ORDER[path],
+                               _issue(indices[j], line_numbers[j], path, f"{text!r} {message}")))
+
+        issues.sort(key=lambda issue: issue[:2])
+        for (_, _, issue) in issues:
+            yield issue
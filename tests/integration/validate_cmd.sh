@@ -57,9 +57,140 @@ csbschema validate -f docs/IHO/b12_v3_1_0_xyz_example-2023-08.json \
 csbschema validate -f docs/IHO/b12_v3_1_0_xyz_example-invalid.json \
   --version XYZ-3.1.0-2023-08
 check_failed_as_expected
+# Validate B12 3.1.0 XYZ metadata with XYZ data
+XYZ_DIR=$(mktemp -d)
+printf 'lon,lat,depth,time\n-70.5,43.1,10.5,2016-03-03T18:41:49Z\n' > "${XYZ_DIR}/valid.csv"
+printf 'lon,lat,depth,time\n-70.5,43.1,ten,2016-03-03T18:41:49Z\n' > "${XYZ_DIR}/invalid.csv"
+csbschema validate -f docs/IHO/b12_v3_1_0_xyz_example.json \
+  --version XYZ-3.1.0-2024-04 --xyz-data "${XYZ_DIR}/valid.csv"
+XYZ_RC=$?
+csbschema validate -f docs/IHO/b12_v3_1_0_xyz_example.json \
+  --version XYZ-3.1.0-2024-04 --xyz-data "${XYZ_DIR}/invalid.csv"
+XYZ_INVALID_RC=$?
+rm -rf "${XYZ_DIR}"
+[[ ${XYZ_RC} -eq 0 ]] || exit ${XYZ_RC}
+if [[ ${XYZ_INVALID_RC} -lt 1 ]]
+then
+  echo "Command succeeded, but was expected to fail."
+  exit 1
+fi
 
 # Run valid B12 3.0.0 against B12 3.1.0 - should fail (but clean)
 csbschema validate -f docs/NOAA/noaa_b12_v3_0_0_required.json --version 3.1.0-2024-04
 check_failed_as_expected
 
+# Validate several files at once, in parallel
+csbschema validate --version 3.1.0-2024-04 --jobs 2 \
+  docs/IHO/b12_v3_1_0_example.json docs/IHO/b12_v3_1_0_example-required.json \
+  'docs/IHO/b12_v3_1_0_example-pltfrm-subset-i?.json' || exit $?
+csbschema validate -f docs/NOAA/noaa_b12_v3_0_0_required.json \
+  -f docs/NOAA/noaa_b12_v3_0_0_suggested.json --version 3.0.0-2023-08 --stream || exit $?
+# Validate using the standard library JSON parser
+csbschema validate --parser stdlib -f docs/IHO/b12_v3_1_0_example.json || exit $?
+# Validate using code generated from the schema
+csbschema validate --compiled -f docs/IHO/b12_v3_1_0_example.json || exit $?
+# Batch expected to fail because one file is invalid
+csbschema validate --jobs 2 docs/IHO/b12_v3_1_0_example.json docs/IHO/b12_v3_1_0_example-invalid.json
+check_failed_as_expected
+# Stop at the first error
+csbschema validate --fail-fast -f docs/IHO/b12_v3_1_0_example-invalid.json
+check_failed_as_expected
+csbschema validate --max-errors 2 --stream -f docs/IHO/b12_v3_1_0_example-invalid.json
+check_failed_as_expected
+# Detect the schema version of each file
+csbschema validate --version auto docs/IHO/b12_v3_1_0_example.json docs/IHO/b12_v3_1_0_xyz_example.json \
+  docs/NOAA/example_csb_geojson_file.geojson docs/NOAA/noaa_b12_v3_0_0_xyz_required.json || exit $?
+# Write metrics
+METRICS_DIR=$(mktemp -d)
+csbschema validate --metrics-file "${METRICS_DIR}/csbschema.prom" \
+  docs/IHO/b12_v3_1_0_example.json docs/IHO/b12_v3_1_0_example-invalid.json
+check_failed_as_expected
+grep -q '^csbschema_validations_total{version="3.1.0-2024-04",result="invalid"} 1$' "${METRICS_DIR}/csbschema.prom" \
+  || exit 1
+rm -rf "${METRICS_DIR}"
+
+# Validate generated documents
+csbschema synth -n 2500 --uncertainty 0.5 --seed 1 | csbschema validate -f - || exit $?
+csbschema synth -n 2500 --error-rate 0.01 --seed 1 | csbschema validate -f -
+check_failed_as_expected
+# Check that features are in time order
+csbschema synth -n 2500 --seed 1 | csbschema validate --check-time-order --max-time-gap 60 -f - || exit $?
+csbschema synth -n 2500 --seed 1 | csbschema validate --max-time-gap 0.5 -f -
+check_failed_as_expected
+
+# Validate GeoJSON text sequences
+SEQUENCE_DIR=$(mktemp -d)
+python -c 'import json, sys; d = json.load(sys.stdin); f = d.pop("features"); \
+  print("\n".join(json.dumps(r) for r in [d] + f))' < docs/IHO/b12_v3_1_0_example.json > "${SEQUENCE_DIR}/b12.geojsons"
+csbschema validate --sequence -f "${SEQUENCE_DIR}/b12.geojsons"
+SEQUENCE_RC=$?
+python -c 'import json, sys; d = json.load(sys.stdin); f = d.pop("features"); \
+  print("\n".join(json.dumps(r) for r in [d] + f))' < docs/IHO/b12_v3_1_0_example-invalid.json \
+  > "${SEQUENCE_DIR}/b12-invalid.geojsons"
+csbschema validate --sequence --version auto "${SEQUENCE_DIR}"
+SEQUENCE_INVALID_RC=$?
+rm -rf "${SEQUENCE_DIR}"
+[[ ${SEQUENCE_RC} -eq 0 ]] || exit ${SEQUENCE_RC}
+if [[ ${SEQUENCE_INVALID_RC} -lt 1 ]]
+then
+  echo "Command succeeded, but was expected to fail."
+  exit 1
+fi
+
+# Validate compressed documents
+COMPRESSED_DIR=$(mktemp -d)
+gzip -c docs/IHO/b12_v3_1_0_example.json > "${COMPRESSED_DIR}/b12.json.gz"
+csbschema validate --stream --timings "${COMPRESSED_DIR}"
+COMPRESSED_RC=$?
+xz -c docs/IHO/b12_v3_1_0_example-invalid.json > "${COMPRESSED_DIR}/b12-invalid.json.xz"
+csbschema validate -f "${COMPRESSED_DIR}/b12-invalid.json.xz"
+COMPRESSED_INVALID_RC=$?
+rm -rf "${COMPRESSED_DIR}"
+[[ ${COMPRESSED_RC} -eq 0 ]] || exit ${COMPRESSED_RC}
+if [[ ${COMPRESSED_INVALID_RC} -lt 1 ]]
+then
+  echo "Command succeeded, but was expected to fail."
+  exit 1
+fi
+
+# Validate the features of a large file in parallel
+LARGE_DIR=$(mktemp -d)
+csbschema synth -n 20000 --uncertainty 0.5 --seed 3 -o "${LARGE_DIR}/large.json" || exit $?
+csbschema validate --feature-jobs 2 -f "${LARGE_DIR}/large.json"
+LARGE_RC=$?
+csbschema synth -n 20000 --error-rate 0.01 --seed 3 -o "${LARGE_DIR}/large-invalid.json" || exit $?
+csbschema validate --feature-jobs 2 -f "${LARGE_DIR}/large-invalid.json"
+LARGE_INVALID_RC=$?
+rm -rf "${LARGE_DIR}"
+[[ ${LARGE_RC} -eq 0 ]] || exit ${LARGE_RC}
+if [[ ${LARGE_INVALID_RC} -lt 1 ]]
+then
+  echo "Command succeeded, but was expected to fail."
+  exit 1
+fi
+
+# Validate using a validation server
+SOCKET_DIR=$(mktemp -d)
+csbschema serve --socket "${SOCKET_DIR}/csbschema.sock" --jobs 1 --document-root docs/IHO &
+SERVER_PID=$!
+for _ in $(seq 50)
+do
+  [[ -S "${SOCKET_DIR}/csbschema.sock" ]] && break
+  sleep 0.2
+done
+csbschema validate --server "unix:${SOCKET_DIR}/csbschema.sock" \
+  docs/IHO/b12_v3_1_0_example.json docs/IHO/b12_v3_1_0_example-required.json
+SERVER_RC=$?
+csbschema validate --server "unix:${SOCKET_DIR}/csbschema.sock" -f docs/IHO/b12_v3_1_0_example-invalid.json
+INVALID_RC=$?
+kill "${SERVER_PID}"
+wait "${SERVER_PID}"
+rm -rf "${SOCKET_DIR}"
+[[ ${SERVER_RC} -eq 0 ]] || exit ${SERVER_RC}
+if [[ ${INVALID_RC} -lt 1 ]]
+then
+  echo "Command succeeded, but was expected to fail."
+  exit 1
+fi
+
 exit 0
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import unittest
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import xmlrunner
+
+from csbschema import validate_data, validate_data_async, validate_many_async, AsyncValidator, AUTO
+
+
+class TestAio(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fixtures_dir = Path(Path(__file__).parent.parent.parent, 'docs')
+        self.documents = [Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example.json'),
+                          Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-invalid.json'),
+                          Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-required.json')]
+
+    def tearDown(self) -> None:
+        pass
+
+    def test_validate_data_async(self):
+        for doc_path in self.documents:
+            self.assertEqual(validate_data(doc_path), asyncio.run(validate_data_async(doc_path)))
+            self.assertEqual(validate_data(doc_path.read_bytes(), version='3.0.0-2023-08'),
+                             asyncio.run(validate_data_async(doc_path.read_bytes(), version='3.0.0-2023-08')))
+        with self.assertRaises(ValueError):
+            asyncio.run(validate_data_async(self.documents[0], version='2.0.0'))
+
+    def test_auto(self):
+        expected = [validate_data(d, version=AUTO, return_document=False) for d in self.documents]
+        self.assertEqual('3.1.0-2024-04', expected[0][1]['detection']['version'])
+        self.assertEqual(expected[0], asyncio.run(validate_data_async(self.documents[0], version=AUTO,
+                                                                      return_document=False)))
+        self.assertEqual(expected, asyncio.run(validate_many_async(self.documents, version=AUTO,
+                                                                   return_document=False)))
+
+    def test_validate_many_async(self):
+        expected = [validate_data(d, return_document=False) for d in self.documents]
+        self.assertEqual(expected, asyncio.run(validate_many_async(self.documents, return_document=False)))
+
+        async def validate_processes():
+            async with AsyncValidator(processes=True, max_workers=2, versions=['3.1.0-2024-04']) as validator:
+                return await validator.validate_many(self.documents, return_document=False)
+        self.assertEqual(expected, asyncio.run(validate_processes()))
+
+        # Errors reading documents
+        missing = Path(self.fixtures_dir, 'missing.json')
+        results = asyncio.run(validate_many_async([self.documents[0], missing], return_exceptions=True))
+        self.assertEqual(validate_data(self.documents[0]), results[0])
+        self.assertIsInstance(results[1], OSError)
+        with self.assertRaises(OSError):
+            asyncio.run(validate_many_async([self.documents[0], missing]))
+
+    def test_concurrency_limit_and_cancellation(self):
+        release = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=1)
+        # Occupy the only worker so that documents have to wait for it
+        blocker = executor.submit(release.wait)
+
+        async def run():
+            validator = AsyncValidator(executor=executor, max_concurrency=1)
+            first = asyncio.ensure_future(validator.validate(self.documents[0]))
+            second = asyncio.ensure_future(validator.validate(self.documents[1]))
+            await asyncio.sleep(0.05)
+            self.assertFalse(first.done())
+            self.assertFalse(second.done())
+            first.cancel()
+            second.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await first
+            with self.assertRaises(asyncio.CancelledError):
+                await second
+            release.set()
+            # Concurrency slots held by the cancelled calls have been released
+            return await asyncio.wait_for(validator.validate(self.documents[2]), timeout=10)
+
+        self.assertEqual(validate_data(self.documents[2]), asyncio.run(run()))
+        blocker.result()
+        executor.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
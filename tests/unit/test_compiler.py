@@ -0,0 +1,83 @@
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+from pathlib import Path
+
+import xmlrunner
+from jsonschema import Draft202012Validator
+
+from csbschema import compiler, validate_data, VALIDATORS
+from csbschema.validators import _get_schema_file
+
+
+class TestCompiler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fixtures_dir = Path(Path(__file__).parent.parent.parent, 'docs')
+        self.schemas = {}
+        for schema_path in sorted(_get_schema_file('').glob('*.json')):
+            with open(schema_path, 'r', encoding='utf8') as f:
+                self.schemas[schema_path.name] = json.load(f)
+        self.documents = {}
+        for doc_path in sorted(list(Path(self.fixtures_dir, 'IHO').glob('*.json')) +
+                               list(Path(self.fixtures_dir, 'NOAA').glob('*.json')) +
+                               list(Path(self.fixtures_dir, 'NOAA').glob('*.geojson'))):
+            with open(doc_path, 'rb') as f:
+                self.documents[doc_path.name] = json.load(f)
+
+    @staticmethod
+    def _errors(validator, instance) -> list:
+        return [(list(e.absolute_path), e.message) for e in validator.iter_errors(instance)]
+
+    def test_same_errors_as_jsonschema(self):
+        # Every bundled schema against every example document
+        self.assertEqual(9, len(self.schemas))
+        for schema_name, schema in self.schemas.items():
+            expected_validator = Draft202012Validator(schema)
+            compiled_validator = compiler.compile_schema(schema)
+            for doc_name, document in self.documents.items():
+                with self.subTest(schema=schema_name, document=doc_name):
+                    self.assertEqual(self._errors(expected_validator, document),
+                                     self._errors(compiled_validator, document))
+
+    def test_definition(self):
+        schema = self.schemas['CSB-schema-3_1_0-2024-04.json']
+        expected_validator = Draft202012Validator({'$ref': '#/definitions/GeoJSONFeature',
+                                                   'definitions': schema['definitions']})
+        compiled_validator = compiler.compile_schema(schema)
+        feature_validator = compiled_validator.definition('GeoJSONFeature')
+        for feature in self.documents['b12_v3_1_0_example-invalid.json']['features'] + [None, {}, []]:
+            self.assertEqual(self._errors(expected_validator, feature), self._errors(feature_validator, feature))
+
+    def test_in_memory(self):
+        # Generated code is only run from memory, so nothing is written to (or read from) the cache directory
+        schema = self.schemas['XYZ-CSB-schema-3_1_0-2024-04.json']
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                mock.patch.dict(os.environ, {'XDG_CACHE_HOME': tmp_dir, 'CSBSCHEMA_CACHE_DIR': tmp_dir}):
+            validator = compiler.compile_schema(schema)
+            self.assertEqual([], list(Path(tmp_dir).iterdir()))
+        self.assertFalse(validator.is_valid({}))
+        self.assertIsNot(validator._module, compiler.compile_schema(schema)._module)
+
+    def test_unsupported(self):
+        with self.assertRaises(compiler.UnsupportedSchemaError):
+            compiler.generate_source({'type': 'object', 'additionalProperties': False})
+        with self.assertRaises(compiler.UnsupportedSchemaError):
+            compiler.generate_source({'$ref': 'https://example.com/schema.json'})
+
+    def test_validate_data_compiled(self):
+        for version in VALIDATORS.keys():
+            for doc_path in [Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-invalid.json'),
+                             Path(self.fixtures_dir, 'NOAA', 'noaa_b12_v3_0_0_required.json')]:
+                (valid, result) = validate_data(doc_path, version=version)
+                (valid_compiled, result_compiled) = validate_data(doc_path, version=version, compiled=True)
+                self.assertEqual(valid, valid_compiled)
+                self.assertEqual(result.get('errors'), result_compiled.get('errors'))
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
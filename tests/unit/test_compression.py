@@ -0,0 +1,115 @@
+import io
+import bz2
+import gzip
+import lzma
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import xmlrunner
+
+from csbschema import compression, synth, validate_data, validate_multi, validate_xyz_pair, AUTO
+
+VERSION = '3.1.0-2024-04'
+
+COMPRESSORS = {
+    compression.GZIP: gzip.compress,
+    compression.BZIP2: bz2.compress,
+    compression.XZ: lzma.compress,
+}
+if compression.ZSTD_AVAILABLE:
+    COMPRESSORS[compression.ZSTD] = compression.zstandard.ZstdCompressor().compress
+
+
+class _Unpeekable(io.RawIOBase):
+    """
+    A stream that can't be peeked at or seeked, e.g. a socket.
+    """
+    def __init__(self, data: bytes):
+        super().__init__()
+        self._f = io.BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        return self._f.readinto(buffer)
+
+
+class TestCompression(unittest.TestCase):
+    def setUp(self) -> None:
+        self.data = synth.generate_document(version=VERSION, n_features=500, error_rate=0.02, seed=5)
+        self.expected = validate_data(self.data, version=VERSION, return_document=False)
+        self.assertFalse(self.expected[0])
+
+    def test_detect_compression(self):
+        for fmt, compress in COMPRESSORS.items():
+            self.assertEqual(fmt, compression.detect_compression(compress(self.data)[:compression.MAGIC_SIZE]))
+        for head in [self.data[:compression.MAGIC_SIZE], b'', b'\x1f', b'\x1e{"type']:
+            self.assertIsNone(compression.detect_compression(head))
+
+    def test_validate(self):
+        for fmt, compress in COMPRESSORS.items():
+            compressed = compress(self.data)
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                # Compression is recognized from the document, not the file name
+                path = Path(tmp_dir, 'b12.json')
+                path.write_bytes(compressed)
+                for source in [lambda: compressed, lambda: memoryview(compressed), lambda: path, lambda: str(path),
+                               lambda: io.BytesIO(compressed), lambda: io.BufferedReader(_Unpeekable(compressed))]:
+                    for options in [{}, {'stream': True}, {'feature_jobs': 2}, {'compiled': True}]:
+                        document = source()
+                        with self.subTest(format=fmt, document=type(document), **options):
+                            (valid, result) = validate_data(document, version=VERSION, return_document=False,
+                                                            timings=True, **options)
+                            self.assertEqual({'format': fmt, 'compressed_bytes': len(compressed),
+                                              'uncompressed_bytes': len(self.data)}, result.pop('compression'))
+                            del result['timings']
+                            self.assertEqual(self.expected, (valid, result))
+
+            # Detecting the version while streaming rewinds the decompressed document
+            (valid, result) = validate_data(io.BytesIO(compressed), version=AUTO, stream=True,
+                                            return_document=False)
+            self.assertEqual(VERSION, result.pop('detection')['version'])
+            self.assertEqual(self.expected, (valid, result))
+            self.assertEqual({VERSION: self.expected},
+                             validate_multi(compressed, versions=[VERSION], return_document=False))
+
+        # Streams that can't be peeked at are not checked for compression
+        with self.assertRaises(ValueError):
+            validate_data(_Unpeekable(gzip.compress(self.data)), version=VERSION)
+        # Uncompressed documents are not given compression info
+        self.assertNotIn('compression', validate_data(self.data, version=VERSION, timings=True)[1])
+
+    def test_sequence_and_xyz(self):
+        document = json.loads(self.data)
+        features = document.pop('features')
+        sequence = b''.join(json.dumps(r).encode() + b'\n' for r in [document] + features)
+        expected = validate_data(sequence, version=VERSION, sequence=True, return_document=False)
+        self.assertEqual(expected, validate_data(gzip.compress(sequence), version=VERSION, sequence=True,
+                                                 return_document=False))
+
+        metadata = synth.generate_document(version='XYZ-3.1.0-2024-04')
+        data = b'lon,lat,depth,time\n' + b'-70.5,43.1,ten,2016-03-03T18:41:49Z\n' * 100
+        expected = validate_xyz_pair(metadata, data, return_document=False)
+        self.assertFalse(expected[0])
+        (valid, result) = validate_xyz_pair(lzma.compress(metadata), bz2.compress(data), return_document=False,
+                                            timings=True)
+        self.assertEqual(compression.XZ, result.pop('compression')['format'])
+        self.assertEqual(len(data), result.pop('xyz_data_compression')['uncompressed_bytes'])
+        del result['timings']
+        self.assertEqual(expected, (valid, result))
+
+    def test_zstd_not_installed(self):
+        if compression.ZSTD_AVAILABLE:
+            self.skipTest('zstandard is installed')
+        with self.assertRaises(ValueError):
+            validate_data(b'\x28\xb5\x2f\xfd' + bytes(10), version=VERSION)
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
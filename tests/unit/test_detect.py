@@ -0,0 +1,184 @@
+import io
+import json
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import xmlrunner
+
+from csbschema import validate_data, detect_version, VALIDATORS, AUTO
+from csbschema import synth
+
+# Latest revision of the schema for each version
+LATEST = {
+    '3.1.0': '3.1.0-2024-04',
+    '3.0.0': '3.0.0-2023-08',
+    'XYZ-3.1.0': 'XYZ-3.1.0-2024-04',
+    'XYZ-3.0.0': 'XYZ-3.0.0-2023-08',
+}
+
+
+class _Unseekable(io.RawIOBase):
+    def __init__(self, data: bytes):
+        self._data = io.BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        return self._data.readinto(b)
+
+
+class TestDetect(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fixtures_dir = Path(Path(__file__).parent.parent.parent, 'docs')
+
+    def test_fixtures(self):
+        for doc_path, expected in [
+                (Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example.json'), '3.1.0-2024-04'),
+                (Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-invalid.json'), '3.1.0-2024-04'),
+                (Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_xyz_example.json'), 'XYZ-3.1.0-2024-04'),
+                (Path(self.fixtures_dir, 'NOAA', 'example_csb_geojson_file.geojson'), '3.0.0-2023-08'),
+                (Path(self.fixtures_dir, 'NOAA', 'noaa_b12_v3_0_0_xyz_required.json'), 'XYZ-3.0.0-2023-08')]:
+            for options in [{}, {'stream': True}, {'return_document': False}]:
+                with self.subTest(path=doc_path.name, **options):
+                    (valid, result) = validate_data(doc_path, version=AUTO, **options)
+                    self.assertEqual(expected, result['detection']['version'])
+                    self.assertIsInstance(result['detection']['reason'], str)
+                    del result['detection']
+                    if expected.startswith('XYZ-'):
+                        # XYZ metadata are never streamed
+                        options.pop('stream', None)
+                    self.assertEqual((valid, result), validate_data(doc_path, version=expected, **options))
+
+    def test_synth(self):
+        for version in VALIDATORS.keys():
+            latest = LATEST[version.rsplit('-', 2)[0]]
+            with self.subTest(version=version):
+                # Without processing steps, documents for every revision are validated against the latest
+                for options in [{'error_rate': 0.1}, {'error_rate': 0.1, 'invalid_metadata': True}]:
+                    document = synth.generate_document(version=version, n_features=20, seed=1, **options)
+                    (valid, result) = validate_data(document, version=AUTO)
+                    self.assertEqual(latest, result.pop('detection')['version'])
+                    self.assertEqual((valid, result), validate_data(document, version=latest))
+
+    def test_revisions(self):
+        example = json.loads(Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-2023-03.json').read_bytes())
+        xyz_example = json.loads(Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_xyz_example-2023-08.json').read_bytes())
+        # The TimeStampInterpolation step's type was 'soundSpeed' before 2024-04
+        sound_speed = {'type': 'soundSpeed', 'timestamp': '2023-02-14T06:00:00.0000Z', 'method': 'Midway'}
+        time_stamp = dict(sound_speed, type='TimeStampInterpolation')
+        uncertainty = synth._uncertainty_3_1_0()
+        no_processing = json.loads(
+            Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-noprocessing.json').read_bytes())
+        no_processing['features'][0]['properties']['uncertainty'] = [1.0, 1.0, 0.5]
+        with_uncertainty = json.loads(json.dumps(example))
+        with_uncertainty['features'][0]['properties']['uncertainty'] = [1.0, 1.0, 0.5]
+        for (document, expected, expected_valid) in [
+                (example, '3.1.0-2024-04', True),
+                (dict(example, properties=dict(example['properties'], processing=[time_stamp])), '3.1.0-2024-04',
+                 True),
+                (dict(example, properties=dict(example['properties'], processing=[sound_speed])), '3.1.0-2023-08',
+                 True),
+                (dict(example, properties=dict(example['properties'], processing=[sound_speed, uncertainty])),
+                 '3.1.0-2023-08', True),
+                # Only processing step types are used to pick the revision: the document is validated once, against
+                # a revision that checks that features with uncertainty have Uncertainty metadata
+                (no_processing, '3.1.0-2024-04', False),
+                (with_uncertainty, '3.1.0-2024-04', False),
+                (dict(with_uncertainty, properties=dict(example['properties'], processing=[sound_speed])),
+                 '3.1.0-2023-08', False),
+                (dict(xyz_example, processing=[sound_speed]), 'XYZ-3.1.0-2023-08', True),
+                (dict(xyz_example, processing=[time_stamp]), 'XYZ-3.1.0-2024-04', True)]:
+            with self.subTest(document=document['properties' if 'properties' in document else 'processing']):
+                self.assertEqual(expected, detect_version(document).version)
+                data = json.dumps(document).encode('utf8')
+                for options in [{}, {'stream': True}, {'compiled': True}]:
+                    (valid, result) = validate_data(data, version=AUTO, return_document=False, **options)
+                    self.assertEqual(expected, result.pop('detection')['version'])
+                    self.assertEqual(expected_valid, valid)
+                    if expected.startswith('XYZ-'):
+                        # XYZ metadata are never streamed
+                        options.pop('stream', None)
+                    self.assertEqual((valid, result),
+                                     validate_data(data, version=expected, return_document=False, **options))
+
+        # Invalid documents are validated once, against the detected revision only
+        spies = {version: mock.Mock(wraps=validator) for (version, validator) in VALIDATORS.items()}
+        with mock.patch.dict(VALIDATORS, spies):
+            self.assertFalse(validate_data(json.dumps(no_processing).encode('utf8'), version=AUTO, stream=True)[0])
+        self.assertEqual({'3.1.0-2024-04': 1}, {v: spy.call_count for (v, spy) in spies.items() if spy.call_count})
+
+        # Step types of no revision are reported against the latest
+        document = dict(example, properties=dict(example['properties'], processing=[dict(sound_speed, type='x')]))
+        self.assertEqual('3.1.0-2024-04', detect_version(document).version)
+        (valid, result) = validate_data(document, version=AUTO)
+        self.assertFalse(valid)
+        self.assertEqual('3.1.0-2024-04', result['detection']['version'])
+
+    def test_revision_sources(self):
+        document = json.loads(Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-2023-03.json').read_bytes())
+        document['properties']['processing'] = [{'type': 'soundSpeed', 'timestamp': '2023-02-14T06:00:00.0000Z',
+                                                 'method': 'Midway'}]
+        data = json.dumps(document).encode('utf8')
+        expected = validate_data(data, version='3.1.0-2023-08', stream=True)
+        self.assertTrue(expected[0])
+        for source in [io.BytesIO(data), _Unseekable(data), memoryview(data)]:
+            with self.subTest(source=type(source).__name__):
+                (valid, result) = validate_data(source, version=AUTO, stream=True)
+                self.assertEqual('3.1.0-2023-08', result.pop('detection')['version'])
+                self.assertEqual(expected, (valid, result))
+
+    def test_xyz_geojson_options(self):
+        doc_path = Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_xyz_example.json')
+        expected = validate_data(doc_path, version='XYZ-3.1.0-2024-04')
+        # Options that only apply to GeoJSON documents are ignored for XYZ metadata
+        for (option, value) in [('stream', True), ('feature_jobs', 2), ('sequence', False), ('fast_path', False),
+                                ('check_time_order', True), ('max_time_gap', 60.0)]:
+            with self.subTest(option=option):
+                (valid, result) = validate_data(doc_path, version=AUTO, **{option: value})
+                self.assertEqual('XYZ-3.1.0-2024-04', result.pop('detection')['version'])
+                self.assertEqual(expected, (valid, result))
+
+    def test_not_object(self):
+        for data in [b'3', b'null', b'"x"', b'[]']:
+            for options in [{}, {'stream': True}]:
+                with self.subTest(data=data, **options):
+                    (valid, result) = validate_data(data, version=AUTO, **options)
+                    self.assertFalse(valid)
+                    self.assertEqual('3.1.0-2024-04', result.pop('detection')['version'])
+                    self.assertEqual((valid, result), validate_data(data, version='3.1.0-2024-04', **options))
+
+    def test_stream_sources(self):
+        data = Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-invalid.json').read_bytes()
+        (valid, result) = validate_data(data, version='3.1.0-2024-04', stream=True)
+        for document in [io.BytesIO(data), _Unseekable(data), memoryview(data)]:
+            with self.subTest(source=type(document).__name__):
+                (auto_valid, auto_result) = validate_data(document, version=AUTO, stream=True)
+                self.assertEqual('3.1.0-2024-04', auto_result.pop('detection')['version'])
+                self.assertEqual((valid, result), (auto_valid, auto_result))
+
+    def test_detect_version(self):
+        for document, expected in [
+                # The layout, rather than the convention, decides
+                ({'type': 'FeatureCollection', 'properties': {'trustedNode': {'convention': 'GeoJSON CSB 3.0'}}},
+                 '3.1.0-2024-04'),
+                ({'features': [], 'properties': {'providerContactPoint': {}}}, '3.0.0-2023-08'),
+                ({'trustedNode': {}, 'platform': {}}, 'XYZ-3.1.0-2024-04'),
+                ({'convention': 'XYZ CSB 3.0'}, 'XYZ-3.0.0-2023-08'),
+                # Without markers, the default version for the layout is used
+                ({'type': 'FeatureCollection'}, '3.1.0-2024-04'),
+                ({}, 'XYZ-3.1.0-2024-04'),
+                ([], '3.1.0-2024-04')]:
+            with self.subTest(document=document):
+                self.assertEqual(expected, detect_version(document).version)
+
+        with self.assertRaises(ValueError):
+            validate_data(b'{"type": "FeatureCollection", ', version=AUTO)
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
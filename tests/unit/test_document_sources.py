@@ -0,0 +1,65 @@
+import io
+import json
+import unittest
+from pathlib import Path
+
+import xmlrunner
+
+from csbschema import validate_data
+
+
+class TestDocumentSources(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fixtures_dir = Path(Path(__file__).parent.parent.parent, 'docs')
+
+    def tearDown(self) -> None:
+        pass
+
+    def _sources(self, doc_path: Path) -> dict:
+        data = doc_path.read_bytes()
+        return {
+            'str': str(doc_path),
+            'dict': json.loads(data),
+            'bytes': data,
+            'bytearray': bytearray(data),
+            'memoryview': memoryview(bytearray(b'\xef\xbb\xbf' + data))[3:],
+            'BOM': b'\xef\xbb\xbf' + data,
+            'file': io.BytesIO(data)
+        }
+
+    def test_sources(self):
+        for version, doc_path in [('3.1.0-2024-04', Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example.json')),
+                                  ('3.1.0-2024-04',
+                                   Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-invalid.json')),
+                                  ('3.0.0-2023-08',
+                                   Path(self.fixtures_dir, 'NOAA', 'example_csb_geojson_file.geojson')),
+                                  ('XYZ-3.1.0-2024-04',
+                                   Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_xyz_example-invalid.json'))]:
+            expected = validate_data(doc_path, version=version)
+            for stream in ([False, True] if not version.startswith('XYZ') else [False]):
+                for name, source in self._sources(doc_path).items():
+                    with self.subTest(version=version, document=doc_path.name, source=name, stream=stream):
+                        options = {'stream': True} if stream else {}
+                        (valid, result) = validate_data(source, version=version, **options)
+                        self.assertEqual(expected[0], valid)
+                        self.assertEqual(expected[1].get('errors'), result.get('errors'))
+
+    def test_parsed_document(self):
+        document = {'type': 'FeatureCollection', 'features': []}
+        (valid, result) = validate_data(document, stream=True)
+        self.assertFalse(valid)
+        # Documents that are already parsed are validated in place
+        self.assertIs(document, result['document'])
+
+    def test_invalid_json(self):
+        with self.assertRaises(ValueError):
+            validate_data(b'{"type": "FeatureCollection", ')
+        with self.assertRaises(ValueError):
+            validate_data(io.BytesIO(b'\xff\xfe{}'))
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
@@ -0,0 +1,108 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import xmlrunner
+
+from csbschema import validate_data
+
+
+class TestErrorBudget(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fixtures_dir = Path(Path(__file__).parent.parent.parent, 'docs')
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        # Write 'features' before the metadata so that, when streaming, metadata is read after the error budget
+        # has been used up.
+        with open(Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-invalid.json'), 'rb') as f:
+            document = json.load(f)
+        features = document.pop('features')
+        bad_features = [dict(f, properties={'depth': 'deep'}) for f in features] * 50
+        self.doc_path = Path(self.tmp_dir.name, 'many-errors.json')
+        with open(self.doc_path, 'w', encoding='utf8') as f:
+            json.dump({'features': features + bad_features, **document}, f)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_max_errors(self):
+        for options in [{}, {'stream': True}, {'compiled': True}, {'fast_path': False}]:
+            (valid, result) = validate_data(self.doc_path, version='3.1.0-2024-04', **options)
+            self.assertFalse(valid)
+            self.assertNotIn('truncated', result)
+            all_errors = result['errors']
+            self.assertGreater(len(all_errors), 100)
+
+            for max_errors in (1, 2, 5, 100):
+                with self.subTest(options=options, max_errors=max_errors):
+                    (valid, result) = validate_data(self.doc_path, version='3.1.0-2024-04',
+                                                    max_errors=max_errors, **options)
+                    self.assertFalse(valid)
+                    self.assertTrue(result['truncated'])
+                    self.assertEqual(all_errors[:max_errors], result['errors'])
+
+            (valid, result) = validate_data(self.doc_path, version='3.1.0-2024-04',
+                                            max_errors=len(all_errors) + 1, **options)
+            self.assertNotIn('truncated', result)
+            self.assertEqual(all_errors, result['errors'])
+
+    def test_fail_fast(self):
+        for version, doc_path in [('3.1.0-2024-04', self.doc_path),
+                                  ('3.0.0-2023-08',
+                                   Path(self.fixtures_dir, 'NOAA', 'noaa_b12_v3_0_0_xyz_required.json')),
+                                  ('XYZ-3.1.0-2024-04',
+                                   Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_xyz_example-invalid.json')),
+                                  ('XYZ-3.0.0-2023-08', Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example.json'))]:
+            with self.subTest(version=version):
+                (valid, result) = validate_data(doc_path, version=version)
+                self.assertFalse(valid)
+                (valid, result_fail_fast) = validate_data(doc_path, version=version, fail_fast=True)
+                self.assertFalse(valid)
+                self.assertEqual(result['errors'][:1], result_fail_fast['errors'])
+                self.assertTrue(result_fail_fast['truncated'])
+
+        # A valid document is unaffected
+        (valid, result) = validate_data(Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example.json'), fail_fast=True)
+        self.assertTrue(valid)
+        self.assertNotIn('truncated', result)
+
+    def test_exact_budget(self):
+        # Errors are only truncated if there are more than the budget allows
+        (_, result) = validate_data(self.doc_path, version='3.1.0-2024-04')
+        all_errors = result['errors']
+        for options in [{}, {'stream': True}, {'compiled': True}, {'fast_path': False}, {'feature_jobs': 2}]:
+            with self.subTest(**options):
+                (valid, result) = validate_data(self.doc_path, version='3.1.0-2024-04', max_errors=len(all_errors),
+                                                **options)
+                self.assertFalse(valid)
+                self.assertNotIn('truncated', result)
+                self.assertEqual(all_errors, result['errors'])
+
+        with open(Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example.json'), 'rb') as f:
+            document = json.load(f)
+        one_error = json.loads(json.dumps(document))
+        one_error['features'][0]['properties']['depth'] = 'deep'
+        # Features out of time order, with one issue for each of the last two
+        out_of_order = dict(document, features=document['features'][::-1])
+        for (doc, options, expected) in [(one_error, {'fail_fast': True}, 1),
+                                         (one_error, {'max_errors': 1, 'stream': True}, 1),
+                                         (out_of_order, {'max_errors': 2, 'check_time_order': True}, 2)]:
+            with self.subTest(options=options):
+                (valid, result) = validate_data(json.dumps(doc).encode('utf8'), version='3.1.0-2024-04', **options)
+                self.assertFalse(valid)
+                self.assertEqual(expected, len(result['errors']))
+                self.assertNotIn('truncated', result)
+        (valid, result) = validate_data(out_of_order, version='3.1.0-2024-04', max_errors=1, check_time_order=True)
+        self.assertTrue(result['truncated'])
+        self.assertEqual(1, len(result['errors']))
+
+    def test_invalid_max_errors(self):
+        with self.assertRaises(ValueError):
+            validate_data(self.doc_path, max_errors=0)
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
@@ -0,0 +1,48 @@
+import json
+import pickle
+import unittest
+from pathlib import Path
+
+import xmlrunner
+
+from csbschema import validate_data
+from csbschema.validators import ErrorRecord
+
+
+class TestErrorRecord(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fixtures_dir = Path(Path(__file__).parent.parent.parent, 'docs')
+
+    def tearDown(self) -> None:
+        pass
+
+    def test_dict_access(self):
+        error = ErrorRecord(('features', 12, 'properties', 'depth'), "'12.3' is not of type 'number'")
+        self.assertEqual('/features/12/properties/depth', error['path'])
+        self.assertEqual("'12.3' is not of type 'number'", error['message'])
+        self.assertEqual({'path': '/features/12/properties/depth', 'message': "'12.3' is not of type 'number'"},
+                         error)
+        self.assertEqual(['path', 'message'], list(error.keys()))
+        self.assertIsNone(error.get('context'))
+        with self.assertRaises(KeyError):
+            _ = error['context']
+        with self.assertRaises(AttributeError):
+            error.context = None
+        self.assertEqual('/', ErrorRecord((), 'document is invalid')['path'])
+        self.assertEqual(error, pickle.loads(pickle.dumps(error)))
+
+    def test_validation_errors(self):
+        (valid, result) = validate_data(Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-invalid.json'))
+        self.assertFalse(valid)
+        for error in result['errors']:
+            self.assertIsInstance(error, ErrorRecord)
+            self.assertEqual(error['path'], '/' + '/'.join([str(elem) for elem in error.path_elements]))
+        # Plain dicts can be serialized
+        self.assertEqual(len(result['errors']), len(json.loads(json.dumps([dict(e) for e in result['errors']]))))
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
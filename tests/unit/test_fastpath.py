@@ -0,0 +1,102 @@
+import copy
+import json
+import random
+import unittest
+from pathlib import Path
+
+import xmlrunner
+
+from csbschema import fastpath
+from csbschema.validators import _walk_document, _get_feature_spec, _get_validator, _structural_error, _ErrorList
+
+MUTATIONS = [
+    lambda f: f.pop('type'),
+    lambda f: f.update(type='feature'),
+    lambda f: f.update(id=42),
+    lambda f: f.update(id=[42]),
+    lambda f: f.update(geometry=None),
+    lambda f: f.update(geometry=[]),
+    lambda f: f['geometry'].update(type='LineString'),
+    lambda f: f['geometry'].update(coordinates=[1.0]),
+    lambda f: f['geometry'].update(coordinates=[1.0, '2.0']),
+    lambda f: f['geometry'].update(coordinates=[1.0, True]),
+    lambda f: f['geometry'].update(coordinates=(1.0, 2.0, 3)),
+    lambda f: f['geometry'].update(bbox=[1, 2, 3, 4]),
+    lambda f: f['geometry'].pop('coordinates'),
+    lambda f: f.update(properties=[]),
+    lambda f: f['properties'].pop('depth'),
+    lambda f: f['properties'].update(depth=False),
+    lambda f: f['properties'].update(depth='12.3'),
+    lambda f: f['properties'].update(depth=12),
+    lambda f: f['properties'].update(time=1457030509),
+    lambda f: f['properties'].update(time='2016-03-03 18:41:49Z'),
+    lambda f: f['properties'].update(time='2016-03-03T18:41:49'),
+    lambda f: f['properties'].update(uncertainty=[1.0, 2.0]),
+    lambda f: f['properties'].update(uncertainty=[1.0, 2.0, None]),
+    lambda f: f['properties'].update(uncertainty={'x': 1.0}),
+    lambda f: f['properties'].update(comment='free text'),
+]
+
+
+class TestFastPath(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fixtures_dir = Path(Path(__file__).parent.parent.parent, 'docs')
+
+    def tearDown(self) -> None:
+        pass
+
+    def test_feature_spec(self):
+        if not fastpath.AVAILABLE:
+            self.skipTest('NumPy is not installed')
+        for rsrc_name in ['CSB-schema-3_1_0-2024-04.json', 'CSB-schema-3_1_0-2023-08.json',
+                          'CSB-schema-3_1_0-2023-03.json', 'CSB-schema-3_0_0-2023-08.json',
+                          'CSB-schema-3_0_0-2023-03.json']:
+            self.assertIsNotNone(_get_feature_spec(rsrc_name))
+        self.assertTrue(_get_feature_spec('CSB-schema-3_1_0-2024-04.json').uncertainty)
+        self.assertFalse(_get_feature_spec('CSB-schema-3_0_0-2023-08.json').uncertainty)
+        self.assertIsNone(_get_feature_spec('XYZ-CSB-schema-3_1_0-2024-04.json'))
+
+    def test_same_errors(self):
+        with open(Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example.json'), 'rb') as f:
+            document = json.load(f)
+        rng = random.Random(1234)
+        features = []
+        for i in range(2000):
+            feature = copy.deepcopy(document['features'][i % len(document['features'])])
+            if rng.random() < 0.3:
+                rng.choice(MUTATIONS)(feature)
+            features.append(feature)
+        features.extend([None, 'Feature', {}])
+        document['features'] = features
+
+        for rsrc_name in ['CSB-schema-3_1_0-2024-04.json', 'CSB-schema-3_0_0-2023-08.json']:
+            # Validating the whole document at once gives the reference errors
+            expected = [_structural_error(e) for e in _get_validator(rsrc_name).iter_errors(document)]
+            self.assertGreater(len(expected), 0)
+            for fast_path in (False, True):
+                errors = _ErrorList()
+                (_, n_features) = _walk_document(rsrc_name, document, errors, fast_path=fast_path)
+                self.assertEqual(len(features), n_features)
+                self.assertEqual(expected, errors)
+
+    def test_feature_hooks(self):
+        doc_path = Path(self.fixtures_dir, 'NOAA', 'example_csb_geojson_file.geojson')
+        with open(doc_path, 'rb') as f:
+            n_features = len(json.load(f)['features'])
+        for stream in (False, True):
+            visited = []
+            (_, result_n_features) = _walk_document('CSB-schema-3_0_0-2023-08.json', doc_path, _ErrorList(),
+                                                    feature_hooks=[lambda batch, first_index:
+                                                                   visited.extend(range(first_index,
+                                                                                        first_index + len(batch)))],
+                                                    stream=stream)
+            # Each feature is passed to the hooks exactly once, in order
+            self.assertEqual(list(range(n_features)), visited)
+            self.assertEqual(n_features, result_n_features)
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
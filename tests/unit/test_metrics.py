@@ -0,0 +1,129 @@
+import tempfile
+import threading
+import unittest
+import urllib.request
+from pathlib import Path
+
+import xmlrunner
+
+from csbschema import validate_data, metrics
+from csbschema.server import ValidationServer, ValidationClient, format_address
+
+
+def _samples(text: str) -> dict:
+    samples = {}
+    for line in text.splitlines():
+        if not line.startswith('#'):
+            (name, value) = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fixtures_dir = Path(Path(__file__).parent.parent.parent, 'docs')
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        metrics.disable()
+        self.tmp_dir.cleanup()
+
+    def test_registry(self):
+        registry = metrics.Registry(buckets=(0.1, 1.0), max_error_series=2)
+        registry.observe('3.1.0-2024-04', valid=True, duration=0.05, n_bytes=100, n_features=10)
+        registry.observe('3.1.0-2024-04', valid=False, duration=0.1, n_bytes=200, n_features=20,
+                         errors=[{'path': '/features/1/properties', 'message': "'depth' is a required property"},
+                                 {'path': '/features/20/properties', 'message': "'depth' is a required property"},
+                                 {'path': '/properties/platform', 'message': 'Bad "name"\n'},
+                                 {'path': '/features/3/properties/time', 'message': 'Bad time'}])
+        registry.observe('XYZ-3.1.0-2024-04', valid=None, duration=2.0)
+
+        text = registry.to_prometheus()
+        self.assertIn('# TYPE csbschema_validation_duration_seconds histogram', text)
+        samples = _samples(text)
+        self.assertEqual({
+            'csbschema_validations_total{version="3.1.0-2024-04",result="invalid"}': 1,
+            'csbschema_validations_total{version="3.1.0-2024-04",result="valid"}': 1,
+            'csbschema_validations_total{version="XYZ-3.1.0-2024-04",result="error"}': 1,
+            'csbschema_validated_bytes_total{version="3.1.0-2024-04"}': 300,
+            'csbschema_validated_features_total{version="3.1.0-2024-04"}': 30,
+            'csbschema_validation_duration_seconds_bucket{version="3.1.0-2024-04",le="0.1"}': 2,
+            'csbschema_validation_duration_seconds_bucket{version="3.1.0-2024-04",le="1.0"}': 2,
+            'csbschema_validation_duration_seconds_bucket{version="3.1.0-2024-04",le="+Inf"}': 2,
+            'csbschema_validation_duration_seconds_sum{version="3.1.0-2024-04"}': 0.15000000000000002,
+            'csbschema_validation_duration_seconds_count{version="3.1.0-2024-04"}': 2,
+            'csbschema_validation_duration_seconds_bucket{version="XYZ-3.1.0-2024-04",le="0.1"}': 0,
+            'csbschema_validation_duration_seconds_bucket{version="XYZ-3.1.0-2024-04",le="1.0"}': 0,
+            'csbschema_validation_duration_seconds_bucket{version="XYZ-3.1.0-2024-04",le="+Inf"}': 1,
+            'csbschema_validation_duration_seconds_sum{version="XYZ-3.1.0-2024-04"}': 2.0,
+            'csbschema_validation_duration_seconds_count{version="XYZ-3.1.0-2024-04"}': 1,
+            # Array indices are removed from paths, and labels are escaped
+            'csbschema_validation_errors_total{version="3.1.0-2024-04",path="/features/*/properties",'
+            'message="\'depth\' is a required property"}': 2,
+            'csbschema_validation_errors_total{version="3.1.0-2024-04",path="/properties/platform",'
+            'message="Bad \\"name\\"\\n"}': 1,
+            # Beyond max_error_series, errors are counted together
+            'csbschema_validation_errors_total{version="3.1.0-2024-04",path="other",message="other"}': 1,
+        }, samples)
+
+        path = Path(self.tmp_dir.name, 'csbschema.prom')
+        registry.write_textfile(path)
+        self.assertEqual(text, path.read_text())
+        self.assertEqual([path], list(Path(self.tmp_dir.name).iterdir()))
+
+    def test_validate_data(self):
+        valid_path = Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example.json')
+        invalid_path = Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-invalid.json')
+        # Nothing is recorded until metrics are enabled
+        self.assertIsNone(metrics.get_registry())
+        validate_data(valid_path)
+
+        registry = metrics.enable()
+        self.assertIs(registry, metrics.enable())
+        validate_data(valid_path)
+        validate_data(invalid_path.read_bytes(), stream=True, return_document=False)
+        with self.assertRaises(OSError):
+            validate_data(Path(self.tmp_dir.name, 'missing.json'))
+        metrics.disable()
+        validate_data(valid_path)
+
+        samples = _samples(registry.to_prometheus())
+        version = '3.1.0-2024-04'
+        self.assertEqual(1, samples[f'csbschema_validations_total{{version="{version}",result="valid"}}'])
+        self.assertEqual(1, samples[f'csbschema_validations_total{{version="{version}",result="invalid"}}'])
+        self.assertEqual(1, samples[f'csbschema_validations_total{{version="{version}",result="error"}}'])
+        self.assertEqual(valid_path.stat().st_size + invalid_path.stat().st_size,
+                         samples[f'csbschema_validated_bytes_total{{version="{version}"}}'])
+        self.assertEqual(3 + 5, samples[f'csbschema_validated_features_total{{version="{version}"}}'])
+        self.assertEqual(3, samples[f'csbschema_validation_duration_seconds_count{{version="{version}"}}'])
+        self.assertEqual(1, samples[f'csbschema_validation_errors_total{{version="{version}",'
+                                    'path="/features/*/properties",message="\'depth\' is a required property"}'])
+
+    def test_server(self):
+        invalid_path = Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-invalid.json')
+        with ValidationServer(('127.0.0.1', 0), jobs=1, metrics=True) as server:
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+            try:
+                with ValidationClient(format_address(server.address), timeout=60) as client:
+                    client.validate(invalid_path)
+                    with self.assertRaises(ValueError):
+                        client.validate(b'{')
+                with urllib.request.urlopen(f"{format_address(server.address)}/metrics", timeout=60) as r:
+                    self.assertEqual(metrics.CONTENT_TYPE, r.headers['Content-Type'])
+                    samples = _samples(r.read().decode('utf8'))
+            finally:
+                server.shutdown()
+                thread.join()
+        self.assertEqual(1, samples['csbschema_validations_total{version="3.1.0-2024-04",result="invalid"}'])
+        self.assertEqual(1, samples['csbschema_validations_total{version="3.1.0-2024-04",result="error"}'])
+        self.assertEqual(5, samples['csbschema_validated_features_total{version="3.1.0-2024-04"}'])
+        self.assertEqual(invalid_path.stat().st_size + 1,
+                         samples['csbschema_validated_bytes_total{version="3.1.0-2024-04"}'])
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
@@ -0,0 +1,68 @@
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import xmlrunner
+
+from csbschema import validate_data, validate_multi, parsers
+
+VERSIONS = ['3.1.0-2024-04', '3.0.0-2023-08', 'XYZ-3.1.0-2024-04']
+
+
+def _plain(result: dict) -> dict:
+    if 'errors' in result:
+        result = dict(result, errors=[dict(e) for e in result['errors']])
+    return result
+
+
+class TestMulti(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fixtures_dir = Path(Path(__file__).parent.parent.parent, 'docs')
+
+    def test_validate_multi(self):
+        doc_path = Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-invalid.json')
+        for jobs in [1, 2]:
+            for options in [{}, {'return_document': False}, {'max_errors': 2}]:
+                with self.subTest(jobs=jobs, **options):
+                    with mock.patch.object(parsers, 'parse', wraps=parsers.parse) as parse:
+                        results = validate_multi(doc_path, versions=VERSIONS + VERSIONS[:1], jobs=jobs, **options)
+                    # The document is parsed once, however many versions it is validated against
+                    self.assertEqual(1, parse.call_count)
+                    self.assertEqual(VERSIONS, list(results.keys()))
+                    for version in VERSIONS:
+                        (valid, result) = validate_data(doc_path, version=version, **options)
+                        self.assertFalse(valid)
+                        self.assertEqual((valid, _plain(result)),
+                                         (results[version][0], _plain(results[version][1])))
+                    if options.get('return_document', True):
+                        self.assertIs(results[VERSIONS[0]][1]['document'], results[VERSIONS[1]][1]['document'])
+
+    def test_not_object(self):
+        # A document that is a JSON string is validated as such, not read from the path it names
+        doc_path = Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example.json')
+        self.assertTrue(validate_data(doc_path)[0])
+        data = f'"{doc_path}"'.encode('utf8')
+        for jobs in [1, 2]:
+            with self.subTest(jobs=jobs):
+                results = validate_multi(data, versions=VERSIONS, jobs=jobs)
+                for version in VERSIONS:
+                    self.assertEqual(validate_data(data, version=version), results[version])
+                    self.assertFalse(results[version][0])
+
+    def test_invalid_arguments(self):
+        doc_path = Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example.json')
+        with self.assertRaises(ValueError):
+            validate_multi(doc_path, versions=['3.1.0-2024-04', '2.0.0'])
+        with self.assertRaises(ValueError):
+            validate_multi(doc_path, versions=VERSIONS, stream=True)
+        with self.assertRaises(ValueError):
+            validate_multi(doc_path, versions=VERSIONS, jobs=0)
+        with self.assertRaises(OSError):
+            validate_multi(Path(self.fixtures_dir, 'missing.json'), versions=VERSIONS)
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
@@ -0,0 +1,87 @@
+import gc
+import threading
+import unittest
+from pathlib import Path
+
+import xmlrunner
+
+from csbschema import parsers, validate_data
+
+
+class TestParsers(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fixtures_dir = Path(Path(__file__).parent.parent.parent, 'docs')
+        self.saved_parser = parsers._parser_name
+
+    def tearDown(self) -> None:
+        parsers.set_parser(self.saved_parser)
+
+    def test_backends(self):
+        data = Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-invalid.json').read_bytes()
+        parsers.set_parser(parsers.STDLIB)
+        expected = parsers.parse(data)
+        (_, expected_result) = validate_data(data)
+        for backend in [parsers.AUTO] + list(parsers.BACKENDS):
+            with self.subTest(backend=backend):
+                parsers.set_parser(backend)
+                if backend in parsers.available_backends():
+                    self.assertEqual(backend, parsers.get_parser())
+                elif backend != parsers.AUTO:
+                    self.assertEqual(parsers.STDLIB, parsers.get_parser())
+                self.assertEqual(expected, parsers.parse(data))
+                self.assertEqual(expected, parsers.parse(memoryview(bytearray(data))))
+                (_, result) = validate_data(data)
+                self.assertEqual(expected_result, result)
+
+    def test_fallback(self):
+        for backend in parsers.BACKENDS:
+            with self.subTest(backend=backend):
+                parsers.set_parser(backend)
+                # Byte order mark, and an integer too large for some backends
+                self.assertEqual({'depth': 123456789012345678901234567890},
+                                 parsers.parse(b'\xef\xbb\xbf{"depth": 123456789012345678901234567890}'))
+                with self.assertRaises(ValueError):
+                    parsers.parse(b'{"depth": ')
+
+    def test_gc_paused_threads(self):
+        def pause(entered: threading.Event, leave: threading.Event) -> None:
+            with parsers._gc_paused():
+                entered.set()
+                leave.wait(10)
+
+        was_enabled = gc.isenabled()
+        try:
+            for enabled in [True, False]:
+                with self.subTest(enabled=enabled):
+                    if enabled:
+                        gc.enable()
+                    else:
+                        gc.disable()
+                    events = [(threading.Event(), threading.Event()) for _ in range(2)]
+                    threads = [threading.Thread(target=pause, args=e) for e in events]
+                    for (thread, (entered, _)) in zip(threads, events):
+                        thread.start()
+                        entered.wait(10)
+                    self.assertFalse(gc.isenabled())
+                    # The first parse to finish leaves the collector paused for the other
+                    events[0][1].set()
+                    threads[0].join(10)
+                    self.assertFalse(gc.isenabled())
+                    events[1][1].set()
+                    threads[1].join(10)
+                    # The collector is only re-enabled if it was enabled before
+                    self.assertEqual(enabled, gc.isenabled())
+        finally:
+            if was_enabled:
+                gc.enable()
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            parsers.set_parser('yajl')
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
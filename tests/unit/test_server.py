@@ -0,0 +1,178 @@
+import os
+import json
+import tempfile
+import threading
+import contextlib
+import unittest
+import http.client
+from unittest import mock
+from pathlib import Path
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+
+import xmlrunner
+
+from csbschema import server as server_module
+from csbschema import compiler, validate_data, VALIDATORS
+from csbschema.server import ValidationServer, ValidationClient, format_address, parse_address
+
+
+class TestServer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fixtures_dir = Path(Path(__file__).parent.parent.parent, 'docs')
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def _check_server(self, address):
+        with ValidationServer(address, jobs=1) as server:
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+            try:
+                with ValidationClient(format_address(server.address), timeout=60) as client:
+                    self.assertEqual(list(VALIDATORS.keys()), client.health()['versions'])
+                    for version, doc_path in [
+                            ('3.1.0-2024-04', Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example.json')),
+                            ('3.1.0-2024-04', Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-invalid.json')),
+                            ('XYZ-3.1.0-2024-04', Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_xyz_example.json'))]:
+                        (valid, result) = validate_data(doc_path, version=version, return_document=False)
+                        if 'errors' in result:
+                            result['errors'] = [dict(e) for e in result['errors']]
+                        self.assertEqual((valid, result), client.validate(doc_path, version=version))
+                        self.assertEqual((valid, result), client.validate(doc_path.read_bytes(), version=version))
+
+                    (valid, result) = client.validate(Path(self.fixtures_dir, 'IHO',
+                                                           'b12_v3_1_0_example-invalid.json'), fail_fast=True)
+                    self.assertFalse(valid)
+                    self.assertEqual(1, len(result['errors']))
+                    self.assertTrue(result['truncated'])
+
+                    with self.assertRaises(OSError):
+                        client.validate(Path(self.tmp_dir.name, 'missing.json'))
+                    with self.assertRaises(ValueError):
+                        client.validate(b'{"type": ')
+                    with self.assertRaises(ValueError):
+                        client.validate(b'{}', version='2.0.0')
+            finally:
+                server.shutdown()
+                thread.join()
+
+    def test_tcp(self):
+        self._check_server(('127.0.0.1', 0))
+
+    def test_unix_socket(self):
+        socket_path = str(Path(self.tmp_dir.name, 'csbschema.sock'))
+        self._check_server(socket_path)
+        self.assertFalse(Path(socket_path).exists())
+
+    @contextlib.contextmanager
+    def _serving(self, **kwargs):
+        # Validate in threads of this process, so that what workers do can be checked
+        with ThreadPoolExecutor(max_workers=1) as executor, \
+                ValidationServer(('127.0.0.1', 0), executor=executor, **kwargs) as server:
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+            try:
+                yield server
+            finally:
+                server.shutdown()
+                thread.join()
+
+    @staticmethod
+    def _post(server, url: str, body=None):
+        connection = http.client.HTTPConnection(*server.address, timeout=60)
+        try:
+            connection.request('POST', url, body=body)
+            response = connection.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            connection.close()
+
+    def test_compiled_default(self):
+        data = Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-invalid.json').read_bytes()
+        for compiled, options, expected in [(True, {}, True), (True, {'compiled': False}, False),
+                                            (False, {}, False), (False, {'compiled': True}, True)]:
+            with self.subTest(server_compiled=compiled, **options), self._serving(compiled=compiled) as server, \
+                    mock.patch.object(compiler.CompiledValidator, 'iter_errors', autospec=True,
+                                      side_effect=compiler.CompiledValidator.iter_errors) as iter_errors, \
+                    ValidationClient(format_address(server.address), timeout=60) as client:
+                self.assertFalse(client.validate(data, **options)[0])
+                self.assertEqual(expected, iter_errors.called)
+
+    def test_document_root(self):
+        doc_path = Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example.json')
+        outside = Path(self.tmp_dir.name, 'secret.json')
+        outside.write_text('{"secret": ')
+        link = Path(self.tmp_dir.name, 'root', 'link.json')
+        link.parent.mkdir()
+        os.symlink(outside, link)
+        with self._serving(document_root=self.fixtures_dir) as server:
+            self.assertEqual(200, self._post(server, f"/validate?path={quote(str(doc_path))}")[0])
+            for path in [outside, Path(self.fixtures_dir, '..', 'README.md'), link]:
+                with self.subTest(path=path):
+                    (status, response) = self._post(server, f"/validate?path={quote(str(path))}")
+                    self.assertEqual(403, status)
+                    self.assertNotIn('secret', response['error'])
+        with self._serving(document_root=link.parent) as server:
+            self.assertEqual(403, self._post(server, f"/validate?path={quote(str(link))}")[0])
+        with self._serving() as server:
+            self.assertEqual(403, self._post(server, f"/validate?path={quote(str(doc_path))}")[0])
+            # Clients send documents whole if the server does not accept them by path
+            with ValidationClient(format_address(server.address), timeout=60) as client:
+                self.assertEqual(validate_data(doc_path, return_document=False), client.validate(doc_path))
+                self.assertFalse(client._send_paths)
+                with self.assertRaises(OSError):
+                    client.validate(Path(self.tmp_dir.name, 'missing.json'))
+
+    def test_max_body_size(self):
+        with self._serving(max_body_size=10) as server:
+            (status, response) = self._post(server, '/validate', b'{"type": "FeatureCollection"}')
+            self.assertEqual(413, status)
+            self.assertEqual('ValueError', response['type'])
+            with ValidationClient(format_address(server.address), timeout=60) as client:
+                self.assertFalse(client.validate(b'[]')[0])
+                with self.assertRaises(ValueError):
+                    client.validate(b'{"type": "FeatureCollection"}')
+
+    def test_xyz_geojson_options(self):
+        data = Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_xyz_example.json').read_bytes()
+        expected = validate_data(data, version='XYZ-3.1.0-2024-04', return_document=False)
+        with self._serving() as server:
+            for query in ['stream=true', 'sequence=false', 'fast_path=false', 'check_time_order=true',
+                          'max_time_gap=60']:
+                with self.subTest(query=query):
+                    (status, response) = self._post(server, f"/validate?version=XYZ-3.1.0-2024-04&{query}", data)
+                    self.assertEqual(400, status)
+                    self.assertEqual('ValueError', response['type'])
+                    self.assertIn(query.split('=')[0], response['error'])
+                    # With auto-detection, the options are ignored for XYZ metadata
+                    (status, response) = self._post(server, f"/validate?version=auto&{query}", data)
+                    self.assertEqual(200, status)
+                    self.assertEqual(expected[0], response['valid'])
+                    self.assertEqual('XYZ-3.1.0-2024-04', response['detection']['version'])
+
+    def test_worker_error(self):
+        with self._serving() as server, \
+                mock.patch.object(server_module, '_validate', side_effect=KeyError('trustedNode')), \
+                self.assertLogs(server_module.logger, 'ERROR'):
+            (status, response) = self._post(server, '/validate', b'{}')
+            self.assertEqual(500, status)
+            self.assertEqual('Error', response['type'])
+            with ValidationClient(format_address(server.address), timeout=60) as client, \
+                    self.assertRaises(RuntimeError):
+                client.validate(b'{}')
+
+    def test_parse_address(self):
+        self.assertEqual('/tmp/csbschema.sock', parse_address('unix:/tmp/csbschema.sock'))
+        self.assertEqual(('localhost', 8000), parse_address('http://localhost:8000'))
+        self.assertEqual(('127.0.0.1', 8000), parse_address('127.0.0.1:8000'))
+        with self.assertRaises(ValueError):
+            parse_address('https://localhost:8000')
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
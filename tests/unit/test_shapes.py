@@ -0,0 +1,153 @@
+import collections
+import copy
+import json
+import random
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import xmlrunner
+
+import csbschema
+from csbschema import shapes, synth, validators
+from csbschema.validators import _walk_document, _get_validator, _structural_error, _ErrorList
+
+# Mutations that keep the shape of a feature, so that only the value-dependent constraints can catch them
+SAME_SHAPE_MUTATIONS = [
+    lambda f: f.update(type='feature'),
+    lambda f: f['geometry'].update(type='LineString'),
+    lambda f: f['properties'].update(time='2016-03-03 18:41:49Z'),
+    lambda f: f['properties'].update(time='2016-13-03T18:41:49Z'),
+    lambda f: f['properties'].update(time=''),
+]
+# Mutations that change the shape of a feature
+NEW_SHAPE_MUTATIONS = [
+    lambda f: f.update(id=42),
+    lambda f: f.update(id='42'),
+    lambda f: f.update(geometry=None),
+    lambda f: f['geometry'].update(coordinates=[1.0]),
+    lambda f: f['geometry'].update(coordinates=[1.0, 2.0, 3.0]),
+    lambda f: f['geometry'].update(coordinates=[1.0, True]),
+    lambda f: f['properties'].update(depth=12),
+    lambda f: f['properties'].update(depth=None),
+    lambda f: f['properties'].update(uncertainty=[1.0, 2.0, 3.0]),
+    lambda f: f['properties'].update(uncertainty=[1.0, 2.0]),
+    lambda f: f['properties'].pop('time'),
+]
+
+RSRC_NAMES = ['CSB-schema-3_1_0-2024-04.json', 'CSB-schema-3_1_0-2023-03.json', 'CSB-schema-3_0_0-2023-08.json']
+
+
+class TestShapes(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fixtures_dir = Path(Path(__file__).parent.parent.parent, 'docs')
+        validators.clear_validator_cache()
+
+    def tearDown(self) -> None:
+        validators.clear_validator_cache()
+
+    def test_signature(self):
+        feature = {'type': 'Feature', 'properties': {'depth': 1.5, 'time': 'a'},
+                   'geometry': {'type': 'Point', 'coordinates': [1.0, 2.0]}}
+        same = {'type': 'x', 'properties': {'depth': -3.0, 'time': 'b'},
+                'geometry': {'type': 'y', 'coordinates': [3.0, 4.0]}}
+        self.assertEqual(shapes.signature(feature), shapes.signature(same))
+        for other in [dict(reversed(feature.items())),
+                      dict(feature, id=1),
+                      dict(feature, properties={'depth': 1, 'time': 'a'}),
+                      dict(feature, properties={'depth': True, 'time': 'a'}),
+                      dict(feature, geometry={'type': 'Point', 'coordinates': [1.0, 2.0, 3.0]})]:
+            self.assertNotEqual(shapes.signature(feature), shapes.signature(other))
+        with self.assertRaises(shapes.UnknownShape):
+            shapes.signature(dict(feature, properties=collections.OrderedDict(feature['properties'])))
+
+    def test_same_errors(self):
+        with open(Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example.json'), 'rb') as f:
+            document = json.load(f)
+        rng = random.Random(1234)
+        features = []
+        for i in range(1000):
+            feature = copy.deepcopy(document['features'][i % len(document['features'])])
+            # Give most features an 'id', so that the bulk checks leave them to schema validation
+            if rng.random() < 0.8:
+                feature['id'] = i
+            r = rng.random()
+            if r < 0.1:
+                rng.choice(SAME_SHAPE_MUTATIONS)(feature)
+            elif r < 0.2:
+                rng.choice(NEW_SHAPE_MUTATIONS)(feature)
+            features.append(feature)
+        features.extend([None, 'Feature', {}, collections.OrderedDict(features[0])])
+        document['features'] = features
+
+        for rsrc_name in RSRC_NAMES:
+            with self.subTest(rsrc_name=rsrc_name):
+                expected = [_structural_error(e) for e in _get_validator(rsrc_name).iter_errors(document)]
+                self.assertGreater(len(expected), 0)
+                for bulk in (False, True):
+                    validators.clear_validator_cache()
+                    with mock.patch.object(validators, '_get_feature_spec',
+                                           wraps=validators._get_feature_spec if bulk else lambda _: None):
+                        errors = _ErrorList()
+                        _walk_document(rsrc_name, document, errors, fast_path=True)
+                    self.assertEqual(expected, errors)
+                    info = validators.shape_cache_info(rsrc_name)
+                    self.assertGreater(info.hits, 0)
+                    self.assertGreater(info.size, 1)
+
+    def test_synth(self):
+        for version in ['3.1.0-2024-04', '3.1.0-2023-03', '3.0.0-2023-08']:
+            for uncertainty in (False, True):
+                document = synth.generate_document(version=version, n_features=500, error_rate=0.05,
+                                                   uncertainty=uncertainty, seed=7)
+                with self.subTest(version=version, uncertainty=uncertainty):
+                    validators.clear_validator_cache()
+                    (valid, result) = csbschema.validate_data(document, version=version, return_document=False)
+                    (ref_valid, ref_result) = csbschema.validate_data(document, version=version, fast_path=False,
+                                                                      return_document=False)
+                    self.assertEqual(ref_valid, valid)
+                    self.assertEqual([dict(e) for e in ref_result.get('errors', [])],
+                                     [dict(e) for e in result.get('errors', [])])
+
+    def test_cache_info(self):
+        version = '3.0.0-2023-08'
+        n_features = 200
+        # Features with uncertainty are left to schema validation by the bulk checks against the 3.0.0 schema
+        document = synth.generate_document(version=version, n_features=n_features, uncertainty=1.0, seed=3)
+
+        self.assertEqual((0, 0, 0), tuple(csbschema.shape_cache_info(version))[:3])
+        self.assertTrue(csbschema.validate_data(document, version=version)[0])
+        info = csbschema.shape_cache_info(version)
+        self.assertEqual(n_features, info.hits + info.misses)
+        self.assertEqual(info.size, info.misses)
+        self.assertGreater(info.hit_rate, 0.5)
+
+        # Without the fast path, features are always validated against the schema
+        self.assertTrue(csbschema.validate_data(document, version=version, fast_path=False)[0])
+        self.assertEqual(info, csbschema.shape_cache_info(version))
+
+        validators.clear_validator_cache()
+        self.assertEqual((0, 0, 0), tuple(csbschema.shape_cache_info(version))[:3])
+        self.assertIsNone(csbschema.shape_cache_info('XYZ-3.1.0-2024-04'))
+        with self.assertRaises(ValueError):
+            csbschema.shape_cache_info('2.0.0')
+
+    def test_maxsize(self):
+        cache = shapes.ShapeCache.from_schema(_get_validator('CSB-schema-3_1_0-2024-04.json').schema, maxsize=2)
+        features = [{'type': 'Feature', 'properties': {'depth': 1.0, 'time': '2016-03-03T18:41:49Z'},
+                     'geometry': {'type': 'Point', 'coordinates': [1.0] * n}} for n in range(2, 6)]
+        for feature in features:
+            self.assertFalse(cache.is_valid(feature))
+            cache.add(feature)
+        self.assertEqual(2, cache.cache_info().size)
+        self.assertEqual([True, True, False, False], [cache.is_valid(f) for f in features])
+        self.assertEqual((2, 6, 2, 2), tuple(cache.cache_info()))
+        cache.clear()
+        self.assertEqual((0, 0, 0, 2), tuple(cache.cache_info()))
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
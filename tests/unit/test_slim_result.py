@@ -0,0 +1,47 @@
+import unittest
+from pathlib import Path
+
+import xmlrunner
+
+from csbschema import validate_data, VALIDATORS
+
+
+class TestSlimResult(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fixtures_dir = Path(Path(__file__).parent.parent.parent, 'docs')
+
+    def tearDown(self) -> None:
+        pass
+
+    def test_return_document(self):
+        for version in VALIDATORS.keys():
+            for doc_path in [Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example.json'),
+                             Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-invalid.json'),
+                             Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_xyz_example.json')]:
+                with self.subTest(version=version, document=doc_path.name):
+                    (valid, result) = validate_data(doc_path, version=version)
+                    (valid_slim, result_slim) = validate_data(doc_path, version=version, return_document=False)
+                    self.assertEqual(valid, valid_slim)
+                    self.assertNotIn('document', result_slim)
+                    self.assertEqual(result.get('errors'), result_slim.get('errors'))
+                    features = result['document'].get('features')
+                    if features is None:
+                        self.assertNotIn('feature_count', result_slim)
+                    else:
+                        self.assertEqual(len(features), result_slim['feature_count'])
+
+    def test_return_document_stream(self):
+        doc_path = Path(self.fixtures_dir, 'NOAA', 'example_csb_geojson_file.geojson')
+        (valid, result) = validate_data(doc_path, version='3.0.0-2023-08')
+        (valid_slim, result_slim) = validate_data(doc_path, version='3.0.0-2023-08', stream=True,
+                                                  return_document=False)
+        self.assertEqual(valid, valid_slim)
+        self.assertEqual(len(result['document']['features']), result_slim['feature_count'])
+        self.assertEqual({'feature_count'} | ({'errors'} if not valid else set()), set(result_slim.keys()))
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
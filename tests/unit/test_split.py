@@ -0,0 +1,153 @@
+import json
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import xmlrunner
+
+from csbschema import split, synth, validators, validate_data
+
+# Strings with characters that delimit JSON values, which must not be mistaken for the structure of documents
+STRINGS = ['', 'a', '"', '\\', '\\\\', '\\"', '}, {', '[', ']', '{', '}', ',', '"features": [', 'é']
+
+VERSIONS = ['3.1.0-2024-04', '3.0.0-2023-08']
+
+
+def _random_value(rng: random.Random, depth: int = 0):
+    r = rng.random()
+    if depth > 2 or r < 0.3:
+        return rng.choice([1, 2.5, None, True, ''.join(rng.choices(STRINGS, k=rng.randint(0, 4)))])
+    if r < 0.6:
+        return [_random_value(rng, depth + 1) for _ in range(rng.randint(0, 3))]
+    return {''.join(rng.choices(STRINGS, k=rng.randint(0, 3))): _random_value(rng, depth + 1)
+            for _ in range(rng.randint(0, 3))}
+
+
+class TestSplit(unittest.TestCase):
+    def setUp(self) -> None:
+        if not split.AVAILABLE:
+            self.skipTest('NumPy is not installed')
+        self.fixtures_dir = Path(Path(__file__).parent.parent.parent, 'docs')
+
+    def test_split(self):
+        rng = random.Random(1234)
+        n_split = 0
+        for _ in range(1000):
+            features = [{'type': 'Feature', 'properties': _random_value(rng)} if rng.random() < 0.8
+                        else _random_value(rng) for _ in range(rng.randint(0, 20))]
+            members = {'type': _random_value(rng), 'features': features, 'properties': _random_value(rng)}
+            keys = list(members)
+            rng.shuffle(keys)
+            buffer = json.dumps({k: members[k] for k in keys}, ensure_ascii=rng.random() < 0.5,
+                                indent=rng.choice([None, 1])).encode()
+
+            with mock.patch.object(split, 'FIRST_SCAN_BLOCK_SIZE', rng.choice([1, 2, 3])), \
+                    mock.patch.object(split, 'SCAN_BLOCK_SIZE', rng.choice([1, 5, 64, 1 << 16])):
+                start = split.find_features_start(buffer)
+                self.assertEqual(b'[', buffer[start:start + 1])
+                points = split.split_points(buffer, start, rng.randint(2, 6))
+                end = split.find_array_end(buffer, points[-1] + 1 if points else start + 1)
+            self.assertEqual(sorted(points), points)
+            try:
+                chunks = [json.loads(b'[' + buffer[s + 1:e] + b']')
+                          for s, e in zip([start] + points, points + [end])]
+            except (TypeError, ValueError):
+                # A split that is not between features is found when the chunk before it is parsed
+                continue
+            # If every chunk parses, the chunks are the features, and the rest of the document is the other members
+            self.assertEqual(features, [f for chunk in chunks for f in chunk])
+            self.assertEqual(dict(members, features=[]), json.loads(buffer[:start + 1] + buffer[end:]))
+            n_split += len(points) > 0
+        self.assertGreater(n_split, 100)
+
+        for buffer in [b'[{"features": []}]', b'{"features": {}}', b'{"a": {"features": []}}', b'{"features": "["}']:
+            self.assertIsNone(split.find_features_start(buffer))
+        self.assertIsNone(split.find_array_end(b'{"features": [{}, {}}', 15))
+
+    def _validate_parallel(self, document, version: str, **kwargs):
+        """
+        :return: Result of validating a document with feature_jobs=3, and whether the features were validated in
+            parallel
+        """
+        walked = []
+        walk_features_parallel = validators._walk_features_parallel
+
+        def walk(*args, **walk_kwargs):
+            result = walk_features_parallel(*args, **walk_kwargs)
+            walked.append(result is not None)
+            return result
+
+        with mock.patch.object(validators, 'MIN_FEATURE_CHUNK_SIZE', 1000), \
+                mock.patch.object(validators, '_walk_features_parallel', walk):
+            result = validate_data(document, version=version, feature_jobs=3, **kwargs)
+        return result, walked == [True]
+
+    def test_parallel(self):
+        rng = random.Random(5)
+        for version in VERSIONS:
+            document = json.loads(synth.generate_document(version=version, n_features=3000, error_rate=0.02,
+                                                          uncertainty=0.5, seed=11))
+            features = document['features']
+            features[100]['properties']['time'] = features[99]['properties']['time']
+            features[2000]['properties']['time'] = '2030-01-01T00:00:00Z'
+            features[2500]['properties']['note'] = '}, {"type": "Feature"}, {'
+            for i in rng.sample(range(len(features)), 100):
+                features[i]['properties']['note'] = rng.choice(STRINGS)
+            # A member after the features, which is invalid
+            document['bbox'] = 'x'
+            data = json.dumps(document).encode()
+
+            for options in [{}, {'check_time_order': True, 'max_time_gap': 60}, {'max_errors': 5},
+                            {'fast_path': False}, {'compiled': True}]:
+                with self.subTest(version=version, **options):
+                    expected = validate_data(data, version=version, return_document=False, **options)
+                    self.assertFalse(expected[0])
+                    (result, parallel) = self._validate_parallel(data, version, return_document=False, **options)
+                    self.assertTrue(parallel)
+                    self.assertEqual(expected, result)
+
+            # The document returned does not include the features
+            ((valid, result), _) = self._validate_parallel(data, version)
+            self.assertNotIn('features', result['document'])
+            self.assertEqual('x', result['document']['bbox'])
+
+    def test_path(self):
+        version = VERSIONS[0]
+        data = synth.generate_document(version=version, n_features=2000, uncertainty=0.5, seed=3)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir, 'b12.json')
+            path.write_bytes(data)
+            (result, parallel) = self._validate_parallel(path, version, return_document=False)
+        self.assertTrue(parallel)
+        self.assertEqual(validate_data(data, version=version, return_document=False), result)
+
+    def test_serial(self):
+        version = VERSIONS[0]
+        data = synth.generate_document(version=version, n_features=2000, seed=3)
+        # Documents that can't be split are validated serially, with the same result
+        invalid = Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-invalid.json')
+        # A duplicate 'features' member (of which the last is the one validated)
+        duplicate = data.rstrip()[:-1] + b', "features": []}'
+        for document in [invalid, invalid.read_bytes(), json.loads(data), duplicate]:
+            with self.subTest(document=str(document)[:50]):
+                (result, parallel) = self._validate_parallel(document, version, return_document=False)
+                self.assertFalse(parallel)
+                self.assertEqual(validate_data(document, version=version, return_document=False), result)
+
+        # Including documents that are not valid JSON, which are reported as when validated serially
+        truncated = data[:len(data) // 2]
+        with self.assertRaises(ValueError):
+            validate_data(truncated, version=version)
+        with self.assertRaises(ValueError):
+            self._validate_parallel(truncated, version)
+        with self.assertRaises(ValueError):
+            validate_data(data, version=version, feature_jobs=0)
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
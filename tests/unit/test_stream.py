@@ -0,0 +1,99 @@
+import io
+import json
+import unittest
+from pathlib import Path
+
+import xmlrunner
+
+from csbschema import stream, validate_data, AUTO
+from csbschema.validators import validate_b12_3_1_0_2024_04, validate_b12_3_0_0_2023_08, \
+    validate_b12_3_0_0_2023_03
+
+
+class TestStream(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fixtures_dir = Path(Path(__file__).parent.parent.parent, 'docs')
+
+    def tearDown(self) -> None:
+        pass
+
+    def _read_streamed(self, data: bytes, chunk_size: int) -> dict:
+        document = {}
+        for key, value in stream.iter_object(io.BytesIO(data), stream_arrays=('features',),
+                                             chunk_size=chunk_size):
+            if isinstance(value, stream.ArrayElements):
+                value = list(value)
+            document[key] = value
+        return document
+
+    def test_iter_object(self):
+        # Use small chunk sizes so that values are split across chunk boundaries
+        for doc_path in [Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example.json'),
+                         Path(self.fixtures_dir, 'NOAA', 'example_csb_geojson_file.geojson')]:
+            data = doc_path.read_bytes()
+            expected = json.loads(data)
+            for chunk_size in (1, 7, 64, 1 << 20):
+                self.assertEqual(expected, self._read_streamed(data, chunk_size))
+
+    def test_iter_object_numbers(self):
+        data = b'{"a": 12345678901234567890, "features": [1.5e10, -0.25, true, null], "b": 3}'
+        for chunk_size in range(1, 16):
+            self.assertEqual(json.loads(data), self._read_streamed(data, chunk_size))
+
+    def test_iter_object_skip_features(self):
+        data = b'{"features": [{"a": 1}, {"b": 2}], "type": "FeatureCollection"}'
+        members = {key: value for key, value in stream.iter_object(io.BytesIO(data), stream_arrays=('features',))}
+        self.assertEqual('FeatureCollection', members['type'])
+
+    def test_iter_object_invalid(self):
+        for data in [b'[]', b'{"a": 1', b'{"a": 1} {', b'{"features": [1, 2}']:
+            with self.assertRaises(json.JSONDecodeError):
+                self._read_streamed(data, 4)
+
+    def test_iter_object_not_object(self):
+        for data, expected in [(b'[1, 2]', [1, 2]), (b' "hello" ', 'hello'), (b'3', 3), (b'null', None)]:
+            with self.subTest(data=data), self.assertRaises(stream.NotAnObjectError) as cm:
+                self._read_streamed(data, 2)
+            self.assertEqual(expected, cm.exception.value)
+
+    def test_validate_stream_not_object(self):
+        # Streaming gives the same result as validating the whole document for JSON values that are not objects
+        for data in [b'[1,2]', b'"hello"', b'3', b'null']:
+            for version in ('3.1.0-2024-04', '3.0.0-2023-08'):
+                with self.subTest(data=data, version=version):
+                    expected = validate_data(data, version=version)
+                    self.assertFalse(expected[0])
+                    self.assertEqual("is not of type 'object'", expected[1]['errors'][0]['message'][-23:])
+                    self.assertEqual(expected, validate_data(data, version=version, stream=True))
+                    self.assertEqual(expected, validate_data(io.BytesIO(data), version=version, stream=True))
+            (valid, result) = validate_data(data, version=AUTO, stream=True)
+            self.assertEqual('3.1.0-2024-04', result.pop('detection')['version'])
+            self.assertEqual(validate_data(data, version='3.1.0-2024-04'), (valid, result))
+        with self.assertRaises(ValueError):
+            validate_data(b'[1, 2] 3', stream=True)
+
+    def test_validate_stream(self):
+        cases = [
+            (validate_b12_3_1_0_2024_04, Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example.json')),
+            (validate_b12_3_1_0_2024_04, Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-invalid.json')),
+            (validate_b12_3_1_0_2024_04,
+             Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-invalid-emptyprocessing.json')),
+            (validate_b12_3_1_0_2024_04, Path(self.fixtures_dir, 'NOAA', 'noaa_b12_v3_0_0_required.json')),
+            (validate_b12_3_0_0_2023_08, Path(self.fixtures_dir, 'NOAA', 'example_csb_geojson_file.geojson')),
+            (validate_b12_3_0_0_2023_08, Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-invalid.json')),
+            (validate_b12_3_0_0_2023_03, Path(self.fixtures_dir, 'NOAA', 'noaa_b12_v3_0_0_suggested-2023-03.json'))
+        ]
+        for validator, doc_path in cases:
+            (valid, result) = validator(doc_path)
+            (valid_stream, result_stream) = validator(doc_path, stream=True)
+            self.assertEqual(valid, valid_stream)
+            self.assertEqual(result.get('errors'), result_stream.get('errors'))
+            self.assertNotIn('features', result_stream['document'])
+            self.assertEqual(result['document']['properties'], result_stream['document']['properties'])
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
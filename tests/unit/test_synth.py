@@ -0,0 +1,70 @@
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import xmlrunner
+
+from csbschema import validate_data, VALIDATORS
+from csbschema import synth
+
+
+class TestSynth(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_expected_errors(self):
+        for version in VALIDATORS.keys():
+            for options in [{},
+                            {'uncertainty': 0.5},
+                            {'uncertainty': 0.5, 'uncertainty_metadata': False},
+                            {'error_rate': 0.2},
+                            {'invalid_metadata': True},
+                            {'uncertainty': 1.0, 'error_rate': 0.05, 'invalid_metadata': True}]:
+                with self.subTest(version=version, **options):
+                    buffer = io.BytesIO()
+                    summary = synth.write_document(buffer, version=version, n_features=2500, seed=1, **options)
+                    (valid, result) = validate_data(buffer.getvalue(), version=version, return_document=False)
+                    self.assertEqual(summary.expected_errors, len(result.get('errors', [])))
+                    self.assertEqual(summary.expected_errors == 0, valid)
+                    if version.startswith('XYZ-'):
+                        self.assertEqual(0, summary.features)
+                    else:
+                        self.assertEqual(2500, result['feature_count'])
+                        if options.get('error_rate', 0.0) > 0.0:
+                            self.assertGreater(summary.invalid_features, 0)
+                        if options.get('uncertainty', 0.0) > 0.0:
+                            self.assertGreater(summary.uncertainty_features, 0)
+
+    def test_seed(self):
+        document = synth.generate_document(n_features=100, uncertainty=0.5, error_rate=0.1, seed=42)
+        self.assertEqual(document, synth.generate_document(n_features=100, uncertainty=0.5, error_rate=0.1, seed=42))
+        self.assertNotEqual(document, synth.generate_document(n_features=100, uncertainty=0.5, error_rate=0.1, seed=43))
+        self.assertEqual(100, len(json.loads(document)['features']))
+        self.assertEqual([], json.loads(synth.generate_document(n_features=0))['features'])
+
+    def test_write_document(self):
+        path = Path(self.tmp_dir.name, 'synth.json')
+        summary = synth.write_document(path, n_features=synth.CHUNK_SIZE * 2 + 1, seed=1)
+        (valid, result) = validate_data(path, return_document=False, stream=True)
+        self.assertTrue(valid)
+        self.assertEqual(summary.features, result['feature_count'])
+
+        with self.assertRaises(ValueError):
+            synth.write_document(Path(self.tmp_dir.name, 'invalid.json'), error_rate=1.5)
+        self.assertFalse(Path(self.tmp_dir.name, 'invalid.json').exists())
+        with self.assertRaises(ValueError):
+            synth.generate_document(version='2.0.0')
+        with self.assertRaises(ValueError):
+            synth.generate_document(version='3.1.0-2023-03', uncertainty=0.5, uncertainty_metadata=True)
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
@@ -0,0 +1,109 @@
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import xmlrunner
+
+from csbschema import textseq, synth, validate_data, AUTO
+
+VERSIONS = ['3.1.0-2024-04', '3.0.0-2023-08']
+
+
+def _sequence(header, features, *, rs: bool = False, indent=None) -> bytes:
+    records = [json.dumps(r, indent=indent).encode() for r in [header] + features]
+    if rs:
+        return b''.join(b'\x1e' + r + b'\n' for r in records)
+    return b''.join(r + b'\n' for r in records)
+
+
+class TestTextSequence(unittest.TestCase):
+    def test_iter_records(self):
+        for data, expected in [
+                (b'{"a": 1}\n[1]\n\n2\n', [(1, b'{"a": 1}'), (2, b'[1]'), (4, b'2')]),
+                (b'\xef\xbb\xbf\n{"a": 1}\r\n  [1]\r\n\r\n2', [(2, b'{"a": 1}\r'), (3, b'  [1]\r'), (5, b'2')]),
+                (b'\n\x1e{\n"a": 1}\n\x1e\n\n[1,\n2]\n\x1e2', [(2, b'{\n"a": 1}\n'), (6, b'\n\n[1,\n2]\n'), (8, b'2')]),
+                (b'', []), (b'\n \n', [])]:
+            for block_size in (1, 2, 5, 1 << 20):
+                with self.subTest(data=data, block_size=block_size), \
+                        mock.patch.object(textseq, 'READ_BLOCK_SIZE', block_size):
+                    self.assertEqual(expected, list(textseq.iter_records(io.BytesIO(data))))
+
+    def test_line_map(self):
+        lines = textseq.LineMap(header_line=2)
+        for index, line in enumerate([3, 4, 5, 8, 9, 12]):
+            lines.add(index, line)
+        self.assertEqual([3, 4, 5, 8, 9, 12], [lines.line(i) for i in range(6)])
+        self.assertEqual(3, len(lines._indices))
+
+    def test_validate(self):
+        for version in VERSIONS:
+            document = json.loads(synth.generate_document(version=version, n_features=300, error_rate=0.02,
+                                                          uncertainty=0.5, seed=7))
+            features = document.pop('features')
+            features[100]['properties']['time'] = features[99]['properties']['time']
+            for rs in (False, True):
+                data = _sequence(document, features, rs=rs, indent=1 if rs else None)
+                for options in [{}, {'check_time_order': True}, {'max_errors': 3}, {'fast_path': False},
+                                {'compiled': True}]:
+                    with self.subTest(version=version, rs=rs, **options), \
+                            mock.patch.object(textseq, 'READ_BLOCK_SIZE', 4096):
+                        (expected_valid, expected) = validate_data(dict(document, features=features),
+                                                                   version=version, return_document=False, **options)
+                        (valid, result) = validate_data(data, version=version, sequence=True, return_document=False,
+                                                        **options)
+                        self.assertFalse(valid)
+                        self.assertEqual(len(features), result['feature_count'])
+                        self.assertEqual(expected.get('truncated'), result.get('truncated'))
+                        # The same errors, with the line number of each feature's record
+                        self.assertEqual([e['path'] for e in expected['errors']], [e['path'] for e in result['errors']])
+                        for e, error in zip(expected['errors'], result['errors']):
+                            i = int(e['path'].split('/')[2])
+                            line = i + 2 if not rs else data[:data.index(json.dumps(features[i], indent=1).encode())
+                                                             ].count(b'\n') + 1
+                            self.assertEqual(f"{e['message']} (line {line})", error['message'])
+
+            # Version detection reads only the header record
+            data = _sequence(document, features[:10])
+            (valid, result) = validate_data(io.BytesIO(data), version=AUTO, sequence=True)
+            self.assertEqual(version, result['detection']['version'])
+            self.assertEqual(document, result['document'])
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                path = Path(tmp_dir, 'b12.geojsons')
+                path.write_bytes(data)
+                self.assertEqual(validate_data(data, version=version, sequence=True),
+                                 validate_data(path, version=version, sequence=True))
+
+    def test_invalid(self):
+        version = VERSIONS[0]
+        document = json.loads(synth.generate_document(version=version, n_features=3, seed=7))
+        features = document.pop('features')
+        data = _sequence(document, features)
+        # A feature record that is not valid JSON, and features in the header record
+        lines = data.split(b'\n')
+        lines[2] = lines[2][:-1]
+        lines[0] = json.dumps(dict(document, features=features[:1])).encode()
+        (valid, result) = validate_data(b'\n'.join(lines), version=version, sequence=True, return_document=False)
+        self.assertFalse(valid)
+        self.assertEqual(['/features', '/features/1'], [e['path'] for e in result['errors']])
+        self.assertEqual('Features must be given as records after the header record, not in the header record. '
+                         '(line 1)', result['errors'][0]['message'])
+        self.assertTrue(result['errors'][1]['message'].startswith('Feature record is not valid JSON'))
+        self.assertTrue(result['errors'][1]['message'].endswith('(line 3)'))
+        self.assertEqual(3, result['feature_count'])
+
+        # The header record must be valid JSON, and sequences must be read from a path, buffer, or file
+        for data in [b'', b'\n\n', b'{"type":\n' + data]:
+            with self.subTest(data=data[:20]), self.assertRaises(ValueError):
+                validate_data(data, version=version, sequence=True)
+        with self.assertRaises(ValueError):
+            validate_data(document, version=version, sequence=True)
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
@@ -0,0 +1,153 @@
+import calendar
+import json
+import random
+import unittest
+from unittest import mock
+
+import xmlrunner
+
+from csbschema import validate_data, timestamps, synth, AUTO
+from csbschema.validators import _get_time_format
+
+RSRC_NAMES = ['CSB-schema-3_1_0-2024-04.json', 'CSB-schema-3_0_0-2023-08.json']
+
+TIMES = [
+    '2016-03-03T18:41:49Z',
+    '2016-03-03T18:41:49.123Z',
+    '2016-03-03t18:41:60.5z',
+    '2016-03-03T18:41:49',
+    '2016-03-03T18:41:49.25',
+    '2016-03-03T18:41:49.Z',
+    '2016-03-03 18:41:49Z',
+    '2016-13-03T18:41:49Z',
+    '2016-03-00T18:41:49Z',
+    '2016-03-03T24:41:49Z',
+    '2016-03-03T18:41:49+00:00',
+    '20160-03-03T18:41:49Z',
+    '16-03-03T18:41:49Z',
+    '2016-03-03T18:41:49Z\n',
+    '2016-03-03T18:41:49.1234567890123456789Z',
+    '２016-03-03T18:41:49Z',
+    '',
+    None,
+    1457030509,
+]
+
+
+def _mutate(rng: random.Random, t: str) -> str:
+    chars = list(t)
+    for _ in range(rng.randint(1, 2)):
+        pos = rng.randrange(len(chars) + 1)
+        op = rng.random()
+        if op < 0.4 and pos < len(chars):
+            chars[pos] = rng.choice('0123456789-:TtZz. x')
+        elif op < 0.7:
+            chars.insert(pos, rng.choice('0123456789-:TtZz. x'))
+        elif pos < len(chars):
+            del chars[pos]
+    return ''.join(chars)
+
+
+class TestTimestamps(unittest.TestCase):
+    def test_check_times(self):
+        if not timestamps.AVAILABLE:
+            self.skipTest('NumPy is not installed')
+        rng = random.Random(1234)
+        times = TIMES + [_mutate(rng, rng.choice(TIMES[:5])) for _ in range(5000)]
+        for rsrc_name in RSRC_NAMES:
+            with self.subTest(rsrc_name=rsrc_name):
+                fmt = _get_time_format(rsrc_name)
+                self.assertIsNotNone(fmt.zone_required)
+                (valid, epochs) = timestamps.check_times(times, fmt)
+                # The same as the schema's pattern, and as parsing times one at a time
+                self.assertEqual([type(t) is str and fmt.time_re.search(t) is not None for t in times],
+                                 valid.tolist())
+                for t, epoch in zip(times, epochs.tolist()):
+                    expected = fmt.parse(t)
+                    if expected is None:
+                        self.assertNotEqual(epoch, epoch)
+                    else:
+                        self.assertEqual(expected, epoch)
+
+        fmt = _get_time_format(RSRC_NAMES[0])
+        (valid, epochs) = timestamps.check_times(TIMES[:3], fmt)
+        self.assertTrue(valid.all())
+        self.assertEqual([calendar.timegm((2016, 3, 3, 18, 41, 49)), calendar.timegm((2016, 3, 3, 18, 41, 49)) + 0.123,
+                          calendar.timegm((2016, 3, 3, 18, 41, 60)) + 0.5], epochs.tolist())
+        # Patterns that are not known are only checked with the regular expression
+        fmt = timestamps.TimeFormat(r"^[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}Z$")
+        self.assertIsNone(fmt.zone_required)
+        self.assertEqual([True, False, False], timestamps.check_times(TIMES[:3], fmt)[0].tolist())
+
+    def test_time_order(self):
+        fmt = _get_time_format(RSRC_NAMES[0])
+        features = [{'properties': {'time': t}} for t in [
+            '2016-03-03T18:41:49Z', '2016-03-03T18:41:50Z', '2016-03-03T18:41:50.000Z', 'bad', '2016-03-03T18:41:48Z',
+            '2016-03-03T18:41:51Z', '2016-03-03T19:41:51Z']] + [None, {'properties': []}]
+        expected = [(timestamps.DUPLICATE, 2), (timestamps.BACKWARDS, 4), (timestamps.GAP, 6)]
+        for available in (True, False):
+            for batch_size in (1, 2, 3, len(features)):
+                with self.subTest(available=available, batch_size=batch_size), \
+                        mock.patch.object(timestamps, 'AVAILABLE', available and timestamps.AVAILABLE):
+                    time_order = timestamps.TimeOrder(fmt, max_gap=600)
+                    for i in range(0, len(features), batch_size):
+                        time_order(features[i:i + batch_size], i)
+                    self.assertEqual(expected, [(issue.kind, issue.index) for issue in time_order.issues])
+                    self.assertEqual('/features/4/properties/time', time_order.issues[1].path)
+                    self.assertEqual('Time is 2.000 s before the time of feature 2; features must be in time order.',
+                                     time_order.issues[1].message)
+
+                    time_order = timestamps.TimeOrder(fmt, max_issues=1)
+                    time_order(features, 0)
+                    self.assertEqual([(timestamps.DUPLICATE, 2)], [(i.kind, i.index) for i in time_order.issues])
+
+                # Checking features split at any point, then merging, finds the same issues
+                expected_issues = timestamps.TimeOrder(fmt, max_gap=600)
+                expected_issues(features, 0)
+                for i in range(len(features) + 1):
+                    time_order = timestamps.TimeOrder(fmt, max_gap=600)
+                    time_order(features[:i], 0)
+                    rest = timestamps.TimeOrder(fmt, max_gap=600)
+                    rest(features[i:], 0)
+                    time_order.merge(rest, i)
+                    self.assertEqual(expected_issues.issues, time_order.issues)
+
+    def test_validate_data(self):
+        for version in ['3.1.0-2024-04', '3.0.0-2023-08']:
+            document = json.loads(synth.generate_document(version=version, n_features=100, seed=2))
+            features = document['features']
+            features[10]['properties']['time'] = features[9]['properties']['time']
+            features[20]['properties']['time'] = features[5]['properties']['time']
+            features[30]['properties']['time'] = '2030-01-01T00:00:00Z'
+            data = json.dumps(document).encode()
+
+            # Time order is only checked if asked for
+            self.assertTrue(validate_data(data, version=version)[0])
+            for options in [{'check_time_order': True}, {'check_time_order': True, 'stream': True},
+                            {'check_time_order': True, 'fast_path': False}, {'max_time_gap': 60},
+                            {'check_time_order': True, 'max_errors': 2}]:
+                with self.subTest(version=version, **options):
+                    (valid, result) = validate_data(data, version=version, **options)
+                    self.assertFalse(valid)
+                    expected = [10, 20, 30, 31] if 'max_time_gap' in options else [10, 20, 31]
+                    if 'max_errors' in options:
+                        expected = expected[:2]
+                        self.assertTrue(result['truncated'])
+                    self.assertEqual([f"/features/{i}/properties/time" for i in expected],
+                                     [e['path'] for e in result['errors']])
+
+            with self.assertRaises(ValueError):
+                validate_data(data, version=version, max_time_gap=0)
+
+        # The options are ignored for XYZ metadata when detecting the version
+        xyz = synth.generate_document(version='XYZ-3.1.0-2024-04')
+        (valid, result) = validate_data(xyz, version=AUTO, check_time_order=True, max_time_gap=60)
+        self.assertEqual('XYZ-3.1.0-2024-04', result.pop('detection')['version'])
+        self.assertEqual(validate_data(xyz, version='XYZ-3.1.0-2024-04'), (valid, result))
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
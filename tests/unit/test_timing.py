@@ -0,0 +1,78 @@
+import unittest
+from pathlib import Path
+
+import xmlrunner
+
+from csbschema import validate_data, VALIDATORS
+from csbschema import synth
+from csbschema import timing
+
+
+class TestTiming(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fixtures_dir = Path(Path(__file__).parent.parent.parent, 'docs')
+
+    def test_timings(self):
+        for version in VALIDATORS.keys():
+            for stream in [False, True]:
+                if stream and version.startswith('XYZ-'):
+                    continue
+                with self.subTest(version=version, stream=stream):
+                    document = synth.generate_document(version=version, n_features=50, uncertainty=0.5,
+                                                       error_rate=0.1, seed=1)
+                    options = {'stream': True} if stream else {}
+                    (valid, result) = validate_data(document, version=version, timings=True, **options)
+                    expected = set(timing.PHASES) | {timing.TOTAL}
+                    if stream:
+                        # Features are parsed as they are validated, during the structural phase
+                        expected.discard(timing.PARSE)
+                    self.assertEqual(expected, set(result['timings'].keys()))
+                    for duration in result['timings'].values():
+                        self.assertGreaterEqual(duration, 0.0)
+                    self.assertGreaterEqual(result['timings'][timing.TOTAL],
+                                            sum(result['timings'][p] for p in expected - {timing.TOTAL}))
+                    if version.startswith('XYZ-'):
+                        self.assertNotIn('feature_count', result)
+                    else:
+                        self.assertEqual(50, result['feature_count'])
+                    # The document is still returned, and timings don't change the verdict
+                    self.assertIn('document', result)
+                    self.assertEqual(valid, validate_data(document, version=version, **options)[0])
+
+    def test_no_timings(self):
+        (valid, result) = validate_data(Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example.json'))
+        self.assertTrue(valid)
+        self.assertNotIn('timings', result)
+        self.assertNotIn('feature_count', result)
+
+    def test_span_hook(self):
+        spans = []
+        timing.add_span_hook(spans.append)
+        try:
+            (valid, result) = validate_data(Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example-invalid.json'))
+        finally:
+            timing.remove_span_hook(spans.append)
+        self.assertFalse(valid)
+        # Hooks are called even if timings were not asked for
+        self.assertNotIn('timings', result)
+        self.assertEqual(list(timing.PHASES) + [timing.VALIDATE], [s.name for s in spans])
+        for span in spans:
+            self.assertEqual('CSB-schema-3_1_0-2024-04.json', span.attributes['schema'])
+            self.assertGreaterEqual(span.duration, 0.0)
+        validate_span = spans[-1]
+        self.assertEqual(len(result['errors']), validate_span.attributes['error_count'])
+        self.assertEqual(len(result['document']['features']), validate_span.attributes['feature_count'])
+        self.assertLessEqual(validate_span.start, spans[0].start)
+
+        # Removed hooks are no longer called
+        validate_data(Path(self.fixtures_dir, 'IHO', 'b12_v3_1_0_example.json'))
+        self.assertEqual(len(timing.PHASES) + 1, len(spans))
+        with self.assertRaises(ValueError):
+            timing.remove_span_hook(spans.append)
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
@@ -0,0 +1,74 @@
+import unittest
+import threading
+from unittest import mock
+
+import xmlrunner
+
+from csbschema import warmup, SCHEMA_RESOURCES, VALIDATORS, B12_VERSION_3_1_0_2024_04
+from csbschema import validators
+from csbschema.validators import _get_validator, clear_validator_cache
+
+
+class TestValidatorCache(unittest.TestCase):
+    def setUp(self) -> None:
+        clear_validator_cache()
+
+    def tearDown(self) -> None:
+        clear_validator_cache()
+
+    def test_schema_resources(self):
+        self.assertEqual(set(VALIDATORS.keys()), set(SCHEMA_RESOURCES.keys()))
+        # Each validator validates against the schema resource given for its version
+        for version, validator in VALIDATORS.items():
+            with self.subTest(version=version), \
+                    mock.patch.object(validators, 'validate_b12_3_0_0') as v300, \
+                    mock.patch.object(validators, 'validate_b12_3_1_0') as v310, \
+                    mock.patch.object(validators, 'validate_b12_xyz_3_0_0') as xyz300, \
+                    mock.patch.object(validators, 'validate_b12_xyz_3_1_0') as xyz310:
+                validator({})
+                (called, ) = [v for v in (v300, v310, xyz300, xyz310) if v.called]
+                self.assertEqual(SCHEMA_RESOURCES[version], called.call_args.args[0])
+
+    def test_validator_cached(self):
+        rsrc_name = SCHEMA_RESOURCES[B12_VERSION_3_1_0_2024_04]
+        validator = _get_validator(rsrc_name)
+        self.assertIs(validator, _get_validator(rsrc_name))
+        clear_validator_cache()
+        self.assertIsNot(validator, _get_validator(rsrc_name))
+
+    def test_validator_cached_threads(self):
+        rsrc_name = SCHEMA_RESOURCES[B12_VERSION_3_1_0_2024_04]
+        n_threads = 8
+        barrier = threading.Barrier(n_threads)
+        results = []
+
+        def get():
+            # Start all threads together, with the cache empty, so that they race to load the validator
+            barrier.wait()
+            results.append(_get_validator(rsrc_name))
+
+        _get_validator.cache_clear()
+        threads = [threading.Thread(target=get) for _ in range(n_threads)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(n_threads, len(results))
+        for v in results:
+            self.assertIs(results[0], v)
+        self.assertIs(results[0], _get_validator(rsrc_name))
+
+    def test_warmup(self):
+        warmup(versions=[B12_VERSION_3_1_0_2024_04])
+        self.assertEqual(1, _get_validator.cache_info().currsize)
+        warmup()
+        self.assertEqual(len(SCHEMA_RESOURCES), _get_validator.cache_info().currsize)
+        with self.assertRaises(ValueError):
+            warmup(versions=['0.0.0'])
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )
@@ -0,0 +1,149 @@
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import xmlrunner
+
+from csbschema import xyz, synth, validate_data, validate_xyz_pair, AUTO
+
+XYZ_VERSIONS = ['XYZ-3.1.0-2024-04', 'XYZ-3.1.0-2023-08', 'XYZ-3.0.0-2023-08']
+
+VALID_DATA = [
+    # CSV with a header, in another order, with an ignored column, and lines without uncertainty
+    b'Time,Latitude,Longitude,Depth,Quality,Uncertainty_X,Uncertainty_Y,Uncertainty_Z\n'
+    b'2016-03-03T18:41:49Z,43.1,-70.5,10.5,1,,,\n'
+    b'2016-03-03T18:41:50.25Z,43.2,-70.4,11,1,,,\n',
+    # Whitespace delimited, without a header
+    b'-70.5 43.1 10.5 2016-03-03T18:41:49Z\n'
+    b'-70.4\t43.2   11 2016-03-03T18:41:50Z',
+    # CRLF line endings and blank lines
+    b'\r\nlon,lat,depth,time\r\n\r\n-70.5,43.1,10.5,2016-03-03T18:41:49Z\r\n\r\n-70.4,43.2,11,2016-03-03T18:41:50Z\r\n',
+    b'',
+]
+
+INVALID_DATA = b'''lon,lat,depth,time
+-70.5,43.1,10.5,2016-03-03T18:41:49Z
+
+180.5,43.1,ten,2016-03-03T18:41:49Z
+-70.5,-91,inf,2016-03-03 18:41:49Z
+-70.5,43.1,10.5
+-70.5,43.1,10.5,2016-03-03T18:41:49Z
+'''
+
+INVALID_ERRORS = [
+    ('/data/1/lon', '180.5 is not between -180 and 180 (line 4).'),
+    ('/data/1/depth', "'ten' is not a number (line 4)."),
+    ('/data/2/lat', '-91 is not between -90 and 90 (line 5).'),
+    ('/data/2/depth', "'inf' is not a number (line 5)."),
+    ('/data/2/time', "'2016-03-03 18:41:49Z' is not a valid RFC 3339 UTC time (line 5)."),
+    ('/data/3', 'Expected 4 values, but found 3 (line 6).'),
+]
+
+
+def _metadata(version: str, uncertainty_metadata: bool = False) -> dict:
+    return json.loads(synth.generate_document(version=version, uncertainty_metadata=uncertainty_metadata))
+
+
+def _errors(result: dict) -> list:
+    return [(e['path'], e['message']) for e in result.get('errors', [])]
+
+
+class TestXYZ(unittest.TestCase):
+    def test_valid(self):
+        for version in XYZ_VERSIONS:
+            metadata = _metadata(version)
+            for data in VALID_DATA:
+                for available in (True, False):
+                    with self.subTest(version=version, data=data[:20], available=available), \
+                            mock.patch.object(xyz, 'AVAILABLE', available and xyz.AVAILABLE):
+                        (valid, result) = validate_xyz_pair(metadata, data, version=version, timings=True)
+                        self.assertTrue(valid, result.get('errors'))
+                        self.assertEqual(2 if data else 0, result['feature_count'])
+
+    def test_invalid(self):
+        metadata = _metadata(XYZ_VERSIONS[0])
+        for available in (True, False):
+            for block_size in (1, 7, 1 << 24):
+                with self.subTest(available=available, block_size=block_size), \
+                        mock.patch.object(xyz, 'AVAILABLE', available and xyz.AVAILABLE), \
+                        mock.patch.object(xyz, 'READ_BLOCK_SIZE', block_size):
+                    (valid, result) = validate_xyz_pair(metadata, INVALID_DATA, return_document=False)
+                    self.assertFalse(valid)
+                    self.assertEqual(INVALID_ERRORS, _errors(result))
+                    self.assertEqual(5, result['feature_count'])
+
+        # Errors in the metadata are reported before those in the data, and the error budget covers both
+        metadata['trustedNode']['dataLicense'] = 1
+        (valid, result) = validate_xyz_pair(metadata, INVALID_DATA, max_errors=3)
+        self.assertTrue(result['truncated'])
+        self.assertEqual(['/trustedNode/dataLicense', '/data/1/lon', '/data/1/depth'],
+                         [e['path'] for e in result['errors']])
+
+        # Coordinates are not range checked for a projected CRS
+        metadata = _metadata(XYZ_VERSIONS[0])
+        metadata['trustedNode']['navigationCRS'] = 'EPSG:32619'
+        (valid, result) = validate_xyz_pair(metadata, INVALID_DATA)
+        self.assertEqual([e for e in INVALID_ERRORS if 'between' not in e[1]], _errors(result))
+
+    def test_columns(self):
+        metadata = _metadata(XYZ_VERSIONS[0])
+        for data, message in [
+                (b'lon,lat,time\n', "Column 'depth' not found in header (line 1)."),
+                (b'lon,lat,depth,time,uncertainty_z\n',
+                 'Header has only some of the uncertainty columns (uncertainty_x, uncertainty_y, and uncertainty_z) '
+                 '(line 1).'),
+                (b'\n1,2,3,4,5\n1,2\n',
+                 'Expected 4 or 7 values (lon, lat, depth, time, and optionally uncertainty x, y, and z), but found 5 '
+                 '(line 2).')]:
+            with self.subTest(data=data):
+                (valid, result) = validate_xyz_pair(metadata, data)
+                self.assertFalse(valid)
+                self.assertEqual([('/data', message)], _errors(result))
+
+    def test_uncertainty(self):
+        data = (b'-70.5,43.1,10.5,2016-03-03T18:41:49Z,,,\n'
+                b'-70.5,43.1,10.5,2016-03-03T18:41:49Z,0.5,0.5,x\n'
+                b'-70.5,43.1,10.5,2016-03-03T18:41:49Z,0.5,0.5,0.2\n')
+        expected = [('/data/1/uncertainty/2', "'x' is not a number (line 2).")]
+        for version in XYZ_VERSIONS + ['XYZ-3.0.0-2023-03']:
+            with self.subTest(version=version):
+                (valid, result) = validate_xyz_pair(_metadata(version), data, version=version)
+                missing = [] if version.endswith('2023-03') else [
+                    ('/data/1/uncertainty', 'Observation uncertainty found, but Uncertainty metadata was not found.')]
+                self.assertEqual(expected + missing, _errors(result))
+                if version.endswith('2023-03'):
+                    continue
+                (valid, result) = validate_xyz_pair(_metadata(version, uncertainty_metadata=True), data,
+                                                    version=version)
+                self.assertEqual(expected, _errors(result))
+
+    def test_sources(self):
+        metadata = _metadata(XYZ_VERSIONS[0])
+        expected = validate_xyz_pair(metadata, INVALID_DATA)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir, 'data.csv')
+            path.write_bytes(INVALID_DATA)
+            for data in [path, str(path), memoryview(INVALID_DATA), io.BytesIO(INVALID_DATA)]:
+                with self.subTest(data=type(data)):
+                    self.assertEqual(expected, validate_xyz_pair(metadata, data))
+
+        (valid, result) = validate_xyz_pair(metadata, INVALID_DATA, version=AUTO)
+        self.assertEqual(XYZ_VERSIONS[0], result.pop('detection')['version'])
+        self.assertEqual(expected, (valid, result))
+        geojson = synth.generate_document(version='3.1.0-2024-04')
+        with self.assertRaises(ValueError):
+            validate_xyz_pair(metadata, INVALID_DATA, version='3.1.0-2024-04')
+        with self.assertRaises(ValueError):
+            validate_xyz_pair(geojson, INVALID_DATA, version=AUTO)
+        with self.assertRaises(ValueError):
+            validate_data(geojson, version='3.1.0-2024-04', xyz_data=INVALID_DATA)
+
+
+if __name__ == '__main__':
+    unittest.main(
+        testRunner=xmlrunner.XMLTestRunner(output='test-reports'),
+        failfast=False, buffer=False, catchbreak=False
+    )